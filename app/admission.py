@@ -0,0 +1,358 @@
+import asyncio
+import math
+import os
+import threading
+import time
+
+from flask import g, jsonify, request
+
+from app import metrics
+from app.cache import TTLCache
+
+# Giriş kontrolü (admission control): pahalı route'lar (OCR, çeviri, Yelp) sınıflara
+# ayrılır; her sınıfın eşzamanlı istek sınırı, sınırlı bir bekleme kuyruğu ve istemci
+# (IP) başına token bucket hız sınırı vardır. Kuyruk doluysa ya da bekleme süresi aşılırsa
+# istek worker'ı meşgul etmeden 503, hız sınırı aşılırsa 429 döner (ikisi de Retry-After ile).
+# Giriş / profil gibi ucuz route'lar hiçbir sınıfa girmez, sınırlanmaz.
+#
+# Her sınıf ortamdan ayarlanabilir (ADMISSION_<SINIF>_...):
+#   CONCURRENCY   aynı anda çalışan istek sayısı (0: sınırsız)
+#   QUEUE         sıra bekleyebilecek istek sayısı
+#   QUEUE_TIMEOUT sırada en fazla bekleme (saniye)
+#   RATE          IP başına dakikada istek (0: sınırsız)
+#   BURST         token bucket kapasitesi
+# Eşzamanlılık sınırları worker thread sayısının (ASGI_WSGI_THREADS) altında tutulmalı;
+# aksi halde pahalı istekler yine tüm thread'leri doldurur.
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") == "1"
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+# Aynı anda izlenen istemci bucket'ı; boşta kalanlar BUCKET_TTL sonra silinir
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+RATE_LIMIT_BUCKET_TTL = int(os.getenv("RATE_LIMIT_BUCKET_TTL", "600"))
+# Uygulamanın önündeki güvenilir proxy / load balancer sayısı. 0'dan büyükse istemci
+# adresi X-Forwarded-For'un sağdan bu kadarıncı değeridir (Flask'ta main.py ProxyFix ile,
+# async route'larda forwarded_client ile). Load balancer arkasında ayarlanmazsa tüm
+# istemciler LB adresini paylaşır ve aynı hız sınırı bucket'ına düşer.
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", "0"))
+# async route'ların sırada beklerken slotu yoklama aralığı (saniye)
+ASYNC_POLL_INTERVAL = 0.01
+
+# sınıf -> varsayılan (concurrency, queue, queue_timeout, rate/dk, burst)
+DEFAULT_LIMITS = {
+    "ocr": (4, 8, 2.0, 30, 10),
+    "translate": (16, 32, 1.0, 120, 30),
+    "upstream": (16, 32, 1.0, 60, 20),
+    "export": (4, 4, 0.5, 10, 5),
+}
+
+# endpoint (view fonksiyonu) adı -> sınıf; Flask ve async (Starlette) route'ları aynı adları kullanır
+ROUTE_CLASSES = {
+    "photo_ocr": "ocr",
+    "submit_ocr_job": "ocr",
+    "photo_translate": "ocr",
+    "translate_text": "translate",
+    "translate_batch": "translate",
+    "restaurant_search": "upstream",
+    "get_restaurant_reviews": "upstream",
+    "get_restaurant": "upstream",
+    "export_history": "export",
+    "export_all_history": "export",
+}
+
+
+def _setting(route_class, name, default, cast):
+    return cast(os.getenv(f"ADMISSION_{route_class.upper()}_{name}", default))
+
+
+class Rejected(Exception):
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate, capacity):
+        self.rate = rate  # saniyede eklenen token
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def take(self):
+        # Token varsa harcar ve 0 döner; yoksa bir sonraki token'a kalan saniyeyi döner
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RouteClass:
+    def __init__(self, name, concurrency, queue, queue_timeout, rate, burst):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.queue_timeout = queue_timeout
+        self.rate = rate
+        self.burst = max(burst, 1)
+
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+        self._buckets = TTLCache(maxsize=RATE_LIMIT_MAX_CLIENTS, ttl=RATE_LIMIT_BUCKET_TTL)
+        self._buckets_lock = threading.Lock()
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.rate_limited = 0
+        self.max_wait_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, name, defaults):
+        concurrency, queue, queue_timeout, rate, burst = defaults
+        return cls(
+            name,
+            concurrency=_setting(name, "CONCURRENCY", concurrency, int),
+            queue=_setting(name, "QUEUE", queue, int),
+            queue_timeout=_setting(name, "QUEUE_TIMEOUT", queue_timeout, float),
+            rate=_setting(name, "RATE", rate, float),
+            burst=_setting(name, "BURST", burst, int),
+        )
+
+    # Hız sınırı
+
+    def check_rate(self, client):
+        if not RATE_LIMIT_ENABLED or self.rate <= 0:
+            return
+        with self._buckets_lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = TokenBucket(self.rate / 60.0, self.burst)
+                self._buckets.set(client, bucket)
+            wait = bucket.take()
+        if wait:
+            with self._cond:
+                self.rate_limited += 1
+            _count(self.name, "rate_limited")
+            raise Rejected(429, "Çok fazla istek, lütfen biraz sonra tekrar deneyin", wait)
+
+    # Eşzamanlılık sınırı
+
+    def _admit_locked(self):
+        self.active += 1
+        self.admitted += 1
+        _count(self.name, "admitted")
+
+    def _enqueue_locked(self):
+        if self.waiting >= self.queue:
+            self.rejected_queue_full += 1
+            _count(self.name, "rejected_queue_full")
+            raise Rejected(503, "Sunucu yoğun, lütfen tekrar deneyin", self.queue_timeout)
+        self.waiting += 1
+        self.queued += 1
+        _count(self.name, "queued")
+
+    def _dequeue_locked(self, started):
+        self.waiting -= 1
+        self.max_wait_seconds = max(self.max_wait_seconds, time.monotonic() - started)
+
+    def _timeout_locked(self):
+        self.rejected_timeout += 1
+        _count(self.name, "rejected_timeout")
+        return Rejected(503, "Sunucu yoğun, lütfen tekrar deneyin", self.queue_timeout)
+
+    def try_acquire(self):
+        if self.concurrency <= 0:
+            return True
+        with self._cond:
+            if self.active < self.concurrency:
+                self._admit_locked()
+                return True
+            return False
+
+    def acquire(self):
+        if self.concurrency <= 0:
+            return
+        with self._cond:
+            if self.active < self.concurrency:
+                self._admit_locked()
+                return
+            self._enqueue_locked()
+            started = time.monotonic()
+            deadline = started + self.queue_timeout
+            try:
+                while self.active >= self.concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._timeout_locked()
+                    self._cond.wait(remaining)
+                self._admit_locked()
+            finally:
+                self._dequeue_locked(started)
+
+    async def acquire_async(self):
+        # Event loop bloklanmasın diye sırada bekleme kısa aralıklarla yoklanarak yapılır
+        if self.try_acquire():
+            return
+        with self._cond:
+            self._enqueue_locked()
+        started = time.monotonic()
+        deadline = started + self.queue_timeout
+        try:
+            while not self.try_acquire():
+                if time.monotonic() >= deadline:
+                    with self._cond:
+                        raise self._timeout_locked()
+                await asyncio.sleep(ASYNC_POLL_INTERVAL)
+        finally:
+            with self._cond:
+                self._dequeue_locked(started)
+
+    def release(self):
+        if self.concurrency <= 0:
+            return
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "limits": {
+                    "concurrency": self.concurrency,
+                    "queue": self.queue,
+                    "queue_timeout": self.queue_timeout,
+                    "rate_per_minute": self.rate,
+                    "burst": self.burst,
+                },
+                "active": self.active,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "rejected_queue_full": self.rejected_queue_full,
+                "rejected_timeout": self.rejected_timeout,
+                "rate_limited": self.rate_limited,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+                "tracked_clients": len(self._buckets),
+            }
+
+
+CLASSES = {name: RouteClass.from_env(name, defaults) for name, defaults in DEFAULT_LIMITS.items()}
+
+admission_decisions = metrics.register(metrics.Counter(
+    "lingualens_admission_total", "Giriş kontrolü kararları", ("class", "outcome")))
+metrics.register(metrics.Gauge(
+    "lingualens_admission_requests", "Sınıf başına çalışan / bekleyen istek", ("class", "state"),
+    lambda: {(name, state): getattr(rc, state) for name, rc in CLASSES.items() for state in ("active", "waiting")}))
+
+
+def _count(route_class, outcome):
+    admission_decisions.inc(route_class, outcome)
+
+
+def route_class_for(endpoint):
+    if not ADMISSION_ENABLED or not endpoint:
+        return None
+    name = ROUTE_CLASSES.get(endpoint.rsplit(".", 1)[-1])
+    return CLASSES.get(name) if name else None
+
+
+def client_key(remote_addr):
+    # İsteklerde doğrulanmış bir kimlik yok; X-User-ID ya da user_id istemcinin seçtiği
+    # değerler olduğu için anahtar bağlantının IP adresidir (proxy arkasında TRUSTED_PROXY_COUNT)
+    return f"ip:{remote_addr}"
+
+
+def forwarded_client(remote_addr, forwarded_for, trusted=None):
+    # werkzeug ProxyFix(x_for=trusted) ile aynı kural: son "trusted" proxy'nin eklediği değer
+    # alınır; başlık eksik ya da kısa ise (proxy'yi atlayan istek) bağlantı adresi kullanılır
+    trusted = TRUSTED_PROXY_COUNT if trusted is None else trusted
+    if trusted <= 0 or not forwarded_for:
+        return remote_addr
+    values = [value.strip() for value in forwarded_for.split(",")]
+    return values[-trusted] if len(values) >= trusted else remote_addr
+
+
+def retry_after_header(seconds):
+    return str(max(1, math.ceil(seconds)))
+
+
+def stats():
+    return {name: rc.stats() for name, rc in CLASSES.items()}
+
+
+def _rejected_response(error):
+    response = jsonify({"error": error.reason})
+    response.status_code = error.status
+    response.headers["Retry-After"] = retry_after_header(error.retry_after)
+    return response
+
+
+def init_app(app):
+    @app.before_request
+    def _admit():
+        route_class = route_class_for(request.endpoint)
+        if route_class is None:
+            return None
+        try:
+            route_class.check_rate(client_key(request.remote_addr))
+            route_class.acquire()
+        except Rejected as e:
+            return _rejected_response(e)
+        g.admission_class = route_class
+        return None
+
+    # Akışlı yanıtlarda (photo-translate, export) slot akış bitince bırakılır: teardown
+    # gövde akmadan çalışır, yanıtı kapatan WSGI sunucusu ise akış sonunda (ya da istemci
+    # koptuğunda) close'u çağırır
+    @app.after_request
+    def _release_after_stream(response):
+        if response.is_streamed and "admission_class" in g:
+            response.call_on_close(g.pop("admission_class").release)
+        return response
+
+    @app.teardown_request
+    def _release(exc):
+        route_class = g.pop("admission_class", None)
+        if route_class is not None:
+            route_class.release()
+
+
+class ASGIAdmissionMiddleware:
+    # async_routes.py'deki route'lar Flask hook'larından geçmez; aynı sınıf sayaçlarını
+    # route bazlı middleware olarak paylaşır
+    def __init__(self, app, endpoint):
+        self.app = app
+        self.endpoint = endpoint
+
+    async def __call__(self, scope, receive, send):
+        route_class = route_class_for(self.endpoint) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        from starlette.requests import Request
+        from starlette.responses import JSONResponse
+
+        request = Request(scope)
+        try:
+            remote_addr = request.client.host if request.client else None
+            route_class.check_rate(client_key(forwarded_client(remote_addr, request.headers.get("x-forwarded-for"))))
+            await route_class.acquire_async()
+        except Rejected as e:
+            response = JSONResponse({"error": e.reason}, status_code=e.status,
+                                    headers={"Retry-After": retry_after_header(e.retry_after)})
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route_class.release()
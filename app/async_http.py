@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import httpx
+
+from app import http_client
+
+# ASGI modunda dış servis çağrıları httpx.AsyncClient ile yapılır.
+# Ayarlar, circuit breaker, sayaçlar ve retry kararları senkron istemciyle (http_client)
+# ortaktır; böylece iki mod aynı upstream sağlık durumunu görür.
+
+
+class AsyncUpstream:
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self._client = None
+
+    def _get_client(self):
+        # İstemci event loop içinde ilk kullanımda açılır
+        if self._client is None:
+            upstream = self.upstream
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(upstream.read_timeout, connect=upstream.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=upstream.pool_size,
+                    max_keepalive_connections=upstream.pool_size,
+                ),
+            )
+        return self._client
+
+    async def request(self, method, url, idempotent=None, **kwargs):
+        upstream = self.upstream
+        safe, attempts = upstream.attempt_plan(method, idempotent)
+
+        for attempt in range(attempts):
+            upstream.check_circuit()
+            start = time.perf_counter()
+            try:
+                response = await self._get_client().request(method, url, **kwargs)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                if not upstream.transport_failed(start, attempt, attempts, isinstance(e, httpx.ReadTimeout) and not safe):
+                    raise
+            except Exception:
+                upstream.unexpected_failure(start)
+                raise
+            except BaseException:
+                upstream.attempt_cancelled()
+                raise
+            else:
+                if upstream.response_received(response, start, attempt, attempts):
+                    return response
+            await asyncio.sleep(upstream.retry_delay(attempt))
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+libretranslate = AsyncUpstream(http_client.libretranslate)
+yelp = AsyncUpstream(http_client.yelp)
+
+
+async def aclose_all():
+    await libretranslate.aclose()
+    await yelp.aclose()
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+
+import httpx
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse as StarletteJSONResponse
+from starlette.routing import Route
+
+from app import admission, log, responses, restaurants, translation_memory, translator, yelp
+from app.http_client import CircuitOpenError, libretranslate as libretranslate_upstream, yelp as yelp_upstream
+
+# Dış servise bağlı endpoint'lerin coroutine sürümleri (asgi.py tarafından kullanılır).
+# Yanıt biçimleri ve hata mesajları app/routes.py ile aynıdır.
+
+logger = logging.getLogger(__name__)
+
+
+class JSONResponse(StarletteJSONResponse):
+    # Flask tarafıyla aynı kodlayıcı (app/responses.py): orjson, sıralı anahtarlar
+    def render(self, content):
+        if responses.orjson is None:
+            return super().render(content)
+        return responses.dumps_bytes(content)
+
+
+# Sadece bu route'lar sıkıştırılır; Flask'a giden (akışlı olanlar dahil) yanıtlara dokunulmaz
+_compressed = Middleware(GZipMiddleware, minimum_size=responses.COMPRESS_MIN_BYTES)
+
+
+def _middleware(endpoint):
+    # Flask tarafıyla aynı giriş kontrolü sınıfı (app/admission.py), sonra sıkıştırma
+    return [Middleware(admission.ASGIAdmissionMiddleware, endpoint=endpoint.__name__), _compressed]
+
+
+def _upstream_unavailable(error, upstream):
+    return JSONResponse(
+        {"error": str(error)},
+        status_code=503,
+        headers={"Retry-After": str(upstream.breaker.retry_after())}
+    )
+
+
+async def restaurant_search(request):
+    term = request.query_params.get("term")
+    latitude = request.query_params.get("latitude")
+    longitude = request.query_params.get("longitude")
+
+    if not all([term, latitude, longitude]):
+        return JSONResponse({"error": "Missing query parameters (term, latitude, longitude)"}, status_code=400)
+
+    try:
+        latitude, longitude = yelp.parse_coordinates(latitude, longitude)
+    except ValueError:
+        return JSONResponse({"error": "Invalid latitude/longitude"}, status_code=400)
+
+    # Yerel restoran index'i (DB) thread havuzunda sorgulanır / güncellenir
+    if restaurants.RESTAURANT_LOCAL_FIRST:
+        local = await asyncio.to_thread(restaurants.search_local, term, latitude, longitude, 1, True)
+        if local:
+            return JSONResponse(local)
+
+    if not yelp.YELP_API_KEY:
+        return JSONResponse({"error": "YELP_API_KEY not found in .env file"}, status_code=500)
+
+    try:
+        yelp_data = await yelp.asearch(term, latitude, longitude, limit=1)
+        await asyncio.to_thread(restaurants.index_response, yelp_data, True)
+        return JSONResponse(yelp_data)
+    except CircuitOpenError as e:
+        return _upstream_unavailable(e, yelp_upstream)
+    except httpx.HTTPError as e:
+        return JSONResponse({"error": f"Failed to fetch restaurant data from Yelp: {str(e)}"}, status_code=500)
+
+
+async def get_restaurant_reviews(request):
+    restaurant_id = request.path_params["restaurant_id"]
+
+    if not yelp.YELP_API_KEY:
+        return JSONResponse({"error": "YELP_API_KEY not found in .env file"}, status_code=500)
+
+    try:
+        return JSONResponse(await yelp.areviews(restaurant_id))
+    except CircuitOpenError as e:
+        return _upstream_unavailable(e, yelp_upstream)
+    except httpx.HTTPError as e:
+        return JSONResponse({"error": f"Failed to fetch reviews from Yelp: {str(e)}"}, status_code=500)
+
+
+async def translate_text(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    if not isinstance(data, dict) or "text" not in data or "target_lang" not in data:
+        return JSONResponse({"error": "Eksik alanlar"}, status_code=400)
+
+    try:
+        if translation_memory.TRANSLATION_MEMORY_ENABLED:
+            translated_text, reuse = await translation_memory.atranslate(data["text"], data["target_lang"])
+            return JSONResponse({"translated_text": translated_text, "translation_memory": reuse})
+        translated_text = await translator.atranslate(data["text"], data["target_lang"])
+        return JSONResponse({"translated_text": translated_text})
+    except translator.TranslationError as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+    except CircuitOpenError as e:
+        return _upstream_unavailable(e, libretranslate_upstream)
+    except httpx.TimeoutException:
+        return JSONResponse({"error": "Çeviri hizmeti zaman aşımına uğradı, lütfen tekrar deneyin."}, status_code=500)
+    except httpx.HTTPError as e:
+        return JSONResponse({"error": f"Çeviri hizmetiyle iletişim hatası: {str(e)}"}, status_code=500)
+    except Exception as e:
+        log.event(logger, logging.ERROR, "translate_failed", exc_info=True)
+        return JSONResponse({"error": f"Sunucu tarafında beklenmeyen hata: {str(e)}"}, status_code=500)
+
+
+routes = [
+    Route("/restaurant-search", restaurant_search, methods=["GET"], middleware=_middleware(restaurant_search)),
+    Route("/restaurant-reviews/{restaurant_id}", get_restaurant_reviews, methods=["GET"], middleware=_middleware(get_restaurant_reviews)),
+    Route("/translate", translate_text, methods=["POST"], middleware=_middleware(translate_text)),
+]
@@ -0,0 +1,143 @@
+import abc
+import base64
+import binascii
+import hashlib
+import io
+import os
+import tempfile
+
+# Profil resimleri kullanıcı satırında değil, içerik adresli bir depoda tutulur.
+# users.profile_image alanında sadece "blob:<sha256>.<uzantı>" referansı kalır.
+BLOB_STORE_BACKEND = os.getenv("BLOB_STORE_BACKEND", "local")
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "blobs")
+THUMBNAIL_SIZES = tuple(int(s) for s in os.getenv("THUMBNAIL_SIZES", "64,256").split(",") if s.strip())
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", str(40_000_000)))
+
+BLOB_PREFIX = "blob:"
+
+_FORMATS = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "GIF": ("gif", "image/gif"),
+    "WEBP": ("webp", "image/webp"),
+}
+MIMETYPES = {ext: mimetype for ext, mimetype in _FORMATS.values()}
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+class BlobStore(abc.ABC):
+    # Yeni bir depolama arka ucu (S3 vb.) bu üç metodu sağlamalı; route'lar
+    # dosya yoluna değil open() ile dönen okunabilir nesneye dayanır
+    @abc.abstractmethod
+    def put(self, name, data):
+        """Blob'u yazar; aynı ad zaten varsa dokunmaz."""
+
+    @abc.abstractmethod
+    def exists(self, name):
+        """Blob depoda var mı."""
+
+    @abc.abstractmethod
+    def open(self, name):
+        """Blob'u ikili okuma için açar; yoksa FileNotFoundError yükseltir."""
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, name):
+        # İlk iki karakterle alt klasörlere bölünür, tek klasörde milyonlarca dosya birikmez
+        return os.path.join(self.root, name[:2], name)
+
+    def exists(self, name):
+        return os.path.exists(self.path(name))
+
+    def open(self, name):
+        return open(self.path(name), "rb")
+
+    def put(self, name, data):
+        path = self.path(name)
+        if os.path.exists(path):
+            return
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Aynı görseli aynı anda yükleyen thread'ler ayrı geçici dosyalara yazar;
+        # içerik aynı olduğu için os.replace'in hangisini son bıraktığı önemsizdir
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+
+def get_store():
+    if BLOB_STORE_BACKEND == "local":
+        return LocalBlobStore(BLOB_STORE_DIR)
+    raise ValueError(f"Bilinmeyen blob deposu: {BLOB_STORE_BACKEND}")
+
+
+store = get_store()
+
+
+def thumbnail_name(reference, size):
+    digest = reference.split(".", 1)[0]
+    return f"{digest}_{size}.jpg"
+
+
+def save_image(data):
+    # Pillow ağır bir import; sadece görsel işlenirken yüklenir
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if img.width * img.height > MAX_IMAGE_PIXELS:
+                raise InvalidImage("Görsel çok büyük")
+            fmt = _FORMATS.get(img.format)
+            if not fmt:
+                raise InvalidImage("Desteklenmeyen görsel formatı")
+            img.load()
+            thumbs = {}
+            for size in THUMBNAIL_SIZES:
+                thumb = img.convert("RGBA") if img.mode in ("P", "LA") else img.copy()
+                thumb.thumbnail((size, size))
+                if thumb.mode in ("RGBA", "LA"):
+                    background = Image.new("RGB", thumb.size, (255, 255, 255))
+                    background.paste(thumb, mask=thumb.getchannel("A"))
+                    thumb = background
+                else:
+                    thumb = thumb.convert("RGB")
+                out = io.BytesIO()
+                thumb.save(out, "JPEG", quality=85, optimize=True)
+                thumbs[size] = out.getvalue()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise InvalidImage("Görsel okunamadı")
+
+    reference = f"{hashlib.sha256(data).hexdigest()}.{fmt[0]}"
+    store.put(reference, data)
+    for size, thumb_data in thumbs.items():
+        store.put(thumbnail_name(reference, size), thumb_data)
+    return reference
+
+
+def migrate_data_url(value):
+    # Eski "data:<mime>;base64,..." kayıtları ilk okumada depoya taşınır
+    try:
+        _, encoded = value.split(",", 1)
+        return save_image(base64.b64decode(encoded))
+    except (ValueError, binascii.Error) as e:
+        raise InvalidImage(f"Geçersiz base64 görsel: {e}")
+
+
+def parse_reference(value):
+    if value and value.startswith(BLOB_PREFIX):
+        return value[len(BLOB_PREFIX):]
+    return None
@@ -0,0 +1,241 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+
+# Süreç içi (in-process) LRU önbellek: boyut ve TTL ile eviction yapar.
+# Birden fazla thread aynı anda kullanabileceği için tüm işlemler kilit altında.
+class TTLCache:
+    def __init__(self, maxsize=1024, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# Aynı anahtar için eşzamanlı kaçırmalar tek bir upstream çağrısında birleştirilir
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+# SingleFlight'ın asyncio karşılığı (ASGI modunda aynı event loop içinde)
+class AsyncSingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self.coalesced = 0
+
+    def in_flight(self, key):
+        return key in self._calls
+
+    async def do(self, key, fn):
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Bekleyen yoksa "exception was never retrieved" uyarısı çıkmasın
+            future.exception()
+            raise
+        finally:
+            del self._calls[key]
+
+
+# Süresi dolan kayıt hemen atılmaz: stale_ttl boyunca eski veri döner,
+# bu sırada arka planda yenilenir (stale-while-revalidate)
+class SWRCache:
+    def __init__(self, maxsize=1024, ttl=300, stale_ttl=0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl + stale_ttl)
+        self._flight = SingleFlight()
+        self._aflight = AsyncSingleFlight()
+        self._refresh_tasks = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _fetch_and_store(self, key, fetch):
+        value = fetch()
+        self._cache.set(key, (value, time.monotonic()))
+        return value
+
+    def _refresh(self, key, fetch):
+        try:
+            self._flight.do(key, lambda: self._fetch_and_store(key, fetch))
+            self._count("refreshes")
+        except Exception:
+            self._count("refresh_errors")
+
+    def get_or_fetch(self, key, fetch):
+        item = self._cache.get(key)
+        if item is not None:
+            value, fetched_at = item
+            if time.monotonic() - fetched_at <= self.ttl:
+                self._count("hits")
+                return value
+
+            self._count("stale_hits")
+            if not self._flight.in_flight(key):
+                threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+            return value
+
+        self._count("misses")
+        return self._flight.do(key, lambda: self._fetch_and_store(key, fetch))
+
+    async def _afetch_and_store(self, key, afetch):
+        value = await afetch()
+        self._cache.set(key, (value, time.monotonic()))
+        return value
+
+    async def _arefresh(self, key, afetch):
+        try:
+            await self._aflight.do(key, lambda: self._afetch_and_store(key, afetch))
+            self._count("refreshes")
+        except Exception:
+            self._count("refresh_errors")
+
+    async def aget_or_fetch(self, key, afetch):
+        # get_or_fetch ile aynı kayıtları paylaşır; bekleme thread yerine coroutine ile yapılır
+        item = self._cache.get(key)
+        if item is not None:
+            value, fetched_at = item
+            if time.monotonic() - fetched_at <= self.ttl:
+                self._count("hits")
+                return value
+
+            self._count("stale_hits")
+            if not self._aflight.in_flight(key):
+                task = asyncio.create_task(self._arefresh(key, afetch))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return value
+
+        self._count("misses")
+        return await self._aflight.do(key, lambda: self._afetch_and_store(key, afetch))
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self._flight.coalesced + self._aflight.coalesced,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+            }
+        stats["size"] = len(self._cache)
+        return stats
@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app.database import engine
+from app.models.review import Review
+from app.models.translation import Translation
+
+# Geçmiş dışa aktarımı: satırlar sunucu tarafı cursor ile (stream_results + yield_per)
+# parça parça okunur ve hemen yazılır; bellek kullanımı satır sayısından bağımsızdır.
+# Sıralama id üzerindendir; yarıda kalan indirme son alınan id ile (?cursor=<id>) sürdürülür.
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+
+EXPORT_COLUMNS = {
+    "translations": (Translation, ("id", "user_id", "original_text", "target_language", "translated_text", "created_at")),
+    "reviews": (Review, ("id", "user_id", "restaurant_name", "address", "rating", "review_text", "visited_at", "yelp_business_id")),
+}
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def parse_cursor(value):
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ExportError("Geçersiz cursor (son alınan id bekleniyor)")
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _batches(kind, user_id, after_id):
+    model, fields = EXPORT_COLUMNS[kind]
+    stmt = select(*(getattr(model, f) for f in fields)).order_by(model.id)
+    if user_id is not None:
+        stmt = stmt.where(model.user_id == user_id)
+    if after_id is not None:
+        stmt = stmt.where(model.id > after_id)
+
+    # İstekten bağımsız, akış boyunca açık kalan ayrı bir bağlantı kullanılır
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE).execute(stmt)
+        for rows in result.partitions():
+            yield rows
+
+
+def _encode_ndjson(fields, rows):
+    return "".join(
+        json.dumps({f: _value(v) for f, v in zip(fields, row)}, ensure_ascii=False) + "\n" for row in rows
+    )
+
+
+def _encode_csv(fields, rows, header):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    writer.writerows([_value(v) for v in row] for row in rows)
+    return buffer.getvalue()
+
+
+def stream(kind, fmt, user_id=None, after_id=None, gzip=False):
+    _, fields = EXPORT_COLUMNS[kind]
+    compressor = zlib.compressobj(EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31) if gzip else None
+
+    def encode(text):
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    # CSV başlığı sadece baştan başlayan indirmede yazılır
+    if fmt == "csv" and after_id is None:
+        yield encode(_encode_csv(fields, [], header=True))
+
+    for rows in _batches(kind, user_id, after_id):
+        chunk = encode(_encode_ndjson(fields, rows) if fmt == "ndjson" else _encode_csv(fields, rows, header=False))
+        if chunk:
+            yield chunk
+
+    if compressor:
+        yield compressor.flush()
@@ -1,11 +1,45 @@
-import firebase_admin
-from firebase_admin import credentials
 import os
+import threading
 
 # Ortam değişkeni ile JSON yolu esnekleştirilebilir (isteğe bağlı)
 FIREBASE_CRED_PATH = os.getenv("FIREBASE_CRED_PATH", "app/lingualens-a8688-firebase-adminsdk-fbsvc-df225ff4f7.json")
 
-# Firebase Admin SDK'yı başlat
-if not firebase_admin._apps:
-    cred = credentials.Certificate(FIREBASE_CRED_PATH)
-    firebase_admin.initialize_app(cred)
+# FIREBASE_ENABLED=0 ile (ör. benchmark / yerel geliştirme) Firebase başlatılmaz
+FIREBASE_ENABLED = os.getenv("FIREBASE_ENABLED", "1") == "1"
+
+_app = None
+_lock = threading.Lock()
+
+
+class FirebaseUnavailable(RuntimeError):
+    pass
+
+
+def get_app():
+    # Firebase Admin SDK ilk kullanımda başlatılır; worker açılışı kimlik
+    # dosyasına ya da firebase_admin import süresine bağlı kalmaz
+    global _app
+    if _app is not None:
+        return _app
+
+    with _lock:
+        if _app is None:
+            if not FIREBASE_ENABLED:
+                raise FirebaseUnavailable("Firebase devre dışı (FIREBASE_ENABLED=0)")
+
+            import firebase_admin
+            from firebase_admin import credentials
+
+            if firebase_admin._apps:
+                _app = firebase_admin.get_app()
+            else:
+                try:
+                    cred = credentials.Certificate(FIREBASE_CRED_PATH)
+                except (OSError, ValueError) as e:
+                    raise FirebaseUnavailable(f"Firebase kimlik bilgileri okunamadı: {e}")
+                _app = firebase_admin.initialize_app(cred)
+    return _app
+
+
+def is_initialized():
+    return _app is not None
@@ -0,0 +1,235 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from app import firebase_admin_init
+from app.database import SessionLocal, dialect_insert
+from app.models.sync_state import SyncState
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+SYNC_NAME = "firebase_users"
+SYNC_PAGE_SIZE = int(os.getenv("FIREBASE_SYNC_PAGE_SIZE", "1000"))
+SYNC_INSERT_CHUNK = int(os.getenv("FIREBASE_SYNC_INSERT_CHUNK", "500"))
+# Bu süre boyunca ilerleme kaydı güncellenmeyen "running" iş ölü kabul edilir
+SYNC_STALE_AFTER = int(os.getenv("FIREBASE_SYNC_STALE_AFTER", "300"))
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+class SyncAlreadyRunning(Exception):
+    pass
+
+
+def _split_name(display_name):
+    if not display_name:
+        return "", ""
+    parts = display_name.split(" ")
+    return parts[0], parts[1] if len(parts) > 1 else ""
+
+
+def _state(session):
+    state = session.get(SyncState, SYNC_NAME)
+    if state is None:
+        state = SyncState(name=SYNC_NAME, status="idle", processed=0, added=0, updated=0, skipped=0)
+        session.add(state)
+        session.flush()
+    return state
+
+
+def _insert_users(session, rows):
+    # Aynı e-posta ya da uid başka bir yoldan eklenmiş olabilir; çakışmalar sessizce atlanır
+    insert = dialect_insert(session.get_bind())
+    added = 0
+    for i in range(0, len(rows), SYNC_INSERT_CHUNK):
+        stmt = insert(User.__table__).values(rows[i:i + SYNC_INSERT_CHUNK])
+        result = session.execute(stmt.on_conflict_do_nothing())
+        added += max(result.rowcount, 0)
+    return added
+
+
+def _desired(firebase_user):
+    name, surname = _split_name(firebase_user.display_name)
+    return {"firebase_uid": firebase_user.uid, "email": firebase_user.email, "name": name, "surname": surname}
+
+
+def _update_user(session, user_id, changes):
+    # Yeni e-posta başka bir hesaba ait olabilir; o kullanıcı atlanır, sayfa devam eder
+    try:
+        with session.begin_nested():
+            session.execute(update(User).where(User.id == user_id).values(**changes))
+        return True
+    except IntegrityError:
+        return False
+
+
+def _sync_page(session, users):
+    # Firebase'de "son değişiklik" zamanı yok; her çalışma tüm listeyi veritabanıyla
+    # karşılaştırır: yeni kullanıcılar eklenir, e-posta / ad değişenler güncellenir.
+    # Karşılaştırma sayfa başına iki IN sorgusuyla yapılır.
+    candidates = {}
+    for firebase_user in users:
+        if firebase_user.email:
+            candidates[firebase_user.uid] = firebase_user
+    if not candidates:
+        return 0, 0, 0, 0
+
+    columns = (User.id, User.firebase_uid, User.email, User.name, User.surname, User.password)
+    by_uid = {row.firebase_uid: row for row in
+              session.query(*columns).filter(User.firebase_uid.in_(list(candidates))).all()}
+    unlinked = {u.email: uid for uid, u in candidates.items() if uid not in by_uid}
+    by_email = {row.email: row for row in
+                session.query(*columns).filter(User.email.in_(list(unlinked))).all()} if unlinked else {}
+
+    rows, added, updated, skipped = [], 0, 0, 0
+    for uid, firebase_user in candidates.items():
+        desired = _desired(firebase_user)
+        existing = by_uid.get(uid) or by_email.get(firebase_user.email)
+        if existing is None:
+            # Şifre zorunlu olduğu için dummy bir şifre kullanılıyor (login işleminde etkili değil)
+            rows.append(dict(desired, password="firebase-auth", profile_image=""))
+            continue
+        # Aynı e-postayla kendi şifresiyle kayıt olmuş hesaplara dokunulmaz
+        if existing.password != "firebase-auth" or (existing.firebase_uid or uid) != uid:
+            skipped += 1
+            continue
+        changes = {k: v for k, v in desired.items() if getattr(existing, k) != v}
+        if changes and _update_user(session, existing.id, changes):
+            updated += 1
+        else:
+            skipped += 1
+
+    if rows:
+        added = _insert_users(session, rows)
+        skipped += len(rows) - added
+    return len(candidates), added, updated, skipped
+
+
+def run_sync(full=False):
+    # start_sync() çalışmayı sahiplenmiş (status="running") olarak çağırır
+    session = SessionLocal()
+    try:
+        from firebase_admin import auth
+        firebase_app = firebase_admin_init.get_app()
+
+        state = _state(session)
+        if state.page_token and state.status != "done" and not full:
+            # Yarıda kalan çalışma checkpoint'ten devam eder
+            page_token = state.page_token
+            logger.info("Firebase senkronizasyonu checkpoint'ten devam ediyor")
+        else:
+            page_token = None
+            state.run_started_ms = int(time.time() * 1000)
+            state.processed = state.added = state.updated = state.skipped = 0
+            state.started_at = datetime.utcnow()
+
+        state.status = "running"
+        state.error = None
+        state.finished_at = None
+        state.updated_at = datetime.utcnow()
+        session.commit()
+
+        while True:
+            page = auth.list_users(page_token=page_token, max_results=SYNC_PAGE_SIZE, app=firebase_app)
+            processed, added, updated, skipped = _sync_page(session, page.users)
+
+            page_token = page.next_page_token or None
+            state.processed += processed
+            state.added += added
+            state.updated = (state.updated or 0) + updated
+            state.skipped += skipped
+            state.page_token = page_token
+            state.updated_at = datetime.utcnow()
+            # Her sayfa kendi transaction'ında yazılır, checkpoint ile birlikte
+            session.commit()
+
+            if not page_token:
+                break
+
+        state.status = "done"
+        state.last_synced_ms = state.run_started_ms
+        state.finished_at = datetime.utcnow()
+        session.commit()
+        logger.info("Firebase senkronizasyonu bitti: %s eklendi, %s güncellendi, %s değişmedi",
+                    state.added, state.updated, state.skipped)
+    except Exception as e:
+        session.rollback()
+        logger.exception("Firebase senkronizasyonu başarısız")
+        state = _state(session)
+        state.status = "failed"
+        state.error = str(e)
+        state.updated_at = datetime.utcnow()
+        session.commit()
+    finally:
+        session.close()
+
+
+def _claim():
+    # Tek bir UPDATE ile sahiplenilir: iki worker aynı anda denese de sadece birinin
+    # satırı değişir. İlerleme kaydı SYNC_STALE_AFTER'dan eski "running" iş ölü sayılır.
+    session = SessionLocal()
+    try:
+        insert = dialect_insert(session.get_bind())
+        session.execute(insert(SyncState.__table__)
+                        .values(name=SYNC_NAME, status="idle", processed=0, added=0, updated=0, skipped=0)
+                        .on_conflict_do_nothing(index_elements=["name"]))
+        now = datetime.utcnow()
+        result = session.execute(
+            update(SyncState)
+            .where(SyncState.name == SYNC_NAME,
+                   or_(SyncState.status != "running", SyncState.updated_at.is_(None),
+                       SyncState.updated_at < now - timedelta(seconds=SYNC_STALE_AFTER)))
+            .values(status="running", error=None, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        return result.rowcount == 1
+    finally:
+        session.close()
+
+
+def start_sync(full=False):
+    global _thread
+    with _thread_lock:
+        if _thread is not None and _thread.is_alive():
+            raise SyncAlreadyRunning("Senkronizasyon zaten çalışıyor")
+
+        # Firebase ilk kez burada başlatılır; kimlik bilgisi yoksa iş hiç başlamaz
+        firebase_admin_init.get_app()
+
+        # Başka bir worker süreci de çalıştırıyor olabilir
+        if not _claim():
+            raise SyncAlreadyRunning("Senkronizasyon zaten çalışıyor")
+
+        _thread = threading.Thread(target=run_sync, kwargs={"full": full}, name="firebase-sync", daemon=True)
+        _thread.start()
+
+
+def status():
+    session = SessionLocal()
+    try:
+        state = session.get(SyncState, SYNC_NAME)
+        if state is None:
+            return {"status": "idle"}
+        return {
+            "status": state.status,
+            "processed": state.processed,
+            "added": state.added,
+            "updated": state.updated or 0,
+            "skipped": state.skipped,
+            "resumable": bool(state.page_token) and state.status != "done",
+            "last_synced_at": datetime.utcfromtimestamp(state.last_synced_ms / 1000).isoformat() if state.last_synced_ms else None,
+            "started_at": state.started_at.isoformat() if state.started_at else None,
+            "finished_at": state.finished_at.isoformat() if state.finished_at else None,
+            "updated_at": state.updated_at.isoformat() if state.updated_at else None,
+            "error": state.error,
+        }
+    finally:
+        session.close()
@@ -0,0 +1,212 @@
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app import metrics
+
+# Dış servislere (Yelp, LibreTranslate) giden tüm istekler bu katmandan geçer:
+# upstream başına keep-alive bağlantı havuzu, ayrı connect/read timeout,
+# idempotent çağrılar için jitter'lı sınırlı retry ve circuit breaker.
+
+RETRY_STATUSES = {429, 502, 503, 504}
+# Yan etkisiz metotlar; okuma zaman aşımında sadece bunlar tekrar denenir
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    pass
+
+
+def _env(name, key, default, cast=float):
+    return cast(os.getenv(f"{name.upper()}_{key}", os.getenv(f"HTTP_{key}", default)))
+
+
+class CircuitBreaker:
+    # Art arda failure_threshold hata olunca devre açılır; reset_timeout sonra
+    # tek bir deneme isteğine izin verilir (half-open), başarılıysa devre kapanır
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            return False
+
+    def retry_after(self):
+        return max(0, int(self.reset_timeout - (time.monotonic() - self.opened_at)) + 1)
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        # Deneme isteği sonuçlanmadan kesildi (iptal, KeyboardInterrupt): servis sağlığı
+        # hakkında bilgi yok; devre açık duruma döner, bir sonraki istek yeni deneme olur
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+
+
+class Upstream:
+    def __init__(self, name):
+        self.name = name
+        self.connect_timeout = _env(name, "CONNECT_TIMEOUT", "3")
+        self.read_timeout = _env(name, "READ_TIMEOUT", "10")
+        self.max_retries = _env(name, "MAX_RETRIES", "2", int)
+        self.backoff_base = _env(name, "BACKOFF_BASE", "0.1")
+        self.backoff_max = _env(name, "BACKOFF_MAX", "2")
+        self.breaker = CircuitBreaker(
+            failure_threshold=_env(name, "BREAKER_THRESHOLD", "5", int),
+            reset_timeout=_env(name, "BREAKER_RESET", "30"),
+        )
+
+        self.pool_size = _env(name, "POOL_SIZE", "20", int)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.short_circuited = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def _record(self, elapsed, error):
+        with self._lock:
+            self.requests += 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+            if error:
+                self.errors += 1
+        metrics.observe_upstream(self.name, elapsed, error)
+
+    # Retry / breaker / sayaç kararları; senkron (requests) ve asenkron (async_http, httpx)
+    # istemciler sadece taşıma çağrısını kendileri yapar, gerisi burada ortaktır
+
+    def attempt_plan(self, method, idempotent=None):
+        # (yan etkisiz mi, toplam deneme sayısı)
+        safe = method.upper() in SAFE_METHODS
+        if idempotent is None:
+            idempotent = safe
+        return safe, 1 + (self.max_retries if idempotent else 0)
+
+    def check_circuit(self):
+        if not self.breaker.allow():
+            with self._lock:
+                self.short_circuited += 1
+            raise CircuitOpenError(f"{self.name} servisi şu an kullanılamıyor (circuit open)")
+
+    def transport_failed(self, started, attempt, attempts, unsafe_read_timeout):
+        # Bağlantı / zaman aşımı hatası; tekrar denenecekse True döner.
+        # Okuma zaman aşımında istek sunucuya ulaşmış olabilir; POST tekrarlanmaz
+        self._record(time.perf_counter() - started, True)
+        self.breaker.record_failure()
+        return attempt + 1 < attempts and not unsafe_read_timeout
+
+    def unexpected_failure(self, started):
+        # Beklenmeyen hata da başarısızlık sayılır; yoksa half-open deneme asılı kalır
+        self._record(time.perf_counter() - started, True)
+        self.breaker.record_failure()
+
+    def attempt_cancelled(self):
+        # İptal edilen (KeyboardInterrupt, CancelledError) deneme servis hakkında bilgi vermez
+        self.breaker.release_probe()
+
+    def response_received(self, response, started, attempt, attempts):
+        # Yanıt çağırana dönecekse True; 429 / 5xx ise ve deneme hakkı varsa False
+        failed = response.status_code >= 500
+        self._record(time.perf_counter() - started, failed or response.status_code == 429)
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response.status_code not in RETRY_STATUSES or attempt + 1 >= attempts
+
+    def retry_delay(self, attempt):
+        # "full jitter": aynı anda düşen istemciler aynı anda tekrar denemesin
+        with self._lock:
+            self.retries += 1
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method, url, idempotent=None, **kwargs):
+        safe, attempts = self.attempt_plan(method, idempotent)
+        kwargs.setdefault("timeout", (self.connect_timeout, self.read_timeout))
+
+        for attempt in range(attempts):
+            self.check_circuit()
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not self.transport_failed(start, attempt, attempts,
+                                             isinstance(e, requests.exceptions.ReadTimeout) and not safe):
+                    raise
+            except Exception:
+                self.unexpected_failure(start)
+                raise
+            except BaseException:
+                self.attempt_cancelled()
+                raise
+            else:
+                if self.response_received(response, start, attempt, attempts):
+                    return response
+            time.sleep(self.retry_delay(attempt))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "short_circuited": self.short_circuited,
+                "avg_latency_ms": round(self.latency_total / self.requests * 1000, 1) if self.requests else 0.0,
+                "max_latency_ms": round(self.latency_max * 1000, 1),
+                "circuit": self.breaker.state,
+                "circuit_opened": self.breaker.times_opened,
+            }
+
+
+libretranslate = Upstream("libretranslate")
+yelp = Upstream("yelp")
+
+UPSTREAMS = {
+    "libretranslate": libretranslate,
+    "yelp": yelp,
+}
+
+
+def stats():
+    return {name: upstream.stats() for name, upstream in UPSTREAMS.items()}
@@ -0,0 +1,209 @@
+import os
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import tuple_
+
+from app import stats
+from app.database import dialect_insert
+from app.models.review import Review
+from app.models.translation import Translation
+from app.models.user import User
+
+# Çevrimdışı kullanımdan dönen istemcilerin kuyruğu tek istekte yazılır
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "1000"))
+BULK_INSERT_CHUNK = int(os.getenv("BULK_INSERT_CHUNK", "500"))
+
+
+class ItemError(ValueError):
+    pass
+
+
+def _require(item, fields):
+    if not isinstance(item, dict):
+        raise ItemError("Kayıt bir nesne olmalı")
+    missing = [f for f in fields if item.get(f) in (None, "")]
+    if missing:
+        raise ItemError(f"Eksik alanlar: {', '.join(missing)}")
+
+
+def _string(item, field, max_length=None):
+    # Kolon tipine uymayan değerler INSERT'te tüm batch'i düşürmesin diye
+    # kayıt bazında reddedilir
+    value = item[field]
+    if not isinstance(value, str):
+        raise ItemError(f"{field} metin olmalı")
+    if max_length is not None and len(value) > max_length:
+        raise ItemError(f"{field} en fazla {max_length} karakter olabilir")
+    return value
+
+
+def _user_id(item):
+    if isinstance(item["user_id"], bool):
+        raise ItemError("Geçersiz user_id")
+    try:
+        return int(item["user_id"])
+    except (TypeError, ValueError):
+        raise ItemError("Geçersiz user_id")
+
+
+def _idempotency_key(item):
+    key = item.get("idempotency_key")
+    if key is None:
+        return None
+    if isinstance(key, bool) or not isinstance(key, (str, int)):
+        raise ItemError("idempotency_key metin olmalı")
+    key = str(key)
+    if len(key) > 64:
+        raise ItemError("idempotency_key en fazla 64 karakter olabilir")
+    return key
+
+
+# Toplu yükleme ve tekil yorum kaydı (POST /reviews) aynı kuralı kullanır
+def yelp_business_id(item):
+    value = item.get("yelp_business_id")
+    if value in (None, ""):
+        return None
+    if not isinstance(value, str):
+        raise ItemError("yelp_business_id metin olmalı")
+    if len(value) > 64:
+        raise ItemError("yelp_business_id en fazla 64 karakter olabilir")
+    return value
+
+
+def _timestamp(item, field):
+    value = item.get(field)
+    if not value:
+        return datetime.utcnow()
+    if not isinstance(value, str):
+        raise ItemError(f"Geçersiz {field}")
+    try:
+        value = datetime.fromisoformat(value)
+    except ValueError:
+        raise ItemError(f"Geçersiz {field}")
+    # Kolonlar saat dilimsiz UTC tutar; ofsetli zamanlar UTC'ye çevrilir
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def translation_row(item):
+    _require(item, ("user_id", "original_text", "target_language", "translated_text"))
+    return {
+        "user_id": _user_id(item),
+        "original_text": _string(item, "original_text"),
+        "target_language": _string(item, "target_language", 10),
+        "translated_text": _string(item, "translated_text"),
+        "created_at": _timestamp(item, "created_at"),
+        "idempotency_key": _idempotency_key(item),
+    }
+
+
+def review_row(item):
+    _require(item, ("user_id", "restaurant_name", "address", "rating", "review_text"))
+    if isinstance(item["rating"], bool) or not isinstance(item["rating"], (str, int, float)):
+        raise ItemError("Geçersiz rating")
+    try:
+        rating = Decimal(str(item["rating"]))
+    except InvalidOperation:
+        raise ItemError("Geçersiz rating")
+    if not rating.is_finite():
+        raise ItemError("Geçersiz rating")
+    return {
+        "user_id": _user_id(item),
+        "restaurant_name": _string(item, "restaurant_name", 100),
+        "address": _string(item, "address"),
+        "rating": rating,
+        "review_text": _string(item, "review_text"),
+        "visited_at": _timestamp(item, "visited_at"),
+        "idempotency_key": _idempotency_key(item),
+        "yelp_business_id": yelp_business_id(item),
+    }
+
+
+def bulk_ingest(session, model, items, row_builder, on_created=None):
+    # Tüm kayıtlar tek geçişte doğrulanır, geçerli olanlar tek transaction'da
+    # çok satırlı INSERT ile yazılır. Sonuçlar girdi sırasıyla döner.
+    # on_created(session, rows): sadece yeni yazılan satırlar için (ör. istatistikler)
+    results = [None] * len(items)
+    rows = []
+    for i, item in enumerate(items):
+        try:
+            rows.append((i, row_builder(item)))
+        except ItemError as e:
+            results[i] = {"index": i, "status": "error", "error": str(e)}
+
+    user_ids = {row["user_id"] for _, row in rows}
+    known_users = {
+        uid for (uid,) in session.query(User.id).filter(User.id.in_(user_ids)).all()
+    } if user_ids else set()
+
+    keyed, unkeyed, seen = [], [], {}
+    for i, row in rows:
+        if row["user_id"] not in known_users:
+            results[i] = {"index": i, "status": "error", "error": "Kullanıcı bulunamadı"}
+        elif row["idempotency_key"] is None:
+            unkeyed.append((i, row))
+        elif (row["user_id"], row["idempotency_key"]) in seen:
+            # Aynı istekte aynı anahtar iki kez gelmiş
+            results[i] = {"index": i, "status": "duplicate", "duplicate_of": seen[(row["user_id"], row["idempotency_key"])]}
+        else:
+            seen[(row["user_id"], row["idempotency_key"])] = i
+            keyed.append((i, row))
+
+    table = model.__table__
+    insert = dialect_insert(session.get_bind())
+
+    for start in range(0, len(unkeyed), BULK_INSERT_CHUNK):
+        chunk = unkeyed[start:start + BULK_INSERT_CHUNK]
+        ids = session.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True),
+            [row for _, row in chunk]
+        ).scalars().all()
+        for (i, _), row_id in zip(chunk, ids):
+            results[i] = {"index": i, "status": "created", "id": row_id}
+
+    created = {}
+    for start in range(0, len(keyed), BULK_INSERT_CHUNK):
+        chunk = [row for _, row in keyed[start:start + BULK_INSERT_CHUNK]]
+        stmt = insert(table).values(chunk) \
+            .on_conflict_do_nothing(index_elements=["user_id", "idempotency_key"]) \
+            .returning(table.c.id, table.c.user_id, table.c.idempotency_key)
+        for row_id, user_id, key in session.execute(stmt):
+            created[(user_id, key)] = row_id
+
+    # Daha önce yazılmış (tekrar gönderilen) kayıtların mevcut id'leri bulunur
+    duplicates = [(row["user_id"], row["idempotency_key"]) for _, row in keyed
+                  if (row["user_id"], row["idempotency_key"]) not in created]
+    existing = {}
+    for start in range(0, len(duplicates), BULK_INSERT_CHUNK):
+        chunk = duplicates[start:start + BULK_INSERT_CHUNK]
+        existing.update({
+            (user_id, key): row_id for row_id, user_id, key in
+            session.query(model.id, model.user_id, model.idempotency_key)
+            .filter(tuple_(model.user_id, model.idempotency_key).in_(chunk)).all()
+        })
+
+    for i, row in keyed:
+        pair = (row["user_id"], row["idempotency_key"])
+        if pair in created:
+            results[i] = {"index": i, "status": "created", "id": created[pair]}
+        else:
+            results[i] = {"index": i, "status": "duplicate", "id": existing.get(pair)}
+
+    if on_created:
+        on_created(session, [row for _, row in unkeyed] + [row for _, row in keyed if (row["user_id"], row["idempotency_key"]) in created])
+
+    for result in results:
+        if result["status"] == "duplicate" and "duplicate_of" in result:
+            result["id"] = results[result.pop("duplicate_of")].get("id")
+
+    return results
+
+
+def ingest_translations(session, items):
+    return bulk_ingest(session, Translation, items, translation_row, on_created=stats.record_translations)
+
+
+def ingest_reviews(session, items):
+    return bulk_ingest(session, Review, items, review_row, on_created=stats.record_reviews)
@@ -0,0 +1,94 @@
+import json
+import logging
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request
+
+# Yapılandırılmış (JSON satırı) loglama. WARNING altındaki kayıtlar LOG_SAMPLE_RATE
+# oranında örneklenir; uyarı ve hatalar her zaman yazılır. İstek gövdeleri,
+# şifreler ve çeviri metinleri loglanmaz, sadece boyut/kimlik gibi alanlar yazılır.
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json | text
+
+# Modüller logging.getLogger(__name__) kullanır; hepsi "app" altında toplanır
+ROOT_LOGGER = "app"
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1.0 or random.random() < self.rate
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        if has_request_context():
+            payload["request_id"] = g.get("request_id")
+            payload["method"] = request.method
+            payload["route"] = request.url_rule.rule if request.url_rule is not None else request.path
+        payload.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+def setup():
+    logger = logging.getLogger(ROOT_LOGGER)
+    if logger.handlers:
+        return logger
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+    if LOG_FORMAT == "text":
+        handler.setFormatter(TextFormatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    else:
+        handler.setFormatter(JSONFormatter())
+
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+    return logger
+
+
+def event(logger, level, name, exc_info=False, **fields):
+    # Seviye kapalıysa kayıt hiç oluşturulmaz
+    if logger.isEnabledFor(level):
+        logger.log(level, name, exc_info=exc_info, extra={"fields": fields})
+
+
+def init_app(app):
+    setup()
+
+    @app.before_request
+    def _assign_request_id():
+        g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+
+    @app.after_request
+    def _echo_request_id(response):
+        if "request_id" in g:
+            response.headers["X-Request-ID"] = g.request_id
+        return response
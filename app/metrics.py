@@ -0,0 +1,298 @@
+import bisect
+import threading
+import time
+
+from flask import g, request
+from sqlalchemy import event
+
+# Prometheus metin formatında (/metrics) sunulan süreç içi metrikler.
+# Etiketler düşük kardinaliteli tutulur: route şablonu (/translations/<int:user_id>), method, status.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # etiketler -> [bucket sayıları..., toplam, adet]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for label_values, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labels + ("le",), label_values + (_format_value(float(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels + ("le",), label_values + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {series[-1]}")
+        return lines
+
+
+class Gauge:
+    # Değeri okunma anında bir fonksiyondan alınır: fn() -> {(etiket değerleri): değer}
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels, fn):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.fn = fn
+
+    def render(self):
+        try:
+            items = sorted(self.fn().items())
+        except Exception:
+            return []
+        return [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}" for k, v in items]
+
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+http_requests = register(Counter(
+    "lingualens_http_requests_total", "HTTP istek sayısı", ("route", "method", "status")))
+http_latency = register(Histogram(
+    "lingualens_http_request_duration_seconds", "İstek süresi", ("route", "method")))
+http_db_queries = register(Histogram(
+    "lingualens_http_request_db_queries", "İstek başına DB sorgu sayısı", ("route",), QUERY_COUNT_BUCKETS))
+http_db_time = register(Histogram(
+    "lingualens_http_request_db_seconds", "İstek başına toplam DB süresi", ("route",)))
+http_upstream_time = register(Histogram(
+    "lingualens_http_request_upstream_seconds", "İstek başına dış servis süresi", ("route", "upstream")))
+db_queries = register(Histogram(
+    "lingualens_db_query_duration_seconds", "Tekil DB sorgu süresi", ("operation",)))
+upstream_calls = register(Histogram(
+    "lingualens_upstream_request_duration_seconds", "Dış servis çağrı süresi (deneme başına)", ("upstream", "outcome")))
+
+
+def _pool_gauge():
+    from app.database import pool_stats
+    stats = pool_stats()
+    return {(key,): stats[key] for key in ("checked_out", "checked_in", "overflow")}
+
+
+def _circuit_gauge():
+    from app.http_client import UPSTREAMS
+    return {(name,): int(upstream.breaker.state != "closed") for name, upstream in UPSTREAMS.items()}
+
+
+def _ocr_gauge():
+    from app.ocr import engine
+    stats = engine.stats()
+    return {(key,): stats[key] for key in ("queue_depth", "tracked_jobs")}
+
+
+register(Gauge("lingualens_db_pool_connections", "Bağlantı havuzu durumu", ("state",), _pool_gauge))
+register(Gauge("lingualens_upstream_circuit_open", "Circuit breaker açık mı (1/0)", ("upstream",), _circuit_gauge))
+register(Gauge("lingualens_ocr_jobs", "OCR kuyruğu", ("state",), _ocr_gauge))
+
+# Worker açılış süreleri (main.py): import ve create_app aşamaları
+STARTUP_SECONDS = {}
+register(Gauge("lingualens_startup_seconds", "Worker açılış süresi", ("phase",),
+                lambda: {(phase,): round(seconds, 4) for phase, seconds in STARTUP_SECONDS.items()}))
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# İstek bazlı sayaçlar istek thread'ine bağlıdır. Başka thread'lerde (ör. toplu
+# çevirinin upstream havuzu) yapılan çağrılar yalnızca genel metriklere yazılır.
+_local = threading.local()
+
+
+class RequestStats:
+    __slots__ = ("db_queries", "db_seconds", "upstream_seconds")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.upstream_seconds = {}
+
+
+def current_stats():
+    return getattr(_local, "stats", None)
+
+
+def begin_request():
+    _local.stats = RequestStats()
+    return _local.stats
+
+
+def end_request():
+    stats = current_stats()
+    _local.stats = None
+    return stats
+
+
+def observe_upstream(name, elapsed, error):
+    upstream_calls.observe(elapsed, name, "error" if error else "ok")
+    stats = current_stats()
+    if stats is not None:
+        stats.upstream_seconds[name] = stats.upstream_seconds.get(name, 0.0) + elapsed
+
+
+def observe_request(route, method, status, elapsed, stats=None):
+    http_requests.inc(route, method, str(status))
+    http_latency.observe(elapsed, route, method)
+    if stats is not None:
+        http_db_queries.observe(stats.db_queries, route)
+        http_db_time.observe(stats.db_seconds, route)
+        for name, seconds in stats.upstream_seconds.items():
+            http_upstream_time.observe(seconds, route, name)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    db_queries.observe(elapsed, operation)
+    stats = current_stats()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+def _on_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _on_error)
+
+
+def _route_label():
+    # Eşleşmeyen (404) istekler tek etikette toplanır
+    return request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+
+
+def init_app(app):
+    @app.before_request
+    def _start_timer():
+        g.request_started = time.perf_counter()
+        begin_request()
+
+    @app.after_request
+    def _record(response):
+        # Akışlı yanıtlarda süre, gövde akmaya başlamadan önceki süreyi ölçer
+        started = g.pop("request_started", None)
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            g.request_elapsed = elapsed
+            observe_request(_route_label(), request.method, response.status_code, elapsed, current_stats())
+        return response
+
+    @app.teardown_request
+    def _finish(exception=None):
+        # after_request çalışmadan biten (yakalanmamış hata) istekler 500 olarak sayılır
+        started = g.pop("request_started", None)
+        if started is not None:
+            observe_request(_route_label(), request.method, 500, time.perf_counter() - started, current_stats())
+        end_request()
+
+
+class ASGIMetricsMiddleware:
+    # ASGI modunda doğrudan Starlette'te çalışan route'lar için; Flask'a
+    # (Mount) düşen istekler Flask tarafında zaten ölçülür
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        from starlette.routing import Mount
+
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            if route is not None and not isinstance(route, Mount):
+                observe_request(route.path, scope["method"], status["code"], time.perf_counter() - started)
+
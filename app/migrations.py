@@ -0,0 +1,208 @@
+# Şema yönetimi: tablolar artık uygulama açılışında değil, dağıtım adımında oluşturulur.
+#   python -m app.migrations upgrade     (ya da: flask --app main init-db)
+#   python -m app.migrations status
+# Her migration tekrar çalıştırılabilir (idempotent) yazılır: mevcut tablo, kolon ve
+# index'ler kontrol edilip sadece eksik olanlar eklenir. Böylece eski create_all ile
+# kurulmuş veritabanları da aynı sürüme getirilir.
+import argparse
+import sys
+import threading
+
+from sqlalchemy import inspect, select, text
+
+from app.database import Base, engine
+from app.search import SEARCH_COLUMNS, SEARCH_TS_CONFIG
+from app.models.restaurant import Restaurant
+from app.models.review import Review  # noqa: F401  (create_all için modeller kaydedilir)
+from app.models.schema_migration import SchemaMigration
+from app.models.stats import PhraseStat, RestaurantStat, UserLanguageStat
+from app.models.sync_state import SyncState  # noqa: F401
+from app.models.translation import Translation  # noqa: F401
+from app.models.translation_cache import TranslationCacheEntry  # noqa: F401
+from app.models.translation_memory import TranslationMemoryEntry
+from app.models.user import User  # noqa: F401
+
+MIGRATIONS = []
+
+# Aynı anda birden fazla dağıtımın migration çalıştırmasını engeller (PostgreSQL)
+ADVISORY_LOCK_ID = 7213418
+
+_current = False
+_current_lock = threading.Lock()
+
+
+def migration(version, name):
+    def register(fn):
+        MIGRATIONS.append((version, name, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+def _has_column(conn, table, column):
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+
+def _has_index(conn, table, name):
+    inspector = inspect(conn)
+    names = {i["name"] for i in inspector.get_indexes(table)}
+    names |= {u["name"] for u in inspector.get_unique_constraints(table)}
+    return name in names
+
+
+def add_column(conn, table, column, ddl_type):
+    if not _has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+
+
+def create_index(conn, table, name, columns, unique=False):
+    if not _has_index(conn, table, name):
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        conn.execute(text(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})"))
+
+
+@migration(1, "initial schema")
+def _initial_schema(conn):
+    # Eksik tabloları güncel modellere göre oluşturur (mevcut tablolara dokunmaz)
+    Base.metadata.create_all(bind=conn)
+
+
+@migration(2, "idempotency keys for offline sync")
+def _idempotency_keys(conn):
+    for table in ("translation_history", "restaurant_reviews"):
+        add_column(conn, table, "idempotency_key", "VARCHAR(64)")
+        create_index(conn, table, f"uq_{table}_user_idempotency", ("user_id", "idempotency_key"), unique=True)
+
+
+@migration(3, "keyset pagination indexes")
+def _history_indexes(conn):
+    create_index(conn, "translation_history", "ix_translation_history_user_created", ("user_id", "created_at", "id"))
+    create_index(conn, "restaurant_reviews", "ix_restaurant_reviews_user_visited", ("user_id", "visited_at", "id"))
+
+
+@migration(4, "history search indexes")
+def _search_indexes(conn):
+    # Sadece PostgreSQL: tsvector (GIN) + pg_trgm. Diğer veritabanları LIKE ile arar.
+    # Not: generated kolon eklemek tabloyu yeniden yazar; büyük tablolarda bakım penceresinde çalıştırın.
+    if conn.dialect.name != "postgresql":
+        return
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for table, (primary, secondary) in SEARCH_COLUMNS.items():
+        conn.execute(text(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('{SEARCH_TS_CONFIG}', coalesce({primary}, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_TS_CONFIG}', coalesce({secondary}, '')), 'B')) STORED"
+        ))
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} USING gin (search_vector)"))
+        for column in (primary, secondary):
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm ON {table} USING gin ({column} gin_trgm_ops)"
+            ))
+
+
+@migration(5, "stats rollup tables")
+def _stats_rollups(conn):
+    # Tablolar oluşturulur ve mevcut geçmişten doldurulur
+    from app import stats
+    tables = [UserLanguageStat.__table__, PhraseStat.__table__, RestaurantStat.__table__]
+    Base.metadata.create_all(bind=conn, tables=tables)
+    stats.rebuild(conn)
+
+
+@migration(6, "segment translation memory")
+def _translation_memory(conn):
+    # Tablo oluşturulur ve kalıcı çeviri önbelleğinden doldurulur
+    from app import translation_memory
+    Base.metadata.create_all(bind=conn, tables=[TranslationMemoryEntry.__table__])
+    translation_memory.backfill(conn)
+
+
+@migration(7, "local restaurant index")
+def _restaurant_index(conn):
+    # Mevcut yorumlar serbest metin ad / adresle kalır; yeni yorumlar yelp_business_id ile bağlanır
+    Base.metadata.create_all(bind=conn, tables=[Restaurant.__table__])
+    add_column(conn, "restaurant_reviews", "yelp_business_id", "VARCHAR(64)")
+    create_index(conn, "restaurant_reviews", "ix_restaurant_reviews_yelp_visited", ("yelp_business_id", "visited_at"))
+
+
+@migration(8, "firebase uid for user sync")
+def _firebase_uid(conn):
+    # Mevcut Firebase kullanıcıları bir sonraki senkronizasyonda e-posta ile eşlenip uid alır
+    add_column(conn, "users", "firebase_uid", "VARCHAR(128)")
+    create_index(conn, "users", "uq_users_firebase_uid", ("firebase_uid",), unique=True)
+    add_column(conn, "sync_state", "updated", "INTEGER DEFAULT 0")
+
+
+@migration(9, "translation memory keyed by source language")
+def _translation_memory_source(conn):
+    # Eski tablo istemcinin gönderdiği geçmiş kayıtlarıyla da beslenmişti ve kaynak dili
+    # tutmuyordu; tablo yeniden kurulup sadece çeviri önbelleğinden (upstream yanıtları) doldurulur
+    from app import translation_memory
+    if _has_column(conn, "translation_memory", "source_language"):
+        return
+    TranslationMemoryEntry.__table__.drop(bind=conn)
+    Base.metadata.create_all(bind=conn, tables=[TranslationMemoryEntry.__table__])
+    translation_memory.backfill(conn)
+
+
+def applied_versions(conn):
+    if not inspect(conn).has_table(SchemaMigration.__tablename__):
+        return set()
+    return set(conn.execute(select(SchemaMigration.version)).scalars())
+
+
+def pending(bind=None):
+    with (bind or engine).connect() as conn:
+        applied = applied_versions(conn)
+    return [(version, name) for version, name, _ in MIGRATIONS if version not in applied]
+
+
+def upgrade(bind=None):
+    # Tüm adımlar tek transaction'da uygulanır (PostgreSQL'de DDL de geri alınabilir)
+    applied_now = []
+    with (bind or engine).begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+        SchemaMigration.__table__.create(bind=conn, checkfirst=True)
+        applied = applied_versions(conn)
+        for version, name, fn in MIGRATIONS:
+            if version in applied:
+                continue
+            fn(conn)
+            conn.execute(SchemaMigration.__table__.insert().values(version=version, name=name))
+            applied_now.append((version, name))
+    return applied_now
+
+
+def is_current():
+    # Hazırlık kontrolü için: şema bir kez güncel görüldükten sonra tekrar sorgulanmaz
+    global _current
+    if not _current:
+        with _current_lock:
+            _current = not pending()
+    return _current
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LinguaLens şema migration'ları")
+    parser.add_argument("command", choices=("upgrade", "status"))
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade":
+        applied = upgrade()
+        for version, name in applied:
+            print(f"uygulandı: {version:04d} {name}")
+        if not applied:
+            print("Şema güncel")
+        return 0
+
+    remaining = pending()
+    for version, name in remaining:
+        print(f"bekliyor: {version:04d} {name}")
+    if not remaining:
+        print("Şema güncel")
+    return 1 if remaining else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
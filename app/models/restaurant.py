@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Text, Numeric, Float, DateTime, JSON, Index
+from datetime import datetime
+from app.database import Base
+
+# Yelp'ten geçen işletmelerin yerel kopyası (app/restaurants.py).
+# Yakındaki aramalar geo_cell (geohash öneki) index'i üzerinden yerelde yanıtlanır;
+# PostGIS gerekmez.
+class Restaurant(Base):
+    __tablename__ = "restaurants"
+    __table_args__ = (
+        Index("ix_restaurants_geo_cell", "geo_cell", "updated_at"),
+    )
+
+    yelp_id = Column(String(64), primary_key=True)
+    name = Column(String(200), nullable=False)
+    address = Column(Text)
+    categories = Column(Text)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    geohash = Column(String(12), nullable=False)
+    geo_cell = Column(String(12), nullable=False)
+    rating = Column(Numeric)
+    review_count = Column(Integer)
+    # Yelp'in döndürdüğü işletme nesnesi; yerel yanıtlar aynı biçimde döner
+    data = Column(JSON, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
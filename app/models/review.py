@@ -1,9 +1,17 @@
-from sqlalchemy import Column, Integer, String, Text, Numeric, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Numeric, ForeignKey, DateTime, Index, UniqueConstraint
 from datetime import datetime
 from app.database import Base
 
 class Review(Base):
     __tablename__ = "restaurant_reviews"
+    __table_args__ = (
+        # Çevrimdışı kuyruktan tekrar gönderilen kayıtlar çift yazılmasın
+        UniqueConstraint("user_id", "idempotency_key", name="uq_restaurant_reviews_user_idempotency"),
+        # Geçmiş sayfalaması (user_id, visited_at, id) üzerinden yapılır
+        Index("ix_restaurant_reviews_user_visited", "user_id", "visited_at", "id"),
+        # Restoran detayı: Yelp işletmesine bağlı yorumlar
+        Index("ix_restaurant_reviews_yelp_visited", "yelp_business_id", "visited_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -12,3 +20,6 @@ class Review(Base):
     rating = Column(Numeric)
     review_text = Column(Text)
     visited_at = Column(DateTime, default=datetime.utcnow)
+    idempotency_key = Column(String(64), nullable=True)
+    # Yorum bir Yelp işletmesine bağlıysa (restaurants.yelp_id)
+    yelp_business_id = Column(String(64), nullable=True)
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, Index
+from app.database import Base
+
+# Dashboard istatistikleri için özet (rollup) tabloları. Kayıt eklenirken aynı
+# transaction'da artımlı güncellenir (app/stats.py); "python -m app.stats rebuild"
+# ile geçmişten yeniden hesaplanabilir.
+
+class UserLanguageStat(Base):
+    __tablename__ = "user_language_stats"
+
+    user_id = Column(Integer, primary_key=True)
+    target_language = Column(String(10), primary_key=True)
+    translation_count = Column(Integer, nullable=False, default=0)
+
+
+class PhraseStat(Base):
+    __tablename__ = "phrase_stats"
+    __table_args__ = (
+        # Kullanıcının en çok çevirdiği ifadeler
+        Index("ix_phrase_stats_user_count", "user_id", "translation_count"),
+    )
+
+    user_id = Column(Integer, primary_key=True)
+    phrase_key = Column(String(64), primary_key=True)
+    phrase = Column(Text, nullable=False)
+    translation_count = Column(Integer, nullable=False, default=0)
+    last_translated_at = Column(DateTime, nullable=True)
+
+
+class RestaurantStat(Base):
+    __tablename__ = "restaurant_stats"
+    __table_args__ = (
+        Index("ix_restaurant_stats_review_count", "review_count"),
+    )
+
+    restaurant_key = Column(String(64), primary_key=True)
+    restaurant_name = Column(String(100), nullable=False)
+    address = Column(Text)
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Numeric, nullable=False, default=0)
+    last_review_at = Column(DateTime, nullable=True)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Text, BigInteger, DateTime
+from datetime import datetime
+from app.database import Base
+
+# Arka plan senkronizasyon işlerinin checkpoint ve ilerleme kaydı
+class SyncState(Base):
+    __tablename__ = "sync_state"
+
+    name = Column(String(50), primary_key=True)
+    status = Column(String(20), nullable=False, default="idle")
+    page_token = Column(Text, nullable=True)
+    run_started_ms = Column(BigInteger, nullable=True)
+    last_synced_ms = Column(BigInteger, nullable=True)
+    processed = Column(Integer, default=0)
+    added = Column(Integer, default=0)
+    updated = Column(Integer, default=0)
+    skipped = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
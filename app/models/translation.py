@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, Text, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Text, String, ForeignKey, DateTime, Index, UniqueConstraint
 from datetime import datetime
 from app.database import Base
 
 class Translation(Base):
     __tablename__ = "translation_history"
+    __table_args__ = (
+        # Çevrimdışı kuyruktan tekrar gönderilen kayıtlar çift yazılmasın
+        UniqueConstraint("user_id", "idempotency_key", name="uq_translation_history_user_idempotency"),
+        # Geçmiş sayfalaması (user_id, created_at, id) üzerinden yapılır
+        Index("ix_translation_history_user_created", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -11,3 +17,4 @@ class Translation(Base):
     target_language = Column(String(10), nullable=False)
     translated_text = Column(Text, nullable=True)  
     created_at = Column(DateTime, default=datetime.utcnow)
+    idempotency_key = Column(String(64), nullable=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Text, String, DateTime
+from datetime import datetime
+from app.database import Base
+
+# Paylaşımlı (kalıcı) çeviri önbelleği: tüm worker'lar aynı tabloyu kullanır
+class TranslationCacheEntry(Base):
+    __tablename__ = "translation_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, nullable=False, index=True)
+    source_language = Column(String(10), nullable=False)
+    target_language = Column(String(10), nullable=False)
+    original_text = Column(Text, nullable=False)
+    translated_text = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from datetime import datetime
+from app.database import Base
+
+# Cümle / satır düzeyinde çeviri belleği (app/translation_memory.py).
+# Anahtar, rakamları yer tutucuya çevrilmiş normalize segmentin özetidir; böylece
+# sadece fiyatı değişen menü satırı tekrar çevrilmez. Birincil anahtar index'i
+# (source_language, target_language, segment_key) aramalarını karşılar.
+class TranslationMemoryEntry(Base):
+    __tablename__ = "translation_memory"
+
+    # İstekteki kaynak dil ("auto" dahil); aynı metin farklı kaynak dille farklı çevrilebilir
+    source_language = Column(String(10), primary_key=True)
+    target_language = Column(String(10), primary_key=True)
+    segment_key = Column(String(64), primary_key=True)
+    source_text = Column(Text, nullable=False)
+    translated_text = Column(Text, nullable=False)
+    # Çevirideki rakam yer tutucusu sayısı (0: birebir eşleşme)
+    slots = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
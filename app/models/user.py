@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from app.database import Base
 
 class User(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Firebase senkronizasyonu kullanıcıları uid ile eşler (e-posta değişebilir)
+        Index("uq_users_firebase_uid", "firebase_uid", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, nullable=False, index=True)
@@ -10,3 +14,4 @@ class User(Base):
     name = Column(String, nullable=True)
     surname = Column(String, nullable=True)
     profile_image = Column(String, nullable=True)
+    firebase_uid = Column(String(128), nullable=True)
@@ -0,0 +1,291 @@
+import hashlib
+import io
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.cache import TTLCache
+
+# OCR CPU-yoğun bir iş: Flask worker thread'ini bloklamamak için
+# çekirdek sayısı kadar süreçten oluşan sınırlı bir havuzda çalıştırılır.
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0")) or os.cpu_count() or 1
+OCR_MAX_QUEUE = int(os.getenv("OCR_MAX_QUEUE", str(OCR_WORKERS * 4)))
+OCR_JOB_TTL = int(os.getenv("OCR_JOB_TTL", "600"))
+OCR_SYNC_TIMEOUT = float(os.getenv("OCR_SYNC_TIMEOUT", "30"))
+
+# Aynı fotoğraf tekrar gelirse OCR baştan yapılmaz (içerik hash'i ile)
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "512"))
+OCR_CACHE_TTL = int(os.getenv("OCR_CACHE_TTL", "86400"))
+
+# Yüklenen dosyalar varsayılan olarak diske yazılmaz; yazılırsa saklama süresi uygulanır
+UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "uploads")
+OCR_KEEP_UPLOADS = os.getenv("OCR_KEEP_UPLOADS", "0") == "1"
+UPLOAD_RETENTION_SECONDS = int(os.getenv("UPLOAD_RETENTION_SECONDS", "86400"))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(500 * 1024 * 1024)))
+UPLOAD_GC_INTERVAL = int(os.getenv("UPLOAD_GC_INTERVAL", "300"))
+
+
+class OCRQueueFull(Exception):
+    pass
+
+
+def _run_ocr(image_bytes, lang):
+    # Havuzdaki süreçte çalışır; ağır kütüphaneler sadece burada gerekir
+    from PIL import Image
+    import pytesseract
+
+    started_at = time.time()
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            text = pytesseract.image_to_string(img, lang=lang) if lang else pytesseract.image_to_string(img)
+    except Exception as e:
+        # Bazı pytesseract hataları pickle edilemiyor ve havuzu bozuyor;
+        # ana sürece düz bir hata olarak taşınır
+        raise RuntimeError(str(e) or e.__class__.__name__) from None
+    return text, started_at, time.time()
+
+
+def content_key(image_bytes, lang):
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    return digest, f"{digest}:{lang or ''}"
+
+
+def persist_upload(image_bytes, digest, original_filename):
+    # Dosya adı içerikten türetilir; aynı fotoğraf ikinci kez yazılmaz
+    ext = os.path.splitext(original_filename or "")[1].lower()[:10]
+    filename = f"{digest}{ext}"
+    filepath = os.path.join(UPLOAD_FOLDER, filename)
+    if not os.path.exists(filepath):
+        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+        with open(filepath, "wb") as f:
+            f.write(image_bytes)
+    return filename
+
+
+_last_gc = 0.0
+_gc_lock = threading.Lock()
+
+
+def _maybe_gc_uploads():
+    global _last_gc
+    now = time.time()
+    if now - _last_gc < UPLOAD_GC_INTERVAL or not _gc_lock.acquire(blocking=False):
+        return
+    try:
+        _last_gc = now
+        gc_uploads()
+    finally:
+        _gc_lock.release()
+
+
+def _remove(path):
+    # Aynı klasörü temizleyen başka bir worker dosyayı önce silmiş olabilir
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def gc_uploads(now=None):
+    # Saklama süresini aşan dosyalar silinir; toplam boyut sınırı aşılırsa
+    # en eski dosyalardan başlanarak silinir
+    now = now or time.time()
+    removed = 0
+    try:
+        entries = list(os.scandir(UPLOAD_FOLDER))
+    except FileNotFoundError:
+        return 0
+
+    files = []
+    for entry in entries:
+        try:
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        if now - stat.st_mtime > UPLOAD_RETENTION_SECONDS:
+            removed += _remove(entry.path)
+        else:
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= UPLOAD_MAX_BYTES:
+            break
+        removed += _remove(path)
+        total -= size
+    return removed
+
+
+class OCRJob:
+    def __init__(self, filename, lang, key=None):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.lang = lang
+        self.key = key
+        self.cached = False
+        self.status = "pending"
+        self.text = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        result = {
+            "job_id": self.id,
+            "status": self.status,
+            "filename": self.filename,
+        }
+        if self.started_at:
+            result["queue_ms"] = round((self.started_at - self.submitted_at) * 1000, 1)
+        if self.finished_at and self.started_at:
+            result["ocr_ms"] = round((self.finished_at - self.started_at) * 1000, 1)
+        if self.cached:
+            result["cached"] = True
+        if self.status == "done":
+            result["text"] = self.text
+        if self.status == "failed":
+            result["error"] = self.error
+        return result
+
+
+class OCREngine:
+    def __init__(self, workers=OCR_WORKERS, max_queue=OCR_MAX_QUEUE, job_ttl=OCR_JOB_TTL):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.job_ttl = job_ttl
+        self._pool = None
+        self._jobs = {}
+        self._inflight = {}
+        self._cache = TTLCache(maxsize=OCR_CACHE_SIZE, ttl=OCR_CACHE_TTL)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._ocr_seconds = 0.0
+
+    def _get_pool(self):
+        # Havuz ilk kullanımda açılır, böylece import maliyeti başlangıca yansımaz
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def submit(self, image_bytes, filename=None, lang=None):
+        digest, key = content_key(image_bytes, lang)
+        if OCR_KEEP_UPLOADS:
+            filename = persist_upload(image_bytes, digest, filename)
+        # OCR_KEEP_UPLOADS kapalıyken de çalışır: eski sürümlerin uploads/ klasörüne
+        # yazdığı dosyalar da saklama süresi dolunca silinir
+        _maybe_gc_uploads()
+
+        cached = self._cache.get(key)
+        with self._lock:
+            self._prune()
+            if cached is not None:
+                # Önbellekten gelen sonuç için de iş kaydı tutulur, API aynı kalır
+                job = OCRJob(filename, lang, key)
+                job.text = cached
+                job.status = "done"
+                job.cached = True
+                job.finished_at = time.time()
+                job.done.set()
+                self._jobs[job.id] = job
+                return job
+
+            # Aynı içerik şu an işleniyorsa yeni iş açmak yerine ona bağlanılır
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                return inflight
+
+            if self._pending >= self.max_queue:
+                self.rejected += 1
+                raise OCRQueueFull("OCR kuyruğu dolu, lütfen daha sonra tekrar deneyin.")
+            job = OCRJob(filename, lang, key)
+            self._jobs[job.id] = job
+            self._inflight[key] = job
+            self._pending += 1
+            try:
+                try:
+                    job.future = self._get_pool().submit(_run_ocr, image_bytes, lang)
+                except BrokenProcessPool:
+                    # Bir alt süreç çöktüyse eski havuz kapatılıp yeniden kurulur
+                    self._pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = None
+                    job.future = self._get_pool().submit(_run_ocr, image_bytes, lang)
+            except BaseException:
+                # Gönderilemeyen iş kuyrukta kalmasın; aynı görsel için sonraki istekler ona bağlanmasın
+                del self._jobs[job.id]
+                self._inflight.pop(key, None)
+                self._pending -= 1
+                raise
+
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def _finish(self, job, future):
+        try:
+            text, started_at, finished_at = future.result()
+            job.text = text
+            job.started_at = started_at
+            job.finished_at = finished_at
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.finished_at = time.time()
+            job.status = "failed"
+
+        if job.status == "done":
+            self._cache.set(job.key, job.text)
+
+        with self._lock:
+            self._pending -= 1
+            self._inflight.pop(job.key, None)
+            if job.status == "done":
+                self.completed += 1
+                self._ocr_seconds += job.finished_at - job.started_at
+            else:
+                self.failed += 1
+        job.done.set()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job, timeout=OCR_SYNC_TIMEOUT):
+        # Senkron mod: iş bitene ya da süre dolana kadar bekler
+        return job.done.wait(timeout)
+
+    def _prune(self):
+        cutoff = time.time() - self.job_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._pending,
+                "tracked_jobs": len(self._jobs),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_ocr_ms": round(self._ocr_seconds / self.completed * 1000, 1) if self.completed else 0.0,
+                "cache": self._cache.stats(),
+            }
+
+
+engine = OCREngine()
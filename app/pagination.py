@@ -0,0 +1,89 @@
+import base64
+import os
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", "500"))
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(ts, row_id):
+    # Zamanı boş (NULL) eski kayıtlarda cursor'ın zaman kısmı boş kalır
+    raw = f"{ts.isoformat() if ts is not None else ''}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, row_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|")
+        return (datetime.fromisoformat(ts) if ts else None), int(row_id)
+    except (ValueError, UnicodeError):
+        raise PaginationError("Geçersiz cursor")
+
+
+def parse_limit(value):
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PaginationError("Geçersiz limit")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def parse_fields(value, allowed, default):
+    if not value:
+        return list(default)
+    fields = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise PaginationError(f"Bilinmeyen alan(lar): {', '.join(unknown)}")
+    return fields
+
+
+def keyset_page(session, model, ts_column, filters, fields, limit, cursor=None):
+    # (zaman, id) üzerinde keyset sayfalama: en yeni kayıtlar önce gelir.
+    # Sadece istenen kolonlar seçilir, ORM nesnesi oluşturulmaz.
+    # Zamanı NULL olan kayıtlar en sona, id sırasıyla gelir; iki aşama da
+    # (..., zaman, id) index'ini kullanır (NULLS LAST sıralaması index'i bozardı).
+    ts_attr = getattr(model, ts_column)
+    columns = [getattr(model, f) for f in fields]
+    query = session.query(model.id, ts_attr, *columns).filter(*filters)
+
+    cursor_ts, cursor_id = decode_cursor(cursor) if cursor else (None, None)
+    rows = []
+    if cursor_id is None or cursor_ts is not None:
+        dated = query.filter(ts_attr.is_not(None))
+        if cursor_ts is not None:
+            dated = dated.filter(tuple_(ts_attr, model.id) < tuple_(cursor_ts, cursor_id))
+        rows = dated.order_by(ts_attr.desc(), model.id.desc()).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        undated = query.filter(ts_attr.is_(None))
+        if cursor_ts is None and cursor_id is not None:
+            undated = undated.filter(model.id < cursor_id)
+        rows += undated.order_by(model.id.desc()).limit(limit + 1 - len(rows)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+
+    items = []
+    for row in rows:
+        item = {}
+        for field, value in zip(fields, row[2:]):
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = float(value)
+            item[field] = value
+        items.append(item)
+    return items, next_cursor
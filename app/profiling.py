@@ -0,0 +1,135 @@
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request
+
+from app import log
+
+# Yavaş istek profili: SLOW_REQUEST_MS verildiğinde arka plandaki bir thread,
+# bu sürenin dörtte birini aşmış isteklerin yığınını (stack) düzenli aralıklarla
+# örnekler. İstek eşiği aşarak biterse örnekler "folded stack" biçiminde
+# (flamegraph.pl / speedscope ile açılabilir) SLOW_REQUEST_PROFILE_DIR'e yazılır
+# ve en sık görülen yığınlar loglanır. Hızlı isteklerin maliyeti bir dict yazımıdır.
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "0"))
+SLOW_REQUEST_SAMPLE_INTERVAL = float(os.getenv("SLOW_REQUEST_SAMPLE_INTERVAL", "0.01"))
+SLOW_REQUEST_PROFILE_DIR = os.getenv("SLOW_REQUEST_PROFILE_DIR", "")
+SLOW_REQUEST_TOP_STACKS = 5
+
+logger = logging.getLogger(__name__)
+
+
+class _Active:
+    __slots__ = ("started", "samples")
+
+    def __init__(self, started):
+        self.started = started
+        self.samples = Counter()
+
+
+def _fold(frame):
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class SlowRequestProfiler:
+    def __init__(self, threshold_ms, interval):
+        self.threshold = threshold_ms / 1000
+        self.sample_after = self.threshold / 4
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            with self._lock:
+                candidates = [(tid, entry) for tid, entry in self._active.items()
+                              if now - entry.started >= self.sample_after]
+            if not candidates:
+                continue
+            frames = sys._current_frames()
+            for tid, entry in candidates:
+                frame = frames.get(tid)
+                if frame is not None:
+                    entry.samples[_fold(frame)] += 1
+
+    def begin(self):
+        self._ensure_thread()
+        with self._lock:
+            self._active[threading.get_ident()] = _Active(time.perf_counter())
+
+    def end(self, method, route, status):
+        with self._lock:
+            entry = self._active.pop(threading.get_ident(), None)
+        if entry is None:
+            return
+        elapsed = time.perf_counter() - entry.started
+        if elapsed < self.threshold:
+            return
+
+        path = self._dump(entry.samples, method, route) if entry.samples else None
+        log.event(
+            logger, logging.WARNING, "slow_request",
+            elapsed_ms=round(elapsed * 1000, 1),
+            status=status,
+            samples=sum(entry.samples.values()),
+            profile=path,
+            top_stacks=[
+                {"count": count, "leaf": stack.rsplit(";", 3)[-3:]}
+                for stack, count in entry.samples.most_common(SLOW_REQUEST_TOP_STACKS)
+            ],
+        )
+
+    def _dump(self, samples, method, route):
+        if not SLOW_REQUEST_PROFILE_DIR:
+            return None
+        os.makedirs(SLOW_REQUEST_PROFILE_DIR, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        name = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{method}-{slug}.folded"
+        path = os.path.join(SLOW_REQUEST_PROFILE_DIR, name)
+        with open(path, "w") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+profiler = SlowRequestProfiler(SLOW_REQUEST_MS, SLOW_REQUEST_SAMPLE_INTERVAL) if SLOW_REQUEST_MS > 0 else None
+
+
+def init_app(app):
+    if profiler is None:
+        return
+
+    @app.before_request
+    def _begin_profile():
+        profiler.begin()
+
+    @app.after_request
+    def _record_status(response):
+        g.profile_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _end_profile(exception=None):
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+        profiler.end(request.method, route, g.get("profile_status", 500))
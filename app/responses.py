@@ -0,0 +1,119 @@
+import gzip
+import hashlib
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson yoksa Flask'ın varsayılan (json) kodlayıcısı kullanılır
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli yoksa sadece gzip sunulur
+    brotli = None
+
+# Ortak yanıt katmanı: hızlı JSON kodlama, güçlü ETag ile 304 ve
+# eşik üzerindeki yanıtlar için gzip / brotli sıkıştırma.
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))
+COMPRESSIBLE_MIMETYPES = {
+    "application/json", "application/x-ndjson", "text/plain", "text/csv", "text/html",
+}
+
+
+def json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"JSON'a çevrilemeyen tip: {type(value).__name__}")
+
+
+ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def dumps_bytes(obj):
+    return orjson.dumps(obj, default=json_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    # Flask'ın varsayılanıyla aynı çıktı sözleşmesi (sıralı anahtarlar); Decimal -> float,
+    # datetime -> ISO 8601. Debug modunda okunabilirlik için girintili yazar.
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            kwargs.setdefault("default", json_default)
+            return super().dumps(obj, **kwargs)
+        return dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is None or self._app.debug:
+            return super().response(obj)
+        return self._app.response_class(dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+def _compressible(response):
+    return (
+        not response.is_streamed
+        and not response.direct_passthrough
+        and "Content-Encoding" not in response.headers
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+    )
+
+
+def _choose_encoding():
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered)
+
+
+def _compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def finalize(response):
+    # Akışlı yanıtlar (export, photo-translate) ve dosya yanıtları olduğu gibi bırakılır
+    if not _compressible(response):
+        return response
+
+    data = response.get_data()
+    encoding = _choose_encoding() if len(data) >= COMPRESS_MIN_BYTES else None
+    response.vary.add("Accept-Encoding")
+
+    # Güçlü ETag: gövde özeti; her kodlama ayrı bir temsil olduğu için ETag'e eklenir
+    if request.method in ("GET", "HEAD") and response.status_code == 200 and "ETag" not in response.headers:
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        etag = f"{digest}-{encoding}" if encoding else digest
+        response.set_etag(etag)
+        if not response.cache_control.max_age and not response.cache_control.no_store:
+            response.cache_control.no_cache = True
+        if request.if_none_match.contains(etag) or request.if_none_match.contains(digest):
+            response.status_code = 304
+            response.set_data(b"")
+            response.headers.pop("Content-Type", None)
+            response.headers.pop("Content-Length", None)
+            return response
+
+    if encoding:
+        response.set_data(_compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_app(app):
+    app.json_provider_class = ORJSONProvider
+    app.json = ORJSONProvider(app)
+    app.after_request(finalize)
@@ -0,0 +1,264 @@
+# Yerel restoran index'i: Yelp arama yanıtlarındaki işletmeler, yanıt geçerken
+# restaurants tablosuna yazılır (Yelp business id anahtarıyla). Yakındaki aramalar önce
+# burada yanıtlanır; yeterli ve taze kayıt yoksa Yelp'e gidilir.
+# Konum index'i geohash'tir: geo_cell (GEO_CELL_PRECISION karakterlik önek) B-tree ile
+# aranır, merkez hücre ve 8 komşusu taranıp mesafe Python'da süzülür.
+import logging
+import math
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, over, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import log
+from app.cache import TTLCache
+from app.database import db_session, dialect_insert
+from app.models.restaurant import Restaurant
+from app.models.review import Review
+
+logger = logging.getLogger(__name__)
+
+RESTAURANT_LOCAL_FIRST = os.getenv("RESTAURANT_LOCAL_FIRST", "1") == "1"
+# Yerel aramanın yarıçapı; 6 karakterlik hücre ~610 m yükseklikte olduğu için
+# 3x3 komşu taraması en az bu kadarını kapsar
+RESTAURANT_LOCAL_RADIUS_M = float(os.getenv("RESTAURANT_LOCAL_RADIUS_M", "500"))
+# Bu süreden eski kayıtlar yerel aramada kullanılmaz (Yelp'ten yeniden gelince tazelenir)
+RESTAURANT_LOCAL_MAX_AGE = int(os.getenv("RESTAURANT_LOCAL_MAX_AGE", str(7 * 86400)))
+# Aynı işletme önbellekten tekrar tekrar geçtiğinde bu aralıktan sık yazılmaz
+RESTAURANT_INDEX_INTERVAL = int(os.getenv("RESTAURANT_INDEX_INTERVAL", "3600"))
+RESTAURANT_DETAIL_REVIEWS = int(os.getenv("RESTAURANT_DETAIL_REVIEWS", "20"))
+
+# geo_cell kolonunun uzunluğu; değişirse tablo yeniden doldurulmalı
+GEO_CELL_PRECISION = 6
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_M = 6371000
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+_recently_indexed = TTLCache(maxsize=int(os.getenv("RESTAURANT_INDEX_CACHE_SIZE", "10000")), ttl=RESTAURANT_INDEX_INTERVAL)
+
+
+def geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def _cell_size(precision):
+    # (yükseklik, genişlik) derece cinsinden
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 - lon_bits
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def neighbor_cells(latitude, longitude, precision=GEO_CELL_PRECISION):
+    height, width = _cell_size(precision)
+    cells = set()
+    for dlat in (-height, 0, height):
+        for dlon in (-width, 0, width):
+            lat = max(-90.0, min(90.0, latitude + dlat))
+            lon = (longitude + dlon + 180.0) % 360.0 - 180.0
+            cells.add(geohash(lat, lon, precision))
+    return sorted(cells)
+
+
+def distance_m(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _business_row(business, now):
+    coordinates = business.get("coordinates") or {}
+    latitude, longitude = coordinates.get("latitude"), coordinates.get("longitude")
+    if not business.get("id") or not business.get("name") or latitude is None or longitude is None:
+        return None
+    location = business.get("location") or {}
+    hashed = geohash(latitude, longitude)
+    return {
+        "yelp_id": business["id"],
+        "name": business["name"][:200],
+        "address": ", ".join(location.get("display_address") or []) or None,
+        "categories": ", ".join(c.get("title", "") for c in business.get("categories") or []) or None,
+        "latitude": latitude,
+        "longitude": longitude,
+        "geohash": hashed,
+        "geo_cell": hashed[:GEO_CELL_PRECISION],
+        "rating": business.get("rating"),
+        "review_count": business.get("review_count"),
+        "data": {k: v for k, v in business.items() if k != "distance"},
+        "updated_at": now,
+    }
+
+
+def index_businesses(session, businesses):
+    # Yelp yanıtındaki işletmeler upsert edilir; son RESTAURANT_INDEX_INTERVAL içinde
+    # yazılanlar atlanır. Yazılan satır sayısını döner (commit çağırana aittir).
+    now = datetime.utcnow()
+    rows = {}
+    for business in businesses or []:
+        row = _business_row(business, now)
+        if row is not None and _recently_indexed.get(row["yelp_id"]) is None:
+            rows[row["yelp_id"]] = row
+    if not rows:
+        return 0
+
+    insert = dialect_insert(session.get_bind())
+    stmt = insert(Restaurant.__table__).values([rows[key] for key in sorted(rows)])
+    updates = {column: stmt.excluded[column] for column in rows[next(iter(rows))] if column != "yelp_id"}
+    session.execute(stmt.on_conflict_do_update(index_elements=["yelp_id"], set_=updates))
+    for key in rows:
+        _recently_indexed.set(key, True)
+    return len(rows)
+
+
+def _matches(restaurant, terms):
+    haystack = f"{restaurant.name} {restaurant.categories or ''}".casefold()
+    return all(term in haystack for term in terms)
+
+
+def nearby(session, term, latitude, longitude, limit=1, radius_m=None):
+    # Yelp arama yanıtı biçiminde sonuç; yeterli yerel kayıt yoksa None
+    radius_m = radius_m or RESTAURANT_LOCAL_RADIUS_M
+    latitude, longitude = float(latitude), float(longitude)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    fresh_after = datetime.utcnow() - timedelta(seconds=RESTAURANT_LOCAL_MAX_AGE)
+    candidates = session.query(Restaurant) \
+        .filter(Restaurant.geo_cell.in_(neighbor_cells(latitude, longitude)), Restaurant.updated_at >= fresh_after) \
+        .all()
+
+    terms = term.casefold().split()
+    found = []
+    for restaurant in candidates:
+        distance = distance_m(latitude, longitude, restaurant.latitude, restaurant.longitude)
+        if distance <= radius_m and _matches(restaurant, terms):
+            found.append((distance, restaurant))
+    if len(found) < limit:
+        return None
+
+    found.sort(key=lambda item: (item[0], item[1].yelp_id))
+    return {
+        "businesses": [dict(r.data, distance=round(distance, 1)) for distance, r in found[:limit]],
+        "total": len(found),
+        "region": {"center": {"latitude": latitude, "longitude": longitude}},
+        "source": "local",
+    }
+
+
+# Route'lar için: yerel index hatası aramayı engellemez, Yelp'e düşülür.
+# ASGI modunda thread havuzundan çağrılır; session o thread'de kapatılır.
+
+def search_local(term, latitude, longitude, limit=1, remove_session=False):
+    try:
+        return nearby(db_session, term, latitude, longitude, limit=limit)
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        log.event(logger, logging.WARNING, "restaurant_index_error", operation="nearby", error=str(e))
+        return None
+    finally:
+        if remove_session:
+            db_session.remove()
+
+
+def index_response(yelp_data, remove_session=False):
+    try:
+        if index_businesses(db_session, yelp_data.get("businesses")):
+            db_session.commit()
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        log.event(logger, logging.WARNING, "restaurant_index_error", operation="index", error=str(e))
+    finally:
+        if remove_session:
+            db_session.remove()
+
+
+def _review_time(value):
+    # Yelp "2016-08-29 00:41:13" biçiminde döner; bizimkilerle sıralanabilsin diye ISO 8601
+    return value.replace(" ", "T") if isinstance(value, str) else value
+
+
+def _review_columns():
+    return (Review.id, Review.user_id, Review.rating, Review.review_text, Review.visited_at,
+            over(func.count(Review.id)), over(func.avg(Review.rating)))
+
+
+def detail(session, yelp_id, limit=None):
+    # İşletme, bizim yorumlarımız ve özetleri tek sorguda (LEFT JOIN + pencere fonksiyonları).
+    # İşletme index'te yoksa (Yelp aramasından hiç geçmemiş) sadece bizim yorumlarımız döner,
+    # "restaurant" None kalır; işletme bilgisini Yelp'ten set_business ile route tamamlar
+    limit = limit or RESTAURANT_DETAIL_REVIEWS
+    order = (Review.visited_at.desc(), Review.id.desc())
+    rows = session.execute(
+        select(Restaurant, *_review_columns())
+        .outerjoin(Review, Review.yelp_business_id == Restaurant.yelp_id)
+        .where(Restaurant.yelp_id == yelp_id)
+        .order_by(*order)
+        .limit(limit)
+    ).all()
+    if rows:
+        restaurant, reviews = rows[0][0], [row[1:] for row in rows]
+    else:
+        restaurant = None
+        reviews = session.execute(
+            select(*_review_columns()).where(Review.yelp_business_id == yelp_id).order_by(*order).limit(limit)
+        ).all()
+
+    count, average = (reviews[0][5], reviews[0][6]) if reviews else (0, None)
+    result = {
+        "restaurant": None,
+        "summary": {
+            "yelp": None,
+            "lingualens": {"review_count": count,
+                           "average_rating": round(float(average), 2) if average is not None else None},
+        },
+        "reviews": [
+            {"source": "lingualens", "id": review_id, "user_id": user_id,
+             "rating": float(rating) if rating is not None else None, "text": text,
+             "time": visited_at.isoformat() if visited_at else None}
+            for review_id, user_id, rating, text, visited_at, _, _ in reviews if review_id is not None
+        ],
+    }
+    if restaurant is not None:
+        set_business(result, dict(restaurant.data, indexed_at=restaurant.updated_at.isoformat()),
+                     restaurant.rating, restaurant.review_count)
+    return result
+
+
+def set_business(result, business, rating=None, review_count=None):
+    # Yelp işletme yanıtı (ya da index'teki kopyası) detay sonucuna yazılır
+    rating = business.get("rating") if rating is None else rating
+    result["restaurant"] = business
+    result["summary"]["yelp"] = {
+        "rating": float(rating) if rating is not None else None,
+        "review_count": business.get("review_count") if review_count is None else review_count,
+    }
+    return result
+
+
+def merge_yelp_reviews(result, yelp_reviews):
+    # Yelp yorumları bizimkilerle tek listede, en yeni önce
+    for review in (yelp_reviews or {}).get("reviews", []):
+        result["reviews"].append({
+            "source": "yelp", "id": review.get("id"), "user": (review.get("user") or {}).get("name"),
+            "rating": review.get("rating"), "text": review.get("text"),
+            "time": _review_time(review.get("time_created")), "url": review.get("url"),
+        })
+    result["reviews"].sort(key=lambda r: r["time"] or "", reverse=True)
+    return result
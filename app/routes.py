@@ -1,28 +1,55 @@
-from flask import Blueprint, request, jsonify
-from app.database import db_session
+from flask import Blueprint, current_app, request, jsonify, Response, stream_with_context, send_file, url_for
+import logging
+from app.database import db_session, pool_stats
 from app.models.user import User
 from app.models.translation import Translation
 from app.models.review import Review
+from app import blob_store, firebase_admin_init, firebase_sync, http_client, ingest, log, metrics, migrations, ocr, translator, yelp
+from app import admission, export, restaurants, search, stats, translation_memory
+from app.pagination import keyset_page, parse_fields, parse_limit, PaginationError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-from PIL import Image
-import pytesseract
+import hmac
 import os
-import uuid
 import requests
 from dotenv import load_dotenv
-from firebase_admin import auth  
-import base64
+import json
 
 load_dotenv() # .env dosyasını yükle
-UPLOAD_FOLDER = 'uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 bp = Blueprint('routes', __name__)
 
-# Yelp API Anahtarını .env dosyasından al
-# .env dosyasında YELP_API_KEY=YOUR_YELP_API_KEY şeklinde bir satır olduğundan emin ol
-YELP_API_KEY = os.getenv("YELP_API_KEY")
+logger = logging.getLogger(__name__)
+
+# Tüm kullanıcıların dışa aktarımı (/admin/export) için X-Admin-Token; boşsa kapalıdır
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+TRANSLATE_BATCH_MAX_ITEMS = int(os.getenv("TRANSLATE_BATCH_MAX_ITEMS", "500"))
+# Akışlı çeviride ilk satırların hızlı gelmesi için küçük parçalar kullanılır
+PHOTO_TRANSLATE_CHUNK_SIZE = int(os.getenv("PHOTO_TRANSLATE_CHUNK_SIZE", "4"))
+
+def _profile_image_urls(user):
+    reference = blob_store.parse_reference(user.profile_image)
+
+    # Eski base64 kayıtlar ilk okumada blob deposuna taşınır
+    if not reference and user.profile_image and user.profile_image.startswith("data:"):
+        try:
+            reference = blob_store.migrate_data_url(user.profile_image)
+            user.profile_image = blob_store.BLOB_PREFIX + reference
+            db_session.commit()
+        except blob_store.InvalidImage as e:
+            log.event(logger, logging.WARNING, "profile_image_migration_failed", user_id=user.id, error=str(e))
+            return user.profile_image, {}
+
+    if not reference:
+        return user.profile_image, {}
+
+    url = url_for("routes.get_profile_image_blob", reference=reference, _external=True)
+    thumbnails = {str(size): f"{url}?size={size}" for size in blob_store.THUMBNAIL_SIZES}
+    return url, thumbnails
+
 
 # Kullanıcı profili
 @bp.route("/profile/<int:user_id>", methods=["GET"])
@@ -31,14 +58,48 @@ def get_profile(user_id):
     if not user:
         return jsonify({"error": "User not found"}), 404
 
+    profile_image, thumbnails = _profile_image_urls(user)
     return jsonify({
         "id": user.id,
         "email": user.email,
         "name": user.name,
         "surname": user.surname,
-        "profile_image": user.profile_image
+        "profile_image": profile_image,
+        "profile_image_thumbnails": thumbnails
     }), 200 
 
+# Profil resimleri: içerik adresli olduğu için süresiz önbelleklenebilir
+@bp.route("/profile-images/<string:reference>", methods=["GET"])
+def get_profile_image_blob(reference):
+    digest, _, ext = reference.partition(".")
+    if len(digest) != 64 or ext not in blob_store.MIMETYPES:
+        return jsonify({"error": "Görsel bulunamadı"}), 404
+
+    size = request.args.get("size", type=int)
+    if size:
+        if size not in blob_store.THUMBNAIL_SIZES:
+            return jsonify({"error": "Geçersiz boyut"}), 400
+        name, mimetype, etag = blob_store.thumbnail_name(reference, size), "image/jpeg", f"{digest}-{size}"
+    else:
+        name, mimetype, etag = reference, blob_store.MIMETYPES[ext], digest
+
+    try:
+        blob = blob_store.store.open(name)
+    except FileNotFoundError:
+        return jsonify({"error": "Görsel bulunamadı"}), 404
+
+    # Dosya nesnesi yanıt bitince (send_file'ın sarmalayıcısı tarafından) kapatılır
+    response = send_file(
+        blob,
+        mimetype=mimetype,
+        etag=etag,
+        conditional=True,
+        max_age=31536000
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 # Kayıt
 @bp.route("/register", methods=["POST"])
 def register():
@@ -49,13 +110,23 @@ def register():
     if db_session.query(User).filter_by(email=data["email"]).first():
         return jsonify({"error": "User already exists"}), 409
 
+    # null gönderilirse boş kabul edilir
+    profile_image = data.get("profile_image") or ""
+    if not isinstance(profile_image, str):
+        return jsonify({"error": "profile_image metin olmalı"}), 400
+    if profile_image.startswith("data:"):
+        try:
+            profile_image = blob_store.BLOB_PREFIX + blob_store.migrate_data_url(profile_image)
+        except blob_store.InvalidImage as e:
+            return jsonify({"error": str(e)}), 400
+
     hashed_pw = generate_password_hash(data["password"])
     new_user = User(
         email=data["email"],
         password=hashed_pw,
         name=data.get("name", ""),
         surname=data.get("surname", ""),
-        profile_image=data.get("profile_image", "")
+        profile_image=profile_image
     )
     db_session.add(new_user)
     db_session.commit()
@@ -65,22 +136,20 @@ def register():
 @bp.route("/login", methods=["POST"])
 def login():
     data = request.get_json()
-    print(f"Login isteği alındı. Veri: {data}") # DEBUG: Gelen veriyi yazdır
+    # İstek gövdesi (e-posta, şifre) loglanmaz; sadece sonuç ve kullanıcı kimliği yazılır
 
     if not data or not data.get("email") or not data.get("password"):
-        print("Hata: Eksik alanlar") # DEBUG
+        log.event(logger, logging.INFO, "login_failed", reason="missing_fields")
         return jsonify({"error": "Missing fields"}), 400
 
     user = db_session.query(User).filter_by(email=data["email"]).first()
     if not user:
-        print(f"Hata: Kullanıcı bulunamadı. E-posta: {data.get('email')}") # DEBUG
+        log.event(logger, logging.INFO, "login_failed", reason="user_not_found")
         return jsonify({"error": "User not found"}), 404
 
-    print(f"Kullanıcı bulundu: ID={user.id}, E-posta={user.email}, Şifre Hash={user.password[:10]}...") # DEBUG
-
     # Firebase kullanıcısı kontrolü
     if user.password == "firebase-auth":
-        print("Firebase kullanıcı girişi.") # DEBUG
+        log.event(logger, logging.INFO, "login", user_id=user.id, auth="firebase")
         # Mobil uygulama ve backend senkronizasyonu için, backend'in Firebase Auth ile giriş yapan kullanıcıyı
         # kendi veritabanına kaydederken şifresini 'firebase-auth' olarak işaretlemesi beklenir.
         # Bu durumda, frontend'den gönderilen 'firebase-auth-dummy-password' ile eşleşmesi beklenir.
@@ -95,12 +164,11 @@ def login():
         }), 200
 
     # Normal kullanıcı kontrolü
-    # print(f"Normal kullanıcı girişi denemesi. Girilen şifre: {data['password']}") # Şifreyi loglamaktan kaçın!
     if not check_password_hash(user.password, data["password"]):
-        print("Hata: Geçersiz kimlik bilgileri (şifre yanlış).") # DEBUG
+        log.event(logger, logging.INFO, "login_failed", reason="invalid_credentials", user_id=user.id)
         return jsonify({"error": "Invalid credentials"}), 401 # <--- BURASI ÇOK ÖNEMLİ: Hata durumunda 401 dönmeli!
 
-    print("Başarılı giriş: Kullanıcı kimlik bilgileri doğru.") # DEBUG
+    log.event(logger, logging.INFO, "login", user_id=user.id, auth="password")
     return jsonify({
         "message": "Login successful",
         "user_id": user.id,
@@ -125,26 +193,63 @@ def add_translation():
     )
 
     db_session.add(new_translation)
+    # Çeviri belleğine yazılmaz: metin istemciden gelir, LibreTranslate çıktısı değildir
+    stats.record_translations(db_session, [data])
     db_session.commit()
 
     return jsonify({"message": "Çeviri başarıyla kaydedildi"}), 201
     
 
+def _bulk_ingest(ingest_fn):
+    data = request.get_json(silent=True)
+    items = data.get("items") if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Kayıt listesi (items) gerekli"}), 400
+    if len(items) > ingest.BULK_MAX_ITEMS:
+        return jsonify({"error": f"En fazla {ingest.BULK_MAX_ITEMS} kayıt gönderilebilir"}), 400
+
+    try:
+        results = ingest_fn(db_session, items)
+        db_session.commit()
+    except Exception as e:
+        db_session.rollback()
+        log.event(logger, logging.ERROR, "bulk_ingest_failed", items=len(items), exc_info=True)
+        return jsonify({"error": f"Kayıtlar yazılamadı: {str(e)}"}), 500
+
+    counts = {"created": 0, "duplicate": 0, "error": 0}
+    for result in results:
+        counts[result["status"]] += 1
+    return jsonify({"results": results, **counts}), 200 if counts["error"] < len(items) else 400
+
+
+# Toplu çeviri kaydı (idempotency_key ile güvenli tekrar)
+@bp.route("/translations/bulk", methods=["POST"])
+def add_translations_bulk():
+    return _bulk_ingest(ingest.ingest_translations)
+
+
 # Kullanıcının çeviri geçmişi
+# ?limit=&cursor=&fields= ile sayfalanır; sonraki sayfa X-Next-Cursor başlığında döner
+TRANSLATION_FIELDS = ("id", "original_text", "target_language", "translated_text", "created_at")
+TRANSLATION_DEFAULT_FIELDS = ("id", "original_text", "target_language", "created_at")
+
 @bp.route("/translations/<int:user_id>", methods=["GET"])
 def get_translations(user_id):
-    translations = db_session.query(Translation).filter_by(user_id=user_id).all()
-    
-    result = []
-    for t in translations:
-        result.append({
-            "id": t.id,
-            "original_text": t.original_text,
-            "target_language": t.target_language,
-            "created_at": t.created_at.isoformat()
-        })
-    
-    return jsonify(result), 200
+    try:
+        result, next_cursor = keyset_page(
+            db_session, Translation, "created_at",
+            filters=[Translation.user_id == user_id],
+            fields=parse_fields(request.args.get("fields"), TRANSLATION_FIELDS, TRANSLATION_DEFAULT_FIELDS),
+            limit=parse_limit(request.args.get("limit")),
+            cursor=request.args.get("cursor")
+        )
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = jsonify(result)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
 
 # Yorum ekleme
 @bp.route("/reviews", methods=["POST"])
@@ -155,38 +260,155 @@ def add_review():
     if not all(k in data for k in required):
         return jsonify({"error": "Missing fields"}), 400
 
+    try:
+        yelp_business_id = ingest.yelp_business_id(data)
+    except ingest.ItemError as e:
+        return jsonify({"error": str(e)}), 400
+
     new_review = Review(
         user_id=data["user_id"],
         restaurant_name=data["restaurant_name"],
         address=data["address"],
         rating=data["rating"],
-        review_text=data["review_text"]
+        review_text=data["review_text"],
+        yelp_business_id=yelp_business_id
     )
 
     db_session.add(new_review)
+    stats.record_reviews(db_session, [data])
     db_session.commit()
 
     return jsonify({"message": "Review saved successfully"}), 201
 
+# Toplu yorum kaydı (idempotency_key ile güvenli tekrar)
+@bp.route("/reviews/bulk", methods=["POST"])
+def add_reviews_bulk():
+    return _bulk_ingest(ingest.ingest_reviews)
+
+
 # Kullanıcının yorum geçmişi
+REVIEW_FIELDS = ("id", "restaurant_name", "address", "rating", "review_text", "visited_at", "yelp_business_id")
+
 @bp.route("/reviews/<int:user_id>", methods=["GET"])
 def get_reviews(user_id):
-    reviews = db_session.query(Review).filter_by(user_id=user_id).all()
-    
-    result = []
-    for r in reviews:
-        result.append({
-            "id": r.id,
-            "restaurant_name": r.restaurant_name,
-            "address": r.address,
-            "rating": float(r.rating),
-            "review_text": r.review_text,
-            "visited_at": r.visited_at.isoformat()
-        })
-    
-    return jsonify(result), 200
+    try:
+        result, next_cursor = keyset_page(
+            db_session, Review, "visited_at",
+            filters=[Review.user_id == user_id],
+            fields=parse_fields(request.args.get("fields"), REVIEW_FIELDS, REVIEW_FIELDS),
+            limit=parse_limit(request.args.get("limit")),
+            cursor=request.args.get("cursor")
+        )
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = jsonify(result)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
+
+# Geçmişte arama: /search/translations/<user_id>?q=...&lang=&from=&to=
+#                 /search/reviews/<user_id>?q=...&min_rating=&max_rating=&from=&to=
+# Sonuçlar ilgiye göre sıralanır (score); sonraki sayfa X-Next-Cursor başlığında döner
+SEARCH_FIELDS = {
+    "translations": (TRANSLATION_FIELDS, TRANSLATION_DEFAULT_FIELDS),
+    "reviews": (REVIEW_FIELDS, REVIEW_FIELDS),
+}
+
+@bp.route("/search/<any(translations, reviews):kind>/<int:user_id>", methods=["GET"])
+def search_history(kind, user_id):
+    allowed, default = SEARCH_FIELDS[kind]
+    try:
+        result, next_cursor = search.search(
+            db_session, kind, user_id, request.args.get("q"), request.args,
+            fields=parse_fields(request.args.get("fields"), allowed, default),
+            limit=parse_limit(request.args.get("limit")),
+            cursor=request.args.get("cursor")
+        )
+    except (search.SearchError, PaginationError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = jsonify(result)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
+
+def _export_response(user_id):
+    kind = request.args.get("type", "translations")
+    fmt = request.args.get("format", "ndjson")
+    if kind not in export.EXPORT_COLUMNS:
+        return jsonify({"error": "type translations ya da reviews olmalı"}), 400
+    if fmt not in export.FORMATS:
+        return jsonify({"error": "format ndjson ya da csv olmalı"}), 400
+    try:
+        after_id = export.parse_cursor(request.args.get("cursor"))
+    except export.ExportError as e:
+        return jsonify({"error": str(e)}), 400
+
+    use_gzip = request.args.get("gzip") == "1" or "gzip" in request.accept_encodings
+    scope = f"user{user_id}" if user_id is not None else "all"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{kind}-{scope}.{fmt}"',
+        "X-Accel-Buffering": "no",
+        "Vary": "Accept-Encoding",
+    }
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    # Gövde istek bağlamıyla akar; export slotu akış bitince bırakılır (bkz. admission)
+    body = export.stream(kind, fmt, user_id=user_id, after_id=after_id, gzip=use_gzip)
+    return Response(stream_with_context(body), mimetype=export.FORMATS[fmt], headers=headers)
+
+
+# Kullanıcının tüm çeviri / yorum geçmişi: ?type=translations|reviews&format=ndjson|csv
+# Satırlar id sırasıyla akar; kesilen indirme ?cursor=<son alınan id> ile sürdürülür
+@bp.route("/export/<int:user_id>", methods=["GET"])
+def export_history(user_id):
+    if not db_session.query(User.id).filter_by(id=user_id).first():
+        return jsonify({"error": "User not found"}), 404
+    return _export_response(user_id)
+
+
+# Analitik işleri için tüm kullanıcılar
+@bp.route("/admin/export", methods=["GET"])
+def export_all_history():
+    token = request.headers.get("X-Admin-Token", "")
+    if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN):
+        return jsonify({"error": "Yetkisiz"}), 403
+    return _export_response(None)
+
+def _stats_top():
+    return max(1, min(request.args.get("top", stats.STATS_TOP_DEFAULT, type=int), stats.STATS_TOP_MAX))
+
+
+# Kullanıcı paneli: dil başına çeviri sayısı ve en çok çevrilen ifadeler (özet tablolardan)
+@bp.route("/stats/users/<int:user_id>", methods=["GET"])
+def get_user_stats(user_id):
+    return jsonify(stats.user_stats(db_session, user_id, top=_stats_top())), 200
+
+
+# Restoran başına yorum sayısı ve ortalama puan
+# ?name=&address= ile tek restoran, parametresiz en çok yorum alanlar
+@bp.route("/stats/restaurants", methods=["GET"])
+def get_restaurant_stats():
+    name = request.args.get("name")
+    if name:
+        result = stats.restaurant_stats(db_session, name, request.args.get("address"))
+        if not result:
+            return jsonify({"error": "Restoran için yorum yok"}), 404
+        return jsonify(result), 200
+    return jsonify(stats.top_restaurants(db_session, top=_stats_top())), 200
+
+def _upstream_unavailable(error, upstream):
+    # Servis sağlıksızken beklemeden 503 dönülür
+    response = jsonify({"error": str(error)})
+    response.headers["Retry-After"] = str(upstream.breaker.retry_after())
+    return response, 503
+
 
 # Yelp API (Şimdi Gerçek Veri Çekecek)
+# Önce yerel restoran index'ine bakılır; yoksa Yelp'e gidilir ve gelen işletmeler index'e yazılır.
+# Yelp sonuçları konum hücresine göre önbelleklenir, eşzamanlı aynı istekler tek çağrıya iner
 @bp.route("/restaurant-search", methods=["GET"])
 def restaurant_search():
     term = request.args.get("term")
@@ -196,29 +418,27 @@ def restaurant_search():
     if not all([term, latitude, longitude]):
         return jsonify({"error": "Missing query parameters (term, latitude, longitude)"}), 400
 
-    if not YELP_API_KEY:
-        return jsonify({"error": "YELP_API_KEY not found in .env file"}), 500
+    try:
+        latitude, longitude = yelp.parse_coordinates(latitude, longitude)
+    except ValueError:
+        return jsonify({"error": "Invalid latitude/longitude"}), 400
 
-    headers = {
-        "Authorization": f"Bearer {YELP_API_KEY}"
-    }
-    params = {
-        "term": term,
-        "latitude": latitude,
-        "longitude": longitude,
-        "limit": 1 # Sadece ilk sonucu al
-    }
-    
-    YELP_SEARCH_URL = "https://api.yelp.com/v3/businesses/search"
+    if restaurants.RESTAURANT_LOCAL_FIRST:
+        local = restaurants.search_local(term, latitude, longitude)
+        if local:
+            return jsonify(local), 200
 
-    try:
-        response = requests.get(YELP_SEARCH_URL, headers=headers, params=params, timeout=10)
-        response.raise_for_status() # HTTP hataları için istisna fırlatır
+    if not yelp.YELP_API_KEY:
+        return jsonify({"error": "YELP_API_KEY not found in .env file"}), 500
 
-        yelp_data = response.json()
+    try:
+        yelp_data = yelp.search(term, latitude, longitude, limit=1) # Sadece ilk sonucu al
+        restaurants.index_response(yelp_data)
         return jsonify(yelp_data), 200
+    except http_client.CircuitOpenError as e:
+        return _upstream_unavailable(e, http_client.yelp)
     except requests.exceptions.RequestException as e:
-        print(f"Yelp Search API Hatası: {e}")
+        log.event(logger, logging.WARNING, "upstream_error", upstream="yelp", operation="search", error=str(e))
         return jsonify({"error": f"Failed to fetch restaurant data from Yelp: {str(e)}"}), 500
 
 
@@ -228,52 +448,234 @@ def get_restaurant_reviews(restaurant_id):
     if not restaurant_id:
         return jsonify({"error": "Missing restaurant_id"}), 400
 
-    if not YELP_API_KEY:
+    if not yelp.YELP_API_KEY:
         return jsonify({"error": "YELP_API_KEY not found in .env file"}), 500
 
-    headers = {
-        "Authorization": f"Bearer {YELP_API_KEY}"
-    }
-    
-    YELP_REVIEWS_URL = f"https://api.yelp.com/v3/businesses/{restaurant_id}/reviews"
-
     try:
-        response = requests.get(YELP_REVIEWS_URL, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        yelp_data = response.json()
+        yelp_data = yelp.reviews(restaurant_id)
         return jsonify(yelp_data), 200
+    except http_client.CircuitOpenError as e:
+        return _upstream_unavailable(e, http_client.yelp)
     except requests.exceptions.RequestException as e:
-        print(f"Yelp Reviews API Hatası: {e}")
+        log.event(logger, logging.WARNING, "upstream_error", upstream="yelp", operation="reviews", error=str(e))
         return jsonify({"error": f"Failed to fetch reviews from Yelp: {str(e)}"}), 500
 
 
+# Restoran detayı: yerel index'teki işletme, Yelp yorumları ve bizim yorumlarımız tek yanıtta
+# İşletme index'te yoksa Yelp'ten alınıp index'e yazılır; Yelp'e ulaşılamazsa elimizdeki
+# yorumlar yine döner (yelp_error ile). Ne yorum ne işletme varsa 404
+@bp.route("/restaurants/<string:yelp_id>", methods=["GET"])
+def get_restaurant(yelp_id):
+    result = restaurants.detail(db_session, yelp_id)
+    found_locally = result["restaurant"] is not None or bool(result["reviews"])
+
+    if not yelp.YELP_API_KEY:
+        if not found_locally:
+            return jsonify({"error": "Restoran bulunamadı"}), 404
+        result["yelp_error"] = "YELP_API_KEY not found in .env file"
+        return jsonify(result), 200
+
+    if result["restaurant"] is None:
+        try:
+            business = yelp.business(yelp_id)
+        except requests.exceptions.RequestException as e:
+            not_found = isinstance(e, requests.exceptions.HTTPError) and e.response is not None \
+                and e.response.status_code == 404
+            if not_found and not found_locally:
+                return jsonify({"error": "Restoran bulunamadı"}), 404
+            if not not_found:
+                log.event(logger, logging.WARNING, "upstream_error", upstream="yelp", operation="business", error=str(e))
+            if not found_locally:
+                if isinstance(e, http_client.CircuitOpenError):
+                    return _upstream_unavailable(e, http_client.yelp)
+                return jsonify({"error": f"Failed to fetch restaurant data from Yelp: {str(e)}"}), 500
+            result["yelp_error"] = str(e)
+            return jsonify(result), 200
+        restaurants.set_business(result, business)
+        restaurants.index_response({"businesses": [business]})
+
+    try:
+        restaurants.merge_yelp_reviews(result, yelp.reviews(yelp_id))
+    except requests.exceptions.RequestException as e:
+        log.event(logger, logging.WARNING, "upstream_error", upstream="yelp", operation="reviews", error=str(e))
+        result["yelp_error"] = str(e)
+    return jsonify(result), 200
+
+
+# Yelp önbelleği isabet / kaçırma sayaçları
+@bp.route("/restaurant-cache-stats", methods=["GET"])
+def restaurant_cache_stats():
+    return jsonify(yelp.cache_stats()), 200
+
+
+def _submit_ocr_upload(image):
+    # Görsel diske yazılmadan doğrudan istek gövdesinden okunur
+    return ocr.engine.submit(image.read(), secure_filename(image.filename), lang=request.form.get("lang"))
+
+
+def _ocr_timeout():
+    # İstemci bekleme süresini kısaltabilir ama OCR_SYNC_TIMEOUT'u aşamaz;
+    # sıfır, negatif ya da sayı olmayan (nan dahil) değerlerde varsayılan kullanılır
+    try:
+        timeout = float(request.args.get("timeout", ocr.OCR_SYNC_TIMEOUT))
+    except ValueError:
+        return ocr.OCR_SYNC_TIMEOUT
+    if not timeout > 0:
+        return ocr.OCR_SYNC_TIMEOUT
+    return min(timeout, ocr.OCR_SYNC_TIMEOUT)
+
+
 # OCR endpoint (mobil ve web uyumlu)
 @bp.route("/photo-ocr", methods=["POST"])
 def photo_ocr():
-    print("OCR endpoint'e istek geldi")
-    print("Gelen dosyalar:", request.files)
-    
     if 'image' not in request.files:
         return jsonify({'error': 'No file uploaded'}), 400
 
-    image = request.files['image']
-    filename = f"{uuid.uuid4().hex}_{secure_filename(image.filename)}"
-    filepath = os.path.join(UPLOAD_FOLDER, filename)
-    image.save(filepath)
+    try:
+        job = _submit_ocr_upload(request.files['image'])
+    except ocr.OCRQueueFull as e:
+        log.event(logger, logging.WARNING, "ocr_rejected", reason="queue_full")
+        return jsonify({'error': str(e)}), 503
+
+    # İş süre içinde bitmezse istemci /ocr/jobs/<job_id> ile sonucu sorgulayabilir
+    if not ocr.engine.wait(job, _ocr_timeout()):
+        return jsonify(job.to_dict()), 202
+
+    if job.status == "failed":
+        log.event(logger, logging.ERROR, "ocr_failed", job_id=job.id, error=job.error)
+        return jsonify({'error': job.error}), 500
+
+    return jsonify({
+        'message': 'OCR success',
+        'filename': job.filename,
+        'text': job.text
+    }), 200
+
+
+# Asenkron OCR: iş kimliği döner, sonuç ayrıca sorgulanır
+@bp.route("/ocr/jobs", methods=["POST"])
+def submit_ocr_job():
+    if 'image' not in request.files:
+        return jsonify({'error': 'No file uploaded'}), 400
 
     try:
-        img = Image.open(filepath)
-        text = pytesseract.image_to_string(img)
+        job = _submit_ocr_upload(request.files['image'])
+    except ocr.OCRQueueFull as e:
+        return jsonify({'error': str(e)}), 503
 
-        return jsonify({
-            'message': 'OCR success',
-            'filename': filename,
-            'text': text
-        }), 200
-    except Exception as e:
-        print("OCR Hatası:", e)
-        return jsonify({'error': str(e)}), 500
+    # ?sync=1 ile istek, zaman aşımına kadar sonucu bekler
+    if request.args.get("sync") == "1" and ocr.engine.wait(job, _ocr_timeout()):
+        return jsonify(job.to_dict()), 200
+
+    return jsonify(job.to_dict()), 202
+
+
+@bp.route("/ocr/jobs/<string:job_id>", methods=["GET"])
+def get_ocr_job(job_id):
+    job = ocr.engine.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    return jsonify(job.to_dict()), 200
+
+
+# OCR kuyruk derinliği ve iş süreleri
+@bp.route("/ocr/stats", methods=["GET"])
+def ocr_stats():
+    return jsonify(ocr.engine.stats()), 200
+
+
+# OCR + çeviri tek istekte: satırlar çevrildikçe NDJSON ya da SSE olarak akıtılır
+@bp.route("/photo-translate", methods=["POST"])
+def photo_translate():
+    if 'image' not in request.files:
+        return jsonify({'error': 'No file uploaded'}), 400
+    if not request.form.get("target_lang"):
+        return jsonify({"error": "Eksik alanlar"}), 400
+
+    target_lang = request.form["target_lang"]
+    user_id = request.form.get("user_id")
+    use_sse = request.args.get("format") == "sse" or "text/event-stream" in request.headers.get("Accept", "")
+
+    # Kullanıcı OCR ve çeviriye başlamadan doğrulanır; akış başladıktan sonra hata dönülemez
+    if user_id:
+        try:
+            user_id = int(user_id)
+        except ValueError:
+            return jsonify({"error": "Geçersiz user_id"}), 400
+        if not db_session.query(User.id).filter_by(id=user_id).first():
+            return jsonify({"error": "User not found"}), 404
+
+    try:
+        job = _submit_ocr_upload(request.files['image'])
+    except ocr.OCRQueueFull as e:
+        return jsonify({'error': str(e)}), 503
+
+    if not ocr.engine.wait(job, _ocr_timeout()):
+        return jsonify(dict(job.to_dict(), error="OCR zaman aşımına uğradı")), 504
+    if job.status == "failed":
+        return jsonify({'error': job.error}), 500
+
+    lines = job.text.splitlines()
+    segments = [i for i, line in enumerate(lines) if line.strip()]
+
+    def encode(event, payload):
+        if use_sse:
+            return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+        return json.dumps(dict(payload, type=event), ensure_ascii=False) + "\n"
+
+    def generate():
+        yield encode("ocr", {"text": job.text, "segments": len(segments), "cached": job.cached})
+
+        translated_lines = list(lines)
+        learned = []
+        failed = 0
+        results = translator.iter_translate_many(
+            [lines[i] for i in segments], target_lang, chunk_size=PHOTO_TRANSLATE_CHUNK_SIZE
+        )
+        for indices, outcome in results:
+            for i in indices:
+                line_no = segments[i]
+                if "error" in outcome:
+                    failed += 1
+                else:
+                    translated_lines[line_no] = outcome["translated_text"]
+                    learned.append((lines[line_no], outcome["translated_text"]))
+                yield encode("segment", dict(outcome, index=line_no, text=lines[line_no]))
+
+        # Satır çevirileri upstream'den geldiği için çeviri belleğine eklenir
+        translation_memory.remember("auto", target_lang, learned)
+
+        translated_text = "\n".join(translated_lines)
+        done = {"translated_text": translated_text, "failed": failed, "saved": False}
+
+        # İstenirse çeviri geçmişine aynı geçişte kaydedilir
+        if user_id and segments and not failed:
+            new_translation = Translation(
+                user_id=user_id,
+                original_text=job.text,
+                target_language=target_lang,
+                translated_text=translated_text
+            )
+            try:
+                db_session.add(new_translation)
+                row = {
+                    "user_id": new_translation.user_id,
+                    "original_text": job.text,
+                    "target_language": target_lang,
+                    "translated_text": translated_text
+                }
+                stats.record_translations(db_session, [row])
+                db_session.commit()
+                done.update(saved=True, translation_id=new_translation.id)
+            except Exception as e:
+                db_session.rollback()
+                done["save_error"] = str(e)
+
+        yield encode("done", done)
+
+    mimetype = "text/event-stream" if use_sse else "application/x-ndjson"
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers={"X-Accel-Buffering": "no"})
 
 
 # Profil resmi yükleme
@@ -289,54 +691,44 @@ def upload_profile_image():
     if not user:
         return jsonify({"error": "Kullanıcı bulunamadı"}), 404
 
-    # Görseli base64 olarak kaydet
-    import base64
-    image_data = base64.b64encode(image.read()).decode('utf-8')
-    user.profile_image = f"data:{image.mimetype};base64,{image_data}"
+    # Görsel blob deposuna yazılır, kullanıcı satırında sadece referans tutulur
+    try:
+        reference = blob_store.save_image(image.read())
+    except blob_store.InvalidImage as e:
+        return jsonify({"error": str(e)}), 400
+
+    user.profile_image = blob_store.BLOB_PREFIX + reference
     db_session.commit()
 
-    return jsonify({"message": "Profil fotoğrafı kaydedildi"}), 200
+    profile_image, thumbnails = _profile_image_urls(user)
+    return jsonify({
+        "message": "Profil fotoğrafı kaydedildi",
+        "profile_image": profile_image,
+        "profile_image_thumbnails": thumbnails
+    }), 200
 
 # Firebase kullanıcılarını veritabanına aktırma
+# İş arka planda çalışır; yeni kullanıcılar eklenir, e-posta / adı değişenler güncellenir.
+# Yarıda kalan çalışma checkpoint'ten sürer; ?full=1 baştan başlatır
 @bp.route("/sync-firebase-users", methods=["POST"])
 def sync_firebase_users():
     try:
-        users = auth.list_users().iterate_all()
-        added = 0
-        skipped = 0
-
-        for firebase_user in users:
-            email = firebase_user.email
-            if not email:
-                continue
-
-            existing = db_session.query(User).filter_by(email=email).first()
-            if existing:
-                skipped += 1
-                continue
-
-            name = firebase_user.display_name.split(" ")[0] if firebase_user.display_name else ""
-            surname = firebase_user.display_name.split(" ")[1] if firebase_user.display_name and " " in firebase_user.display_name else ""
-
-            # Şifre zorunlu olduğu için dummy bir şifre kullanılıyor (login işleminde etkili değil)
-            new_user = User(
-                email=email,
-                password="firebase-auth",  # NOT NULL hatasını önlemek için
-                name=name,
-                surname=surname,
-                profile_image=""
-            )
-            db_session.add(new_user)
-            added += 1
+        firebase_sync.start_sync(full=request.args.get("full") == "1")
+    except firebase_sync.SyncAlreadyRunning as e:
+        return jsonify({"error": str(e), "status": firebase_sync.status()}), 409
+    except firebase_admin_init.FirebaseUnavailable as e:
+        return jsonify({"error": str(e)}), 503
 
-        db_session.commit()
-        return jsonify({
-            "message": f"{added} kullanıcı eklendi, {skipped} kullanıcı zaten vardı."
-        }), 200
+    return jsonify({
+        "message": "Senkronizasyon başlatıldı",
+        "status_url": url_for("routes.sync_firebase_users_status", _external=True)
+    }), 202
+
+
+@bp.route("/sync-firebase-users/status", methods=["GET"])
+def sync_firebase_users_status():
+    return jsonify(firebase_sync.status()), 200
 
-    except Exception as e:
-        db_session.rollback()
-        return jsonify({"error": str(e)}), 500 
 @bp.route("/change-password", methods=["POST"])
 def change_password():
     data = request.get_json()
@@ -376,47 +768,126 @@ def delete_user(user_id):
 @bp.route("/translate", methods=["POST"])
 def translate_text():
     data = request.get_json()
-    print(f"Gelen çeviri isteği verisi: {data}") # DEBUG: Gelen veriyi yazdır
     if not data or "text" not in data or "target_lang" not in data:
-        print("Hata: Eksik alanlar") # DEBUG
         return jsonify({"error": "Eksik alanlar"}), 400
 
     try:
-        # LibreTranslate API'ye gönderilecek veriyi oluştur
-        translate_payload = {
-            "q": data["text"],
-            "source": "auto",
-            "target": data["target_lang"],
-            "format": "text"
-        }
-        print(f"LibreTranslate API'ye gönderilen veri: {translate_payload}") # DEBUG
-
-        response = requests.post("http://localhost:5050/translate", json=translate_payload, timeout=10)
-        
-        print(f"LibreTranslate API'den HTTP durum kodu: {response.status_code}") # DEBUG: Durum kodunu yazdır
-        response.raise_for_status() # HTTP hataları için istisna fırlatır (örn: 4xx veya 5xx)
-
-        translated = response.json()
-        print(f"LibreTranslate API'den gelen ham yanıt: {translated}") # DEBUG: API'den gelen ham yanıtı yazdır
-
-        # LibreTranslate API'nin yanıtında "translatedText" anahtarını bekliyoruz
-        translated_text_content = translated.get("translatedText", "")
-        if not translated_text_content:
-            print("Hata: LibreTranslate yanıtında 'translatedText' bulunamadı veya boş.") # DEBUG
-            return jsonify({"error": "Çeviri yanıtı geçersiz veya boş"}), 500
-
-        return jsonify({
+        # Metin segmentlere bölünür; çeviri belleğinde olmayan segmentler önce önbelleğe,
+        # yoksa LibreTranslate API'ye gider
+        if translation_memory.TRANSLATION_MEMORY_ENABLED:
+            translated_text_content, reuse = translation_memory.translate(data["text"], data["target_lang"])
+        else:
+            translated_text_content, reuse = translator.translate(data["text"], data["target_lang"]), None
+
+        result = {
             "translated_text": translated_text_content # Flask'ın döndürdüğü anahtar 'translated_text' (snake_case)
-        }), 200
+        }
+        if reuse is not None:
+            result["translation_memory"] = reuse
+        return jsonify(result), 200
+    except translator.TranslationError as e:
+        log.event(logger, logging.WARNING, "translate_failed", target=data["target_lang"], chars=len(data["text"]), error=str(e))
+        return jsonify({"error": str(e)}), 500
+    except http_client.CircuitOpenError as e:
+        return _upstream_unavailable(e, http_client.libretranslate)
     except requests.exceptions.Timeout:
-        print("Hata: LibreTranslate API zaman aşımına uğradı.")
+        log.event(logger, logging.WARNING, "upstream_error", upstream="libretranslate", error="timeout")
         return jsonify({"error": "Çeviri hizmeti zaman aşımına uğradı, lütfen tekrar deneyin."}), 500
     except requests.exceptions.RequestException as e:
-        print(f"LibreTranslate API Hatası: {e}")
-        # Hata durumunda LibreTranslate API'den gelen yanıtı da loglayabiliriz
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"LibreTranslate API Hata Yanıtı: {e.response.text}")
+        response = getattr(e, 'response', None)
+        log.event(logger, logging.WARNING, "upstream_error", upstream="libretranslate", error=str(e),
+                  status=response.status_code if response is not None else None)
         return jsonify({"error": f"Çeviri hizmetiyle iletişim hatası: {str(e)}"}), 500
     except Exception as e:
-        print(f"Genel Çeviri Hatası: {e}")
-        return jsonify({"error": f"Sunucu tarafında beklenmeyen hata: {str(e)}"}),
\ No newline at end of file
+        log.event(logger, logging.ERROR, "translate_failed", exc_info=True)
+        return jsonify({"error": f"Sunucu tarafında beklenmeyen hata: {str(e)}"}), 500
+
+# Çeviri önbelleği isabet / kaçırma sayaçları
+@bp.route("/translate/cache-stats", methods=["GET"])
+def translate_cache_stats():
+    return jsonify(translator.cache_stats()), 200
+
+# Çeviri belleği: segment bazında yeniden kullanım oranı
+@bp.route("/translate/memory-stats", methods=["GET"])
+def translate_memory_stats():
+    return jsonify(translation_memory.stats()), 200
+
+# Hatalı çeviri belleği kayıtlarını siler: ?target=en&source=auto&segment=<metin>
+# (en az target ya da segment gerekli)
+@bp.route("/translate/memory", methods=["DELETE"])
+def evict_translation_memory():
+    token = request.headers.get("X-Admin-Token", "")
+    if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN):
+        return jsonify({"error": "Yetkisiz"}), 403
+    target, segment = request.args.get("target"), request.args.get("segment")
+    if not target and not segment:
+        return jsonify({"error": "target ya da segment gerekli"}), 400
+
+    deleted = translation_memory.evict(db_session, target, request.args.get("source"), segment)
+    db_session.commit()
+    return jsonify({"deleted": deleted}), 200
+
+# Toplu çeviri: bir menünün tüm satırları tek istekte
+@bp.route("/translate/batch", methods=["POST"])
+def translate_batch():
+    data = request.get_json()
+    if not data or not isinstance(data.get("texts"), list) or "target_lang" not in data:
+        return jsonify({"error": "Eksik alanlar"}), 400
+
+    texts = data["texts"]
+    if len(texts) > TRANSLATE_BATCH_MAX_ITEMS:
+        return jsonify({"error": f"En fazla {TRANSLATE_BATCH_MAX_ITEMS} metin gönderilebilir"}), 400
+
+    results = translator.translate_many(texts, data["target_lang"], data.get("source_lang", "auto"))
+
+    return jsonify({
+        "results": [dict(outcome, text=text) for text, outcome in zip(texts, results)],
+        "count": len(texts),
+        "failed": sum(1 for outcome in results if "error" in outcome)
+    }), 200
+
+# Veritabanı bağlantı havuzu kullanımı ve bekleme süreleri
+@bp.route("/db/pool-stats", methods=["GET"])
+def db_pool_stats():
+    return jsonify(pool_stats()), 200
+
+# Dış servis başına gecikme, hata ve circuit breaker durumu
+@bp.route("/upstream-stats", methods=["GET"])
+def upstream_stats():
+    return jsonify(http_client.stats()), 200
+
+# Route sınıfı başına eşzamanlı / bekleyen istekler ve reddedilen istek sayıları
+@bp.route("/admission-stats", methods=["GET"])
+def admission_stats():
+    return jsonify(admission.stats()), 200
+
+# Prometheus formatında istek, DB ve dış servis metrikleri
+@bp.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+# Liveness: süreç ayakta mı (bağımlılıklara bakılmaz)
+@bp.route("/health", methods=["GET"])
+def health():
+    return jsonify({"status": "ok"}), 200
+
+# Readiness: veritabanına ulaşılabiliyor ve şema güncel mi
+# Firebase ve OCR isteğe bağlı yüklendiği için hazır olmayı engellemez
+@bp.route("/ready", methods=["GET"])
+def ready():
+    checks = {}
+    try:
+        db_session.execute(text("SELECT 1"))
+        checks["database"] = "ok"
+        checks["schema"] = "ok" if migrations.is_current() else "pending migrations"
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        checks["database"] = f"error: {e.__class__.__name__}"
+
+    is_ready = all(value == "ok" for value in checks.values())
+    return jsonify({
+        "status": "ready" if is_ready else "not ready",
+        "checks": checks,
+        "firebase_initialized": firebase_admin_init.is_initialized(),
+        "startup_ms": {k: round(v * 1000, 1) for k, v in current_app.config.get("STARTUP_SECONDS", {}).items()}
+    }), 200 if is_ready else 503
@@ -0,0 +1,175 @@
+import base64
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import and_, func, literal, literal_column, or_
+
+from app.models.review import Review
+from app.models.translation import Translation
+from app.pagination import PaginationError
+
+# Kullanıcının çeviri / yorum geçmişinde arama.
+# PostgreSQL: search_vector (stored generated tsvector, GIN) üzerinde sıralı tam metin
+# araması + pg_trgm ile yazım hatasına dayanıklı eşleşme (bkz. migrations 0004).
+# Diğer veritabanları (yerel sqlite): kelime bazlı LIKE, en yeni kayıt önce.
+
+# Menüler ve yorumlar çok dilli; kök bulma yerine dil bağımsız 'simple' sözlüğü kullanılır.
+# search_vector kolonu da bu sözlükle üretildiği için ortamdan değiştirilemez.
+SEARCH_TS_CONFIG = "simple"
+SEARCH_FUZZY_THRESHOLD = float(os.getenv("SEARCH_FUZZY_THRESHOLD", "0.5"))
+SEARCH_MIN_QUERY_LENGTH = 2
+SEARCH_MAX_QUERY_LENGTH = 200
+# Sıralı sonuçlar offset ile sayfalanır; çok derin sayfalar için sorgu daraltılmalı
+SEARCH_MAX_OFFSET = int(os.getenv("SEARCH_MAX_OFFSET", "1000"))
+
+
+class SearchError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class SearchTarget:
+    model: type
+    ts_column: str
+    text_columns: tuple
+
+
+# tablo -> (A ağırlıklı kolon, B ağırlıklı kolon); migrations bu tanımdan index üretir
+SEARCH_COLUMNS = {
+    "translation_history": ("original_text", "translated_text"),
+    "restaurant_reviews": ("restaurant_name", "review_text"),
+}
+
+TARGETS = {
+    "translations": SearchTarget(Translation, "created_at", SEARCH_COLUMNS["translation_history"]),
+    "reviews": SearchTarget(Review, "visited_at", SEARCH_COLUMNS["restaurant_reviews"]),
+}
+
+
+def encode_offset(offset):
+    return base64.urlsafe_b64encode(f"o|{offset}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_offset(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        kind, offset = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").split("|")
+        offset = int(offset)
+    except (ValueError, UnicodeError):
+        raise PaginationError("Geçersiz cursor")
+    if kind != "o" or offset < 0:
+        raise PaginationError("Geçersiz cursor")
+    return offset
+
+
+def normalize_query(q):
+    q = " ".join((q or "").split())
+    if len(q) < SEARCH_MIN_QUERY_LENGTH:
+        raise SearchError(f"Arama metni en az {SEARCH_MIN_QUERY_LENGTH} karakter olmalı")
+    return q[:SEARCH_MAX_QUERY_LENGTH]
+
+
+def _parse_date(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise SearchError(f"Geçersiz {name} (ISO 8601 bekleniyor)")
+
+
+def _parse_number(value, name):
+    if value in (None, ""):
+        return None
+    try:
+        return Decimal(value)
+    except ArithmeticError:
+        raise SearchError(f"Geçersiz {name}")
+
+
+def build_filters(target, user_id, args):
+    model = target.model
+    ts_attr = getattr(model, target.ts_column)
+    filters = [model.user_id == user_id]
+
+    date_from = _parse_date(args.get("from"), "from")
+    date_to = _parse_date(args.get("to"), "to")
+    if date_from:
+        filters.append(ts_attr >= date_from)
+    if date_to:
+        filters.append(ts_attr <= date_to)
+
+    if model is Translation and args.get("lang"):
+        filters.append(Translation.target_language == args["lang"])
+    if model is Review:
+        min_rating = _parse_number(args.get("min_rating"), "min_rating")
+        max_rating = _parse_number(args.get("max_rating"), "max_rating")
+        if min_rating is not None:
+            filters.append(Review.rating >= min_rating)
+        if max_rating is not None:
+            filters.append(Review.rating <= max_rating)
+    return filters
+
+
+def _postgres_match(target, q):
+    model = target.model
+    columns = [getattr(model, c) for c in target.text_columns]
+    vector = literal_column(f"{model.__tablename__}.search_vector")
+    tsquery = func.websearch_to_tsquery(SEARCH_TS_CONFIG, q)
+
+    # "q <% kolon": q'nun kolondaki en benzer kelime grubuna trigram benzerliği (GIN ile)
+    condition = or_(vector.op("@@")(tsquery), *(literal(q).op("<%")(column) for column in columns))
+    score = func.ts_rank_cd(vector, tsquery) + func.greatest(*(func.word_similarity(q, column) for column in columns))
+    return condition, score
+
+
+def _fallback_match(target, q):
+    model = target.model
+    columns = [func.lower(func.coalesce(getattr(model, c), "")) for c in target.text_columns]
+    terms = [term.lower() for term in q.split()]
+    # Her kelime kolonlardan en az birinde geçmeli; skor eşleşen kelime sayısıdır
+    condition = and_(*(or_(*(column.contains(term, autoescape=True) for column in columns)) for term in terms))
+    return condition, literal(len(terms))
+
+
+def search(session, target_name, user_id, q, args, fields, limit, cursor=None):
+    target = TARGETS[target_name]
+    model = target.model
+    q = normalize_query(q)
+    filters = build_filters(target, user_id, args)
+    offset = decode_offset(cursor) if cursor else 0
+    if offset > SEARCH_MAX_OFFSET:
+        raise PaginationError("Daha fazla sonuç için aramayı daraltın")
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        session.execute(func.set_config("pg_trgm.word_similarity_threshold", str(SEARCH_FUZZY_THRESHOLD), True).select())
+        condition, score = _postgres_match(target, q)
+    else:
+        condition, score = _fallback_match(target, q)
+
+    ts_attr = getattr(model, target.ts_column)
+    columns = [getattr(model, f) for f in fields]
+    rows = session.query(score.label("score"), *columns) \
+        .filter(*filters, condition) \
+        .order_by(literal_column("score").desc(), ts_attr.desc(), model.id.desc()) \
+        .offset(offset).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_offset(offset + limit)
+
+    items = []
+    for row in rows:
+        item = {"score": round(float(row[0]), 4)}
+        for field, value in zip(fields, row[1:]):
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = float(value)
+            item[field] = value
+        items.append(item)
+    return items, next_cursor
@@ -0,0 +1,278 @@
+# Dashboard istatistikleri: dil başına çeviri sayısı, en çok çevrilen ifadeler,
+# restoran başına yorum sayısı ve ortalama puan.
+# Özet tablolar (app/models/stats.py) kayıt eklenirken aynı transaction'da upsert ile
+# artırılır; okuma endpoint'leri ham tabloları taramaz.
+#   python -m app.stats rebuild   geçmişten sıfırdan hesaplar
+#   python -m app.stats check     özetleri geçmişle karşılaştırır (fark varsa çıkış kodu 1)
+import argparse
+import hashlib
+import json
+import os
+import sys
+import unicodedata
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import case, delete, select
+
+from app.database import dialect_insert, engine
+from app.models.review import Review
+from app.models.stats import PhraseStat, RestaurantStat, UserLanguageStat
+from app.models.translation import Translation
+
+STATS_BATCH_SIZE = int(os.getenv("STATS_BATCH_SIZE", "1000"))
+STATS_TOP_DEFAULT = 10
+STATS_TOP_MAX = 100
+
+
+def _normalize(text):
+    return " ".join(unicodedata.normalize("NFC", text or "").split()).casefold()
+
+
+def phrase_key(text):
+    return hashlib.sha256(_normalize(text).encode("utf-8")).hexdigest()
+
+
+def restaurant_key(name, address):
+    return hashlib.sha256(f"{_normalize(name)}|{_normalize(address)}".encode("utf-8")).hexdigest()
+
+
+def _later(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+
+class Rollup:
+    # Bir grup kaydın özet tablolara etkisi (delta). Aynı anahtar tek satırda toplanır;
+    # PostgreSQL tek INSERT ... ON CONFLICT içinde aynı satırın iki kez güncellenmesine izin vermez.
+    def __init__(self):
+        self.languages = {}
+        self.phrases = {}
+        self.restaurants = {}
+
+    def add_translation(self, user_id, original_text, target_language, created_at=None):
+        if user_id is None:
+            return
+        key = (user_id, target_language)
+        self.languages[key] = self.languages.get(key, 0) + 1
+
+        key = (user_id, phrase_key(original_text))
+        entry = self.phrases.get(key)
+        if entry is None:
+            entry = self.phrases[key] = {"phrase": original_text, "count": 0, "last": None}
+        entry["count"] += 1
+        entry["last"] = _later(entry["last"], created_at)
+
+    def add_review(self, restaurant_name, address, rating, visited_at=None):
+        key = restaurant_key(restaurant_name, address)
+        entry = self.restaurants.get(key)
+        if entry is None:
+            entry = self.restaurants[key] = {
+                "name": restaurant_name, "address": address,
+                "count": 0, "rating_count": 0, "rating_sum": Decimal(0), "last": None,
+            }
+        entry["count"] += 1
+        if rating is not None:
+            entry["rating_count"] += 1
+            entry["rating_sum"] += Decimal(str(rating))
+        entry["last"] = _later(entry["last"], visited_at)
+
+    def language_rows(self):
+        return [
+            {"user_id": user_id, "target_language": lang, "translation_count": count}
+            for (user_id, lang), count in sorted(self.languages.items())
+        ]
+
+    def phrase_rows(self):
+        return [
+            {"user_id": user_id, "phrase_key": key, "phrase": e["phrase"],
+             "translation_count": e["count"], "last_translated_at": e["last"]}
+            for (user_id, key), e in sorted(self.phrases.items())
+        ]
+
+    def restaurant_rows(self):
+        return [
+            {"restaurant_key": key, "restaurant_name": e["name"], "address": e["address"],
+             "review_count": e["count"], "rating_count": e["rating_count"],
+             "rating_sum": e["rating_sum"], "last_review_at": e["last"]}
+            for key, e in sorted(self.restaurants.items())
+        ]
+
+
+def _upsert(executor, table, rows, keys, increments, latest=None):
+    # Satırlar anahtar sırasıyla yazılır; eşzamanlı istekler kilitleri aynı sırayla alır
+    if not rows:
+        return
+    insert = dialect_insert(executor.get_bind() if hasattr(executor, "get_bind") else executor)
+    for start in range(0, len(rows), STATS_BATCH_SIZE):
+        stmt = insert(table).values(rows[start:start + STATS_BATCH_SIZE])
+        updates = {column: table.c[column] + stmt.excluded[column] for column in increments}
+        if latest:
+            current, new = table.c[latest], stmt.excluded[latest]
+            updates[latest] = case((current.is_(None), new), (new > current, new), else_=current)
+        executor.execute(stmt.on_conflict_do_update(index_elements=keys, set_=updates))
+
+
+def apply(executor, rollup):
+    _upsert(executor, UserLanguageStat.__table__, rollup.language_rows(),
+            ["user_id", "target_language"], ["translation_count"])
+    _upsert(executor, PhraseStat.__table__, rollup.phrase_rows(),
+            ["user_id", "phrase_key"], ["translation_count"], latest="last_translated_at")
+    _upsert(executor, RestaurantStat.__table__, rollup.restaurant_rows(),
+            ["restaurant_key"], ["review_count", "rating_count", "rating_sum"], latest="last_review_at")
+
+
+def record_translations(session, rows):
+    rollup = Rollup()
+    for row in rows:
+        rollup.add_translation(row["user_id"], row["original_text"], row["target_language"],
+                               row.get("created_at") or datetime.utcnow())
+    apply(session, rollup)
+
+
+def record_reviews(session, rows):
+    rollup = Rollup()
+    for row in rows:
+        rollup.add_review(row["restaurant_name"], row.get("address"), row.get("rating"),
+                          row.get("visited_at") or datetime.utcnow())
+    apply(session, rollup)
+
+
+# Okuma tarafı
+
+def user_stats(session, user_id, top=STATS_TOP_DEFAULT):
+    languages = session.query(UserLanguageStat.target_language, UserLanguageStat.translation_count) \
+        .filter(UserLanguageStat.user_id == user_id).all()
+    phrases = session.query(PhraseStat.phrase, PhraseStat.translation_count, PhraseStat.last_translated_at) \
+        .filter(PhraseStat.user_id == user_id) \
+        .order_by(PhraseStat.translation_count.desc(), PhraseStat.phrase_key) \
+        .limit(top).all()
+    return {
+        "user_id": user_id,
+        "total_translations": sum(count for _, count in languages),
+        "languages": sorted(
+            ({"target_language": lang, "count": count} for lang, count in languages),
+            key=lambda item: -item["count"]
+        ),
+        "top_phrases": [
+            {"phrase": phrase, "count": count, "last_translated_at": last.isoformat() if last else None}
+            for phrase, count, last in phrases
+        ],
+    }
+
+
+def _restaurant_dict(stat):
+    return {
+        "restaurant_name": stat.restaurant_name,
+        "address": stat.address,
+        "review_count": stat.review_count,
+        "average_rating": round(float(stat.rating_sum) / stat.rating_count, 2) if stat.rating_count else None,
+        "last_review_at": stat.last_review_at.isoformat() if stat.last_review_at else None,
+    }
+
+
+def restaurant_stats(session, name, address):
+    stat = session.get(RestaurantStat, restaurant_key(name, address))
+    return _restaurant_dict(stat) if stat else None
+
+
+def top_restaurants(session, top=STATS_TOP_DEFAULT):
+    stats = session.query(RestaurantStat) \
+        .order_by(RestaurantStat.review_count.desc(), RestaurantStat.restaurant_key) \
+        .limit(top).all()
+    return [_restaurant_dict(stat) for stat in stats]
+
+
+# Yeniden hesaplama ve tutarlılık kontrolü
+
+def compute(conn):
+    # Geçmiş satırları sunucu tarafı cursor ile okunur; bellek kullanımı farklı
+    # ifade / restoran sayısıyla orantılıdır, satır sayısıyla değil
+    rollup = Rollup()
+    streaming = conn.execution_options(stream_results=True, yield_per=STATS_BATCH_SIZE)
+    translations = select(Translation.user_id, Translation.original_text, Translation.target_language, Translation.created_at)
+    for user_id, original_text, target_language, created_at in streaming.execute(translations):
+        rollup.add_translation(user_id, original_text, target_language, created_at)
+    reviews = select(Review.restaurant_name, Review.address, Review.rating, Review.visited_at)
+    for name, address, rating, visited_at in streaming.execute(reviews):
+        rollup.add_review(name, address, rating, visited_at)
+    return rollup
+
+
+def rebuild(conn):
+    rollup = compute(conn)
+    for model in (UserLanguageStat, PhraseStat, RestaurantStat):
+        conn.execute(delete(model))
+    apply(conn, rollup)
+    return {
+        "user_language_stats": len(rollup.languages),
+        "phrase_stats": len(rollup.phrases),
+        "restaurant_stats": len(rollup.restaurants),
+    }
+
+
+def _diff(expected, actual, compare_keys):
+    missing = [key for key in expected if key not in actual]
+    extra = [key for key in actual if key not in expected]
+    mismatched = []
+    for key, row in expected.items():
+        if key in actual:
+            for column in compare_keys:
+                a, b = row[column], actual[key][column]
+                if (a != b) if not isinstance(a, Decimal) else abs(Decimal(str(b)) - a) > Decimal("0.000001"):
+                    mismatched.append(key)
+                    break
+    return {
+        "expected": len(expected),
+        "actual": len(actual),
+        "missing": len(missing),
+        "extra": len(extra),
+        "mismatched": len(mismatched),
+        "examples": [list(k) if isinstance(k, tuple) else k for k in (missing + extra + mismatched)[:5]],
+    }
+
+
+def check(conn):
+    rollup = compute(conn)
+    tables = {
+        "user_language_stats": (UserLanguageStat, ("user_id", "target_language"), rollup.language_rows(), ("translation_count",)),
+        "phrase_stats": (PhraseStat, ("user_id", "phrase_key"), rollup.phrase_rows(), ("translation_count",)),
+        "restaurant_stats": (RestaurantStat, ("restaurant_key",), rollup.restaurant_rows(),
+                             ("review_count", "rating_count", "rating_sum")),
+    }
+    report = {}
+    for name, (model, keys, rows, compare_keys) in tables.items():
+        expected = {tuple(row[k] for k in keys): row for row in rows}
+        actual = {
+            tuple(row[k] for k in keys): row
+            for row in conn.execute(select(model.__table__)).mappings()
+        }
+        report[name] = _diff(expected, actual, compare_keys)
+    return report
+
+
+def has_drift(report):
+    return any(r["missing"] or r["extra"] or r["mismatched"] for r in report.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="İstatistik özet tabloları")
+    parser.add_argument("command", choices=("rebuild", "check"))
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        with engine.begin() as conn:
+            print(json.dumps(rebuild(conn), indent=2))
+        return 0
+
+    with engine.connect() as conn:
+        report = check(conn)
+    print(json.dumps(report, indent=2))
+    return 1 if has_drift(report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+# Segment düzeyinde çeviri belleği (translation memory).
+# OCR'lanmış menüler fotoğraftan fotoğrafa az değişir (birkaç fiyat, yeni bir yemek).
+# Metin satır ve cümlelere bölünür; her segment boşluk ve rakamlardan arındırılmış
+# anahtarıyla translation_memory tablosunda aranır. Sadece görülmemiş segmentler
+# LibreTranslate'e gider, sonuç orijinal satır düzeninde yeniden birleştirilir.
+# Bellek sadece LibreTranslate'in döndürdüğü çevirilerden beslenir (canlı istekler ve
+# kalıcı çeviri önbelleği); istemcinin gönderdiği geçmiş kayıtları belleğe yazılmaz.
+#   python -m app.translation_memory backfill   çeviri önbelleğindeki kayıtları belleğe ekler
+#   python -m app.translation_memory evict --target en [--source auto] [--segment "..."]
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import unicodedata
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import metrics, translator
+from app.database import db_session, dialect_insert, engine
+from app.models.translation_cache import TranslationCacheEntry
+from app.models.translation_memory import TranslationMemoryEntry
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_MEMORY_ENABLED = os.getenv("TRANSLATION_MEMORY_ENABLED", "1") == "1"
+TRANSLATION_MEMORY_BATCH_SIZE = int(os.getenv("TRANSLATION_MEMORY_BATCH_SIZE", "500"))
+
+# Rakam gruplarının (fiyat, gramaj, adet) anahtardaki ve saklanan çevirideki yer tutucusu
+SLOT = "\ufffc"
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_LINE_BREAK = re.compile(r"(\r\n|\r|\n)")
+# Cümle sonu: noktalama + boşluk ("12.50" gibi ondalıklar bölünmez)
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?…])\s+(?=\S)")
+_LETTER = re.compile(r"[^\W\d_]")
+
+segment_outcomes = metrics.register(metrics.Counter(
+    "lingualens_translation_memory_segments_total", "Çeviri belleği segment sonuçları", ("outcome",)))
+
+_stats_lock = threading.Lock()
+_stats = {
+    "requests": 0,
+    "segments": 0,
+    "reused": 0,
+    "translated": 0,
+    "chars": 0,
+    "reused_chars": 0,
+}
+
+
+def _count(report):
+    with _stats_lock:
+        _stats["requests"] += 1
+        for name in ("segments", "reused", "translated", "chars", "reused_chars"):
+            _stats[name] += report[name]
+    for outcome in ("reused", "translated"):
+        if report[outcome]:
+            segment_outcomes.inc(outcome, amount=report[outcome])
+
+
+def normalize_segment(segment):
+    return " ".join(unicodedata.normalize("NFC", segment).split())
+
+
+def split(text):
+    # (çevrilecek mi, metin) parçaları; parçalar art arda eklenince orijinal metin çıkar.
+    # Satır sonları, satır başı / sonu boşlukları ve harf içermeyen parçalar (fiyat,
+    # ayraç çizgisi) olduğu gibi kalır.
+    parts = []
+    for line in _LINE_BREAK.split(text):
+        stripped = line.strip()
+        if not stripped:
+            if line:
+                parts.append((False, line))
+            continue
+        lead = line[:len(line) - len(line.lstrip())]
+        trail = line[len(line.rstrip()):]
+        if lead:
+            parts.append((False, lead))
+        start = 0
+        for match in _SENTENCE_BREAK.finditer(stripped):
+            parts.append(_part(stripped[start:match.start()]))
+            parts.append((False, match.group()))
+            start = match.end()
+        parts.append(_part(stripped[start:]))
+        if trail:
+            parts.append((False, trail))
+    return parts
+
+
+def _part(segment):
+    return (bool(_LETTER.search(segment)), segment)
+
+
+def segments(text):
+    return [normalize_segment(segment) for translatable, segment in split(text) if translatable]
+
+
+def template(segment):
+    # "Köfte 45 TL" -> ("Köfte ￼ TL", ["45"])
+    return _NUMBER.sub(SLOT, segment), _NUMBER.findall(segment)
+
+
+def segment_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _fill(translated, numbers):
+    parts = translated.split(SLOT)
+    if len(parts) != len(numbers) + 1:
+        return None
+    return "".join(part + number for part, number in zip(parts, numbers + [""]))
+
+
+def entry(source, target, segment, translated):
+    # Çevirideki rakamlar kaynaktakiyle aynı sırada geçiyorsa yer tutuculu (şablon)
+    # kayıt üretilir; aksi halde (ör. çevirmen "12,50"yi "12.50" yazdıysa) birebir kayıt
+    source_template, numbers = template(segment)
+    translated = normalize_segment(translated)
+    if numbers and _NUMBER.findall(translated) == numbers:
+        return {"source_language": source, "target_language": target, "segment_key": segment_key(source_template),
+                "source_text": source_template, "translated_text": _NUMBER.sub(SLOT, translated),
+                "slots": len(numbers)}
+    return {"source_language": source, "target_language": target, "segment_key": segment_key(segment),
+            "source_text": segment, "translated_text": translated, "slots": 0}
+
+
+def _lookup_keys(segment):
+    source_template, numbers = template(segment)
+    keys = [(segment_key(source_template), numbers)]
+    if numbers:
+        keys.append((segment_key(segment), []))
+    return keys
+
+
+def lookup(session, source, target, unique_segments):
+    # segment -> çeviri; önce şablon, yoksa birebir kayıt
+    wanted = {segment: _lookup_keys(segment) for segment in unique_segments}
+    all_keys = list({key for keys in wanted.values() for key, _ in keys})
+    stored = {}
+    for start in range(0, len(all_keys), TRANSLATION_MEMORY_BATCH_SIZE):
+        chunk = all_keys[start:start + TRANSLATION_MEMORY_BATCH_SIZE]
+        stored.update(session.execute(
+            select(TranslationMemoryEntry.segment_key, TranslationMemoryEntry.translated_text)
+            .where(TranslationMemoryEntry.source_language == source, TranslationMemoryEntry.target_language == target,
+                   TranslationMemoryEntry.segment_key.in_(chunk))
+        ).all())
+
+    found = {}
+    for segment, keys in wanted.items():
+        for key, numbers in keys:
+            if key in stored:
+                translated = _fill(stored[key], numbers)
+                if translated is not None:
+                    found[segment] = translated
+                    break
+    return found
+
+
+KEY_COLUMNS = ["source_language", "target_language", "segment_key"]
+
+
+def store(executor, rows, overwrite=True):
+    # overwrite: upstream'in son çevirisi mevcut kaydın yerine geçer (düzeltilmiş ya da
+    # yeniden çevrilmiş segmentler); backfill mevcut kayıtlara dokunmaz
+    rows = list({tuple(row[k] for k in KEY_COLUMNS): row for row in rows}.values())
+    if not rows:
+        return
+    bind = executor.get_bind() if hasattr(executor, "get_bind") else executor
+    insert = dialect_insert(bind)
+    for start in range(0, len(rows), TRANSLATION_MEMORY_BATCH_SIZE):
+        stmt = insert(TranslationMemoryEntry.__table__).values(rows[start:start + TRANSLATION_MEMORY_BATCH_SIZE])
+        if overwrite:
+            stmt = stmt.on_conflict_do_update(index_elements=KEY_COLUMNS, set_={
+                column: stmt.excluded[column] for column in ("source_text", "translated_text", "slots", "created_at")
+            })
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=KEY_COLUMNS)
+        executor.execute(stmt)
+
+
+def aligned_entries(source, target, original_text, translated_text):
+    # Çok segmentli çeviri: kaynak ve çeviri aynı sayıda segmente bölünüyorsa segmentler eşlenir
+    if not original_text or not translated_text:
+        return []
+    sources, translations = segments(original_text), segments(translated_text)
+    if not sources or len(sources) != len(translations):
+        return []
+    return [entry(source, target, s, t) for s, t in zip(sources, translations)]
+
+
+def remember(source, target, pairs):
+    # Upstream'den gelen (metin, çeviri) çiftleri belleğe yazılır (ör. photo-translate satırları)
+    if not TRANSLATION_MEMORY_ENABLED:
+        return
+    entries = []
+    for original_text, translated_text in pairs:
+        entries.extend(aligned_entries(source, target, original_text, translated_text))
+    _safe_store(entries)
+
+
+def evict(executor, target=None, source=None, segment=None):
+    # Hatalı kayıtları siler; segment verilirse şablon ve birebir anahtarlarının ikisi de silinir
+    stmt = delete(TranslationMemoryEntry)
+    if target:
+        stmt = stmt.where(TranslationMemoryEntry.target_language == target)
+    if source:
+        stmt = stmt.where(TranslationMemoryEntry.source_language == source)
+    if segment:
+        keys = [key for key, _ in _lookup_keys(normalize_segment(segment))]
+        stmt = stmt.where(TranslationMemoryEntry.segment_key.in_(keys))
+    return executor.execute(stmt).rowcount
+
+
+def _report(parts, reused):
+    report = {"segments": 0, "reused": 0, "translated": 0, "chars": 0, "reused_chars": 0}
+    for translatable, segment in parts:
+        if not translatable:
+            continue
+        segment = normalize_segment(segment)
+        report["segments"] += 1
+        report["chars"] += len(segment)
+        if segment in reused:
+            report["reused"] += 1
+            report["reused_chars"] += len(segment)
+        else:
+            report["translated"] += 1
+    report["reuse_ratio"] = round(report["reused"] / report["segments"], 4) if report["segments"] else 0.0
+    return report
+
+
+def _assemble(parts, translations):
+    return "".join(translations[normalize_segment(segment)] if translatable else segment
+                   for translatable, segment in parts)
+
+
+def _safe_lookup(source, target, unique_segments):
+    try:
+        return lookup(db_session, source, target, unique_segments)
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.warning("Çeviri belleği okunamadı: %s", e)
+        return {}
+
+
+def _safe_store(entries):
+    if not entries:
+        return
+    try:
+        store(db_session, entries)
+        db_session.commit()
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.warning("Çeviri belleğine yazılamadı: %s", e)
+
+
+def _prepare(text, source, target):
+    parts = split(text)
+    unique_segments = list(dict.fromkeys(normalize_segment(s) for translatable, s in parts if translatable))
+    reused = _safe_lookup(source, target, unique_segments) if unique_segments else {}
+    misses = [segment for segment in unique_segments if segment not in reused]
+    return parts, reused, misses
+
+
+def _finish(parts, reused, misses, translated, source, target):
+    _safe_store([entry(source, target, segment, result) for segment, result in zip(misses, translated)])
+    translations = dict(reused)
+    translations.update(zip(misses, translated))
+    report = _report(parts, reused)
+    _count(report)
+    return _assemble(parts, translations), report
+
+
+def translate(text, target, source="auto"):
+    # (çeviri, rapor) döner; rapor segment ve yeniden kullanım sayılarını içerir
+    parts, reused, misses = _prepare(text, source, target)
+    if not misses:
+        translated = []
+    elif len(misses) == 1:
+        translated = [translator.translate(misses[0], target, source)]
+    else:
+        results = translator.translate_many(misses, target, source, raise_errors=True)
+        translated = [outcome["translated_text"] for outcome in results]
+    return _finish(parts, reused, misses, translated, source, target)
+
+
+def _with_thread_session(fn, *args):
+    try:
+        return fn(*args)
+    finally:
+        db_session.remove()
+
+
+async def atranslate(text, target, source="auto"):
+    # translate() ile aynı; DB adımları thread havuzunda, eksik segmentler aynı
+    # toplu (dizi q) upstream istekleriyle çevrilir
+    parts, reused, misses = await asyncio.to_thread(_with_thread_session, _prepare, text, source, target)
+    if not misses:
+        translated = []
+    elif len(misses) == 1:
+        translated = [await translator.atranslate(misses[0], target, source)]
+    else:
+        translated = await translator.atranslate_many(misses, target, source)
+    return await asyncio.to_thread(_with_thread_session, _finish, parts, reused, misses, translated, source, target)
+
+
+def stats():
+    with _stats_lock:
+        result = dict(_stats)
+    result["reuse_ratio"] = round(result["reused"] / result["segments"], 4) if result["segments"] else 0.0
+    result["reused_chars_ratio"] = round(result["reused_chars"] / result["chars"], 4) if result["chars"] else 0.0
+    result["enabled"] = TRANSLATION_MEMORY_ENABLED
+    return result
+
+
+def backfill(conn):
+    # Kalıcı çeviri önbelleği (sadece LibreTranslate yanıtları) sunucu tarafı cursor ile
+    # okunur; mevcut segmentlere dokunulmaz. translation_history istemcinin gönderdiği
+    # metni tuttuğu için kaynak olarak kullanılmaz.
+    streaming = conn.execution_options(stream_results=True, yield_per=TRANSLATION_MEMORY_BATCH_SIZE)
+    cached = select(TranslationCacheEntry.source_language, TranslationCacheEntry.target_language,
+                    TranslationCacheEntry.original_text, TranslationCacheEntry.translated_text) \
+        .order_by(TranslationCacheEntry.id)
+    rows, entries = 0, 0
+    for batch in streaming.execute(cached).partitions():
+        pending = []
+        for source, target, original_text, translated_text in batch:
+            pending.extend(aligned_entries(source, target, original_text, translated_text))
+        store(conn, pending, overwrite=False)
+        rows += len(batch)
+        entries += len(pending)
+    return {"cache_rows": rows, "segments": entries}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Çeviri belleği")
+    parser.add_argument("command", choices=("backfill", "evict"))
+    parser.add_argument("--target", help="evict: hedef dil")
+    parser.add_argument("--source", help="evict: kaynak dil (ör. auto)")
+    parser.add_argument("--segment", help="evict: sadece bu segmentin kayıtları")
+    args = parser.parse_args(argv)
+
+    with engine.begin() as conn:
+        if args.command == "backfill":
+            print(json.dumps(backfill(conn), indent=2))
+        else:
+            if not (args.target or args.segment):
+                parser.error("evict için --target ya da --segment gerekli")
+            print(json.dumps({"deleted": evict(conn, args.target, args.source, args.segment)}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app import http_client
+from app.cache import TTLCache
+from app.database import db_session
+from app.models.translation_cache import TranslationCacheEntry
+
+logger = logging.getLogger(__name__)
+
+LIBRETRANSLATE_URL = os.getenv("LIBRETRANSLATE_URL", "http://localhost:5050/translate")
+
+# Birinci katman: worker içi LRU. İkinci katman: translation_cache tablosu.
+_memory_cache = TTLCache(
+    maxsize=int(os.getenv("TRANSLATION_CACHE_SIZE", "10000")),
+    ttl=int(os.getenv("TRANSLATION_CACHE_TTL", "86400")),
+)
+PERSISTENT_CACHE_ENABLED = os.getenv("TRANSLATION_CACHE_DB", "1") == "1"
+
+# Toplu çeviride LibreTranslate'e aynı anda en fazla bu kadar istek gider
+BATCH_CHUNK_SIZE = int(os.getenv("TRANSLATE_BATCH_CHUNK_SIZE", "25"))
+BATCH_MAX_IN_FLIGHT = int(os.getenv("TRANSLATE_BATCH_MAX_IN_FLIGHT", "4"))
+_upstream_pool = ThreadPoolExecutor(max_workers=BATCH_MAX_IN_FLIGHT, thread_name_prefix="libretranslate")
+
+_stats_lock = threading.Lock()
+_stats = {
+    "memory_hits": 0,
+    "db_hits": 0,
+    "misses": 0,
+    "upstream_calls": 0,
+    "upstream_errors": 0,
+}
+
+
+class TranslationError(Exception):
+    pass
+
+
+def _count(name, n=1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def normalize_text(text):
+    # Aynı menü satırının farklı boşluk / unicode biçimleri aynı anahtara düşsün
+    # Satır yapısı korunur; OCR metinlerinde satır sonları anlam taşır
+    text = unicodedata.normalize("NFC", text)
+    return "\n".join(" ".join(line.split()) for line in text.splitlines()).strip()
+
+
+def cache_key(text, source, target):
+    raw = f"{source}\x1f{target}\x1f{normalize_text(text)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _db_lookup(key):
+    if not PERSISTENT_CACHE_ENABLED:
+        return None
+    try:
+        entry = db_session.query(TranslationCacheEntry.translated_text).filter_by(cache_key=key).first()
+        return entry[0] if entry else None
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.warning("Çeviri önbelleği okunamadı: %s", e)
+        return None
+
+
+def _db_lookup_many(keys):
+    if not PERSISTENT_CACHE_ENABLED or not keys:
+        return {}
+    try:
+        rows = db_session.query(TranslationCacheEntry.cache_key, TranslationCacheEntry.translated_text) \
+            .filter(TranslationCacheEntry.cache_key.in_(keys)).all()
+        return dict(rows)
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.warning("Çeviri önbelleği okunamadı: %s", e)
+        return {}
+
+
+def _db_store(key, text, source, target, translated):
+    if not PERSISTENT_CACHE_ENABLED:
+        return
+    try:
+        db_session.add(TranslationCacheEntry(
+            cache_key=key,
+            source_language=source,
+            target_language=target,
+            original_text=normalize_text(text),
+            translated_text=translated,
+        ))
+        db_session.commit()
+    except IntegrityError:
+        # Başka bir worker aynı anahtarı az önce yazmış
+        db_session.rollback()
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.warning("Çeviri önbelleğine yazılamadı: %s", e)
+
+
+def _db_store_many(entries, source, target):
+    # entries: (anahtar, metin, çeviri) üçlüleri; tek commit ile yazılır
+    if not PERSISTENT_CACHE_ENABLED or not entries:
+        return
+    try:
+        db_session.add_all([
+            TranslationCacheEntry(
+                cache_key=key,
+                source_language=source,
+                target_language=target,
+                original_text=text,
+                translated_text=translated,
+            )
+            for key, text, translated in entries
+        ])
+        db_session.commit()
+    except IntegrityError:
+        # Bazı anahtarlar başka bir worker tarafından yazılmış; tek tek dene
+        db_session.rollback()
+        for key, text, translated in entries:
+            _db_store(key, text, source, target, translated)
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.warning("Çeviri önbelleğine yazılamadı: %s", e)
+
+
+def _payload(q, source, target):
+    # q tek bir metin ya da metin listesi olabilir; LibreTranslate ikisini de kabul eder
+    return {
+        "q": q,
+        "source": source,
+        "target": target,
+        "format": "text"
+    }
+
+
+def _parse_response(q, data):
+    translated = data.get("translatedText", "")
+    if not translated:
+        raise TranslationError("Çeviri yanıtı geçersiz veya boş")
+    if isinstance(q, list) and (not isinstance(translated, list) or len(translated) != len(q)):
+        raise TranslationError("Toplu çeviri yanıtı istekle eşleşmiyor")
+    return translated
+
+
+def _call_upstream(q, source, target):
+    _count("upstream_calls")
+    try:
+        # Çeviri yan etkisiz olduğundan POST olsa da bağlantı hataları ve 502/503/504 tekrar
+        # denenir; okuma zaman aşımı (istek işleniyor olabilir) tekrarlanmaz
+        response = http_client.libretranslate.post(LIBRETRANSLATE_URL, json=_payload(q, source, target), idempotent=True)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        _count("upstream_errors")
+        raise
+
+    return _parse_response(q, response.json())
+
+
+def translate(text, target, source="auto"):
+    key = cache_key(text, source, target)
+
+    cached = _memory_cache.get(key)
+    if cached is not None:
+        _count("memory_hits")
+        return cached
+
+    cached = _db_lookup(key)
+    if cached is not None:
+        _count("db_hits")
+        _memory_cache.set(key, cached)
+        return cached
+
+    _count("misses")
+    # Normalize metin sadece önbellek anahtarı içindir; çevirmen metni olduğu gibi alır
+    translated = _call_upstream(text, source, target)
+    _memory_cache.set(key, translated)
+    _db_store(key, text, source, target, translated)
+    return translated
+
+
+def _with_thread_session(fn, *args):
+    # ASGI modunda DB katmanı thread havuzunda çalışır; session o thread'de kapatılır
+    try:
+        return fn(*args)
+    finally:
+        db_session.remove()
+
+
+async def _acall_upstream(q, source, target):
+    # _call_upstream'in httpx karşılığı
+    import httpx
+    from app import async_http
+
+    _count("upstream_calls")
+    try:
+        response = await async_http.libretranslate.post(LIBRETRANSLATE_URL, json=_payload(q, source, target), idempotent=True)
+        response.raise_for_status()
+    except (httpx.HTTPError, http_client.CircuitOpenError):
+        _count("upstream_errors")
+        raise
+
+    return _parse_response(q, response.json())
+
+
+async def atranslate(text, target, source="auto"):
+    # translate() ile aynı önbellek katmanları; upstream çağrısı httpx ile beklenir
+    key = cache_key(text, source, target)
+
+    cached = _memory_cache.get(key)
+    if cached is not None:
+        _count("memory_hits")
+        return cached
+
+    cached = await asyncio.to_thread(_with_thread_session, _db_lookup, key)
+    if cached is not None:
+        _count("db_hits")
+        _memory_cache.set(key, cached)
+        return cached
+
+    _count("misses")
+    translated = await _acall_upstream(text, source, target)
+    _memory_cache.set(key, translated)
+    await asyncio.to_thread(_with_thread_session, _db_store, key, text, source, target, translated)
+    return translated
+
+
+async def atranslate_many(texts, target, source="auto"):
+    # translate_many(raise_errors=True) karşılığı: çevirileri girdi sırasıyla döner.
+    # Önbellekte olmayanlar BATCH_CHUNK_SIZE'lık dizi q istekleriyle (en fazla
+    # BATCH_MAX_IN_FLIGHT eşzamanlı) çevrilir; upstream hatası istisna olarak yükselir
+    keys = [cache_key(text, source, target) for text in texts]
+    originals = {}
+    for key, text in zip(keys, texts):
+        originals.setdefault(key, text)
+
+    translations, pending = {}, []
+    for key in originals:
+        cached = _memory_cache.get(key)
+        if cached is not None:
+            _count("memory_hits")
+            translations[key] = cached
+        else:
+            pending.append(key)
+
+    stored = await asyncio.to_thread(_with_thread_session, _db_lookup_many, pending)
+    misses = []
+    for key in pending:
+        if key in stored:
+            _count("db_hits")
+            _memory_cache.set(key, stored[key])
+            translations[key] = stored[key]
+        else:
+            misses.append(key)
+
+    if misses:
+        _count("misses", len(misses))
+        chunks = [misses[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(misses), BATCH_CHUNK_SIZE)]
+        semaphore = asyncio.Semaphore(BATCH_MAX_IN_FLIGHT)
+
+        async def call(chunk):
+            async with semaphore:
+                return await _acall_upstream([originals[key] for key in chunk], source, target)
+
+        results = await asyncio.gather(*(call(chunk) for chunk in chunks))
+        entries = [(key, normalize_text(originals[key]), translated)
+                   for chunk, result in zip(chunks, results) for key, translated in zip(chunk, result)]
+        for key, _, translated in entries:
+            _memory_cache.set(key, translated)
+            translations[key] = translated
+        await asyncio.to_thread(_with_thread_session, _db_store_many, entries, source, target)
+
+    return [translations[key] for key in keys]
+
+
+def iter_translate_many(texts, target, source="auto", chunk_size=None, raise_errors=False):
+    # Sonuçları hazır oldukça (girdi indeksleri, sonuç) çiftleri olarak üretir.
+    # Tekrarlanan metinler tek bir kez çevrilir; önbellekte olanlar hemen döner.
+    # raise_errors: upstream hatası sonuç yerine istisna olarak yükseltilir
+    groups = {}
+    for i, text in enumerate(texts):
+        if not isinstance(text, str) or not text.strip():
+            yield [i], {"error": "Geçersiz veya boş metin"}
+            continue
+        key = cache_key(text, source, target)
+        # Aynı anahtara düşen metinlerden ilki çevrilir
+        groups.setdefault(key, {"text": text, "indices": []})["indices"].append(i)
+
+    pending = []
+    for key, group in groups.items():
+        cached = _memory_cache.get(key)
+        if cached is not None:
+            _count("memory_hits")
+            yield group["indices"], {"translated_text": cached}
+        else:
+            pending.append(key)
+
+    stored = _db_lookup_many(pending)
+    misses = []
+    for key in pending:
+        if key in stored:
+            _count("db_hits")
+            _memory_cache.set(key, stored[key])
+            yield groups[key]["indices"], {"translated_text": stored[key]}
+        else:
+            misses.append(key)
+
+    if not misses:
+        return
+
+    _count("misses", len(misses))
+    chunk_size = chunk_size or BATCH_CHUNK_SIZE
+    chunks = [misses[i:i + chunk_size] for i in range(0, len(misses), chunk_size)]
+    futures = {
+        _upstream_pool.submit(_call_upstream, [groups[k]["text"] for k in chunk], source, target): chunk
+        for chunk in chunks
+    }
+    for future in as_completed(futures):
+        chunk = futures[future]
+        try:
+            translations = future.result()
+        except (requests.exceptions.RequestException, TranslationError, ValueError) as e:
+            if raise_errors:
+                raise
+            for key in chunk:
+                yield groups[key]["indices"], {"error": f"Çeviri hizmetiyle iletişim hatası: {str(e)}"}
+            continue
+
+        for key, translated in zip(chunk, translations):
+            _memory_cache.set(key, translated)
+        _db_store_many([(k, normalize_text(groups[k]["text"]), t) for k, t in zip(chunk, translations)], source, target)
+        for key, translated in zip(chunk, translations):
+            yield groups[key]["indices"], {"translated_text": translated}
+
+
+def translate_many(texts, target, source="auto", raise_errors=False):
+    results = [None] * len(texts)
+    for indices, outcome in iter_translate_many(texts, target, source, raise_errors=raise_errors):
+        for i in indices:
+            results[i] = outcome
+    return results
+
+
+def cache_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+    stats["hit_ratio"] = round((stats["memory_hits"] + stats["db_hits"]) / lookups, 4) if lookups else 0.0
+    stats["memory"] = _memory_cache.stats()
+    stats["persistent_enabled"] = PERSISTENT_CACHE_ENABLED
+    return stats
@@ -0,0 +1,128 @@
+import os
+
+from dotenv import load_dotenv
+
+from app import http_client
+from app.cache import SWRCache
+
+load_dotenv()
+
+YELP_API_KEY = os.getenv("YELP_API_KEY")
+YELP_API_BASE = os.getenv("YELP_API_BASE", "https://api.yelp.com/v3")
+
+# Yakın konumlardaki aynı aramalar aynı grid hücresine düşer (derece cinsinden, ~500 m)
+YELP_GEO_GRID = float(os.getenv("YELP_GEO_GRID", "0.005"))
+
+_search_cache = SWRCache(
+    maxsize=int(os.getenv("YELP_SEARCH_CACHE_SIZE", "5000")),
+    ttl=int(os.getenv("YELP_SEARCH_CACHE_TTL", "900")),
+    stale_ttl=int(os.getenv("YELP_SEARCH_CACHE_STALE_TTL", "3600")),
+)
+_reviews_cache = SWRCache(
+    maxsize=int(os.getenv("YELP_REVIEWS_CACHE_SIZE", "5000")),
+    ttl=int(os.getenv("YELP_REVIEWS_CACHE_TTL", "3600")),
+    stale_ttl=int(os.getenv("YELP_REVIEWS_CACHE_STALE_TTL", "21600")),
+)
+_business_cache = SWRCache(
+    maxsize=int(os.getenv("YELP_BUSINESS_CACHE_SIZE", "5000")),
+    ttl=int(os.getenv("YELP_BUSINESS_CACHE_TTL", "3600")),
+    stale_ttl=int(os.getenv("YELP_BUSINESS_CACHE_STALE_TTL", "21600")),
+)
+
+
+def _headers():
+    return {
+        "Authorization": f"Bearer {YELP_API_KEY}"
+    }
+
+
+def parse_coordinates(latitude, longitude):
+    # Sonlu ve geçerli aralıkta olmayan koordinatlar (nan, inf, 91 ...) ValueError yükseltir;
+    # aksi halde snap_to_grid'deki round() patlar ya da anlamsız bir hücre önbelleğe girer
+    latitude, longitude = float(latitude), float(longitude)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("Koordinat aralık dışında")
+    return latitude, longitude
+
+
+def snap_to_grid(value):
+    # Koordinat hücre merkezine yuvarlanır; upstream'e de bu merkez gönderilir
+    # ki aynı hücredeki herkes aynı sonucu alsın
+    cell = round(float(value) / YELP_GEO_GRID)
+    return round(cell * YELP_GEO_GRID, 6)
+
+
+def _search_params(term, latitude, longitude, limit):
+    return {
+        "term": " ".join(term.lower().split()),
+        "latitude": snap_to_grid(latitude),
+        "longitude": snap_to_grid(longitude),
+        "limit": limit
+    }
+
+
+def _search_key(params):
+    return (params["term"], params["latitude"], params["longitude"], params["limit"])
+
+
+def search(term, latitude, longitude, limit=1):
+    params = _search_params(term, latitude, longitude, limit)
+
+    def fetch():
+        response = http_client.yelp.get(f"{YELP_API_BASE}/businesses/search", headers=_headers(), params=params)
+        response.raise_for_status()
+        return response.json()
+
+    return _search_cache.get_or_fetch(_search_key(params), fetch)
+
+
+def reviews(business_id):
+    def fetch():
+        response = http_client.yelp.get(f"{YELP_API_BASE}/businesses/{business_id}/reviews", headers=_headers())
+        response.raise_for_status()
+        return response.json()
+
+    return _reviews_cache.get_or_fetch(business_id, fetch)
+
+
+def business(business_id):
+    def fetch():
+        response = http_client.yelp.get(f"{YELP_API_BASE}/businesses/{business_id}", headers=_headers())
+        response.raise_for_status()
+        return response.json()
+
+    return _business_cache.get_or_fetch(business_id, fetch)
+
+
+# ASGI modu: aynı önbellek kayıtları, httpx ile asenkron upstream çağrısı
+async def asearch(term, latitude, longitude, limit=1):
+    from app import async_http
+
+    params = _search_params(term, latitude, longitude, limit)
+
+    async def fetch():
+        response = await async_http.yelp.get(f"{YELP_API_BASE}/businesses/search", headers=_headers(), params=params)
+        response.raise_for_status()
+        return response.json()
+
+    return await _search_cache.aget_or_fetch(_search_key(params), fetch)
+
+
+async def areviews(business_id):
+    from app import async_http
+
+    async def fetch():
+        response = await async_http.yelp.get(f"{YELP_API_BASE}/businesses/{business_id}/reviews", headers=_headers())
+        response.raise_for_status()
+        return response.json()
+
+    return await _reviews_cache.aget_or_fetch(business_id, fetch)
+
+
+def cache_stats():
+    return {
+        "grid": YELP_GEO_GRID,
+        "search": _search_cache.stats(),
+        "reviews": _reviews_cache.stats(),
+        "business": _business_cache.stats(),
+    }
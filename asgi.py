@@ -0,0 +1,36 @@
+# ASGI giriş noktası: uvicorn asgi:app --workers 4
+# Yelp ve LibreTranslate'e bağlı endpoint'ler coroutine olarak çalışır, böylece
+# upstream beklenirken thread bloklanmaz. Diğer tüm route'lar (DB, OCR vb.)
+# mevcut Flask uygulamasına WSGI köprüsü üzerinden gider.
+import contextlib
+import os
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Mount
+
+from app import async_http, async_routes, metrics
+from main import create_app
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    await async_http.aclose_all()
+
+
+# WSGI köprüsünün thread havuzu: senkron (DB, OCR) route'lar için eşzamanlılık sınırı
+WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", "32"))
+
+flask_app = create_app()
+
+app = Starlette(
+    routes=async_routes.routes + [Mount("/", app=WSGIMiddleware(flask_app, workers=WSGI_THREADS))],
+    middleware=[
+        Middleware(metrics.ASGIMetricsMiddleware),
+        Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"], expose_headers=["X-Next-Cursor", "X-Request-ID"])
+    ],
+    lifespan=lifespan,
+)
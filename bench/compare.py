@@ -0,0 +1,53 @@
+# İki benchmark sonucunu route bazında karşılaştırır (commit'ler arası regresyon için)
+#   python -m bench.compare bench/results/onceki.json bench/results/sonraki.json
+import argparse
+import json
+
+
+def _delta(old, new):
+    if old in (None, 0) or new is None:
+        return "   n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+
+def compare(old_report, new_report):
+    rows = []
+    for name in sorted(set(old_report["routes"]) | set(new_report["routes"])):
+        old = old_report["routes"].get(name)
+        new = new_report["routes"].get(name)
+        if not old or not new:
+            rows.append((name, None))
+            continue
+        rows.append((name, {
+            "throughput_rps": (old["throughput_rps"], new["throughput_rps"]),
+            "p50": (old["latency_ms"]["p50"], new["latency_ms"]["p50"]),
+            "p95": (old["latency_ms"]["p95"], new["latency_ms"]["p95"]),
+            "p99": (old["latency_ms"]["p99"], new["latency_ms"]["p99"]),
+            "errors": (old["errors"], new["errors"]),
+        }))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sonuçlarını karşılaştır")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    args = parser.parse_args(argv)
+
+    with open(args.old) as f:
+        old_report = json.load(f)
+    with open(args.new) as f:
+        new_report = json.load(f)
+
+    print(f"{old_report['meta']['git_sha']} -> {new_report['meta']['git_sha']}")
+    print(f"{'route':22s} {'rps':>16s} {'p50':>16s} {'p95':>16s} {'p99':>16s} {'errors':>10s}")
+    for name, metrics in compare(old_report, new_report):
+        if metrics is None:
+            print(f"{name:22s} (sadece bir sonuçta var)")
+            continue
+        cells = [f"{_delta(*metrics[key]):>16s}" for key in ("throughput_rps", "p50", "p95", "p99")]
+        print(f"{name:22s} {' '.join(cells)} {metrics['errors'][0]:>4} -> {metrics['errors'][1]:<4}")
+
+
+if __name__ == "__main__":
+    main()
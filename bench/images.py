@@ -0,0 +1,31 @@
+# OCR benchmark'ı için Pillow ile menü görselleri üretilir
+import io
+import random
+
+from PIL import Image, ImageDraw, ImageFont
+
+DISHES = [
+    "Margherita Pizza", "Caesar Salad", "Grilled Salmon", "Beef Burger", "Lentil Soup",
+    "Chicken Kebab", "Falafel Wrap", "Tiramisu", "Baklava", "Espresso", "Fresh Lemonade",
+    "Mushroom Risotto", "Fish and Chips", "Greek Yogurt", "Pancakes",
+]
+
+
+def menu_image(lines=12, seed=None, width=800):
+    rng = random.Random(seed)
+    font = ImageFont.load_default()
+    height = 60 + lines * 40
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    draw.text((40, 20), "MENU", fill="black", font=font)
+    for i in range(lines):
+        dish = rng.choice(DISHES)
+        price = f"{rng.randint(3, 40)}.{rng.choice(['00', '50', '90'])}"
+        draw.text((40, 60 + i * 40), f"{dish} ..... {price}", fill="black", font=font)
+    out = io.BytesIO()
+    img.save(out, "PNG")
+    return out.getvalue()
+
+
+def menu_images(count=5, lines=12):
+    return [menu_image(lines=lines, seed=i) for i in range(count)]
@@ -0,0 +1,282 @@
+# Endpoint benchmark / yük testi.
+#
+# create_app() yerel sahte servislere (LibreTranslate, Yelp) ve seed edilmiş bir
+# veritabanına karşı başlatılır, her endpoint ayarlanan eşzamanlılıkla çağrılır ve
+# route başına throughput ile p50/p95/p99 gecikmeleri JSON olarak kaydedilir.
+#
+#   python -m bench.run --concurrency 16 --requests 300
+#   python -m bench.run --routes translate,translate_batch --yelp-latency 0.3
+#   python -m bench.compare bench/results/eski.json bench/results/yeni.json
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from bench import images, upstreams
+from bench.seed import BENCH_PASSWORD, PHRASES, UnsafeDatabase
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class Context:
+    def __init__(self, args, menu_images):
+        self.users = args.users
+        self.heavy_users = args.heavy_users
+        self.menu_images = menu_images
+        self.rng = random.Random(7)
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._spares = 0
+
+    def next_id(self):
+        with self._lock:
+            self._counter += 1
+            return self._counter
+
+    def spare_user_id(self):
+        # Seed'in delete_user için eklediği kullanıcılar sırayla silinir
+        with self._lock:
+            self._spares += 1
+            return self.users + self._spares
+
+    def user_id(self, heavy=False):
+        return self.rng.randint(1, self.heavy_users if heavy else self.users)
+
+    def menu(self):
+        return self.rng.choice(self.menu_images)
+
+
+def _image_files(ctx):
+    return {"image": ("menu.png", ctx.menu(), "image/png")}
+
+
+# Her senaryo (method, path, requests kwargs) döndürür
+SCENARIOS = {
+    "profile": lambda ctx, i: ("GET", f"/profile/{ctx.user_id()}", {}),
+    "login": lambda ctx, i: ("POST", "/login", {"json": {"email": f"user{ctx.user_id()}@bench.local", "password": BENCH_PASSWORD}}),
+    "register": lambda ctx, i: ("POST", "/register", {"json": {"email": f"new{ctx.next_id()}-{time.time_ns()}@bench.local", "password": "x"}}),
+    "translations_history": lambda ctx, i: ("GET", f"/translations/{ctx.user_id(heavy=True)}", {}),
+    "reviews_history": lambda ctx, i: ("GET", f"/reviews/{ctx.user_id(heavy=True)}", {}),
+    "add_translation": lambda ctx, i: ("POST", "/translations", {"json": {
+        "user_id": ctx.user_id(), "original_text": ctx.rng.choice(PHRASES), "target_language": "tr", "translated_text": "x"}}),
+    "add_review": lambda ctx, i: ("POST", "/reviews", {"json": {
+        "user_id": ctx.user_id(), "restaurant_name": "Bench Bistro", "address": "1 Main St", "rating": 4.5, "review_text": "ok"}}),
+    "translations_bulk": lambda ctx, i: ("POST", "/translations/bulk", {"json": [
+        {"user_id": ctx.user_id(), "original_text": p, "target_language": "de", "translated_text": "x",
+         "idempotency_key": f"bench-{ctx.next_id()}"} for p in PHRASES]}),
+    "reviews_bulk": lambda ctx, i: ("POST", "/reviews/bulk", {"json": [
+        {"user_id": ctx.user_id(), "restaurant_name": f"R{n}", "address": "a", "rating": 4, "review_text": "ok",
+         "idempotency_key": f"bench-{ctx.next_id()}"} for n in range(10)]}),
+    "translate": lambda ctx, i: ("POST", "/translate", {"json": {"text": ctx.rng.choice(PHRASES), "target_lang": ctx.rng.choice(["tr", "de", "fr"])}}),
+    "translate_batch": lambda ctx, i: ("POST", "/translate/batch", {"json": {"texts": PHRASES * 3, "target_lang": ctx.rng.choice(["tr", "de", "fr"])}}),
+    "restaurant_search": lambda ctx, i: ("GET", "/restaurant-search", {"params": {
+        "term": ctx.rng.choice(["pizza", "kebab", "coffee"]),
+        "latitude": 41.0 + ctx.rng.random() * 0.05, "longitude": 29.0 + ctx.rng.random() * 0.05}}),
+    "restaurant_reviews": lambda ctx, i: ("GET", f"/restaurant-reviews/biz-{ctx.rng.randint(1, 50)}", {}),
+    "photo_ocr": lambda ctx, i: ("POST", "/photo-ocr", {"files": _image_files(ctx)}),
+    "photo_translate": lambda ctx, i: ("POST", "/photo-translate", {"files": _image_files(ctx), "data": {"target_lang": "tr"}}),
+    "ocr_jobs": lambda ctx, i: ("POST", "/ocr/jobs", {"files": _image_files(ctx)}),
+    "profile_image": lambda ctx, i: ("POST", "/profile-image", {"files": _image_files(ctx), "data": {"user_id": ctx.user_id()}}),
+    # Şifre aynı değere güncellenir; login senaryosu etkilenmez
+    "change_password": lambda ctx, i: ("POST", "/change-password", {"json": {
+        "user_id": ctx.user_id(), "current_password": BENCH_PASSWORD, "new_password": BENCH_PASSWORD}}),
+    "delete_user": lambda ctx, i: ("DELETE", f"/delete-user/{ctx.spare_user_id()}", {}),
+}
+
+
+def run_route(base_url, name, scenario, ctx, total, concurrency, warmup):
+    local = threading.local()
+
+    def call(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        method, path, kwargs = scenario(ctx, i)
+        start = time.perf_counter()
+        try:
+            response = session.request(method, base_url + path, timeout=60, **kwargs)
+            response.content  # akışlı yanıtlar da sonuna kadar okunur
+            status = response.status_code
+        except requests.RequestException:
+            status = "exception"
+        return time.perf_counter() - start, status
+
+    for i in range(warmup):
+        call(i)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(call, range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(s[0] * 1000 for s in samples)
+    statuses = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 400)
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+        "errors": errors,
+        "statuses": statuses,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 2),
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2),
+        },
+    }
+
+
+def _git_sha():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _configure_env(args, workdir):
+    # --database-url ortamdaki DATABASE_URL'den önce gelir
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    os.environ["LIBRETRANSLATE_URL"] = f"http://127.0.0.1:{args.translate_port}/translate"
+    os.environ["YELP_API_BASE"] = f"http://127.0.0.1:{args.yelp_port}/v3"
+    os.environ["YELP_API_KEY"] = "bench"
+    os.environ["FIREBASE_ENABLED"] = "0"
+    # Yük testi tek istemciden (tek IP) gelir; hız sınırı ölçümü bozmasın
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    os.environ.setdefault("BLOB_STORE_DIR", os.path.join(workdir, "blobs"))
+    os.environ.setdefault("UPLOAD_FOLDER", os.path.join(workdir, "uploads"))
+
+
+def _start_server(args):
+    port = _free_port()
+    if args.asgi:
+        import uvicorn
+        config = uvicorn.Config("asgi:app", host="127.0.0.1", port=port, log_level="warning")
+        server = uvicorn.Server(config)
+        threading.Thread(target=server.run, daemon=True).start()
+    else:
+        from werkzeug.serving import make_server
+        from main import create_app
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        server = make_server("127.0.0.1", port, create_app(), threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(base_url + "/translate/cache-stats", timeout=1)
+            return base_url
+        except requests.RequestException:
+            time.sleep(0.1)
+    raise RuntimeError("Sunucu başlatılamadı")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LinguaLens endpoint benchmark")
+    parser.add_argument("--routes", default="all", help="Virgülle ayrılmış senaryo adları ya da 'all'")
+    parser.add_argument("--requests", type=int, default=200, help="Route başına istek sayısı")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--base-url", help="Çalışan bir sunucuya karşı ölç (seed ve sahte servisler atlanır)")
+    parser.add_argument("--asgi", action="store_true", help="Sunucuyu asgi:app ile (uvicorn) başlat")
+    parser.add_argument("--database-url", help="Varsayılan: DATABASE_URL ya da geçici sqlite dosyası")
+    parser.add_argument("--no-seed", action="store_true")
+    parser.add_argument("--force", action="store_true", help="Bench dışı bir veritabanını da silip seed et")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--heavy-users", type=int, default=5)
+    parser.add_argument("--light-history", type=int, default=50)
+    parser.add_argument("--heavy-history", type=int, default=5000)
+    parser.add_argument("--translate-port", type=int, default=5050)
+    parser.add_argument("--translate-latency", type=float, default=0.05)
+    parser.add_argument("--yelp-port", type=int, default=_free_port())
+    parser.add_argument("--yelp-latency", type=float, default=0.3)
+    parser.add_argument("--images", type=int, default=5, help="Üretilecek örnek menü görseli sayısı")
+    parser.add_argument("--output", default=os.path.join(ROOT, "bench", "results"))
+    args = parser.parse_args(argv)
+
+    routes = list(SCENARIOS) if args.routes == "all" else [r.strip() for r in args.routes.split(",") if r.strip()]
+    unknown = [r for r in routes if r not in SCENARIOS]
+    if unknown:
+        parser.error(f"Bilinmeyen senaryo(lar): {', '.join(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix="lingualens-bench-")
+    if args.base_url:
+        base_url = args.base_url.rstrip("/")
+    else:
+        _configure_env(args, workdir)
+        sys.path.insert(0, ROOT)
+        upstreams.start(upstreams.FakeLibreTranslate, args.translate_port, args.translate_latency)
+        upstreams.start(upstreams.FakeYelp, args.yelp_port, args.yelp_latency)
+        if not args.no_seed:
+            from bench.seed import seed
+            spare_users = args.requests + args.warmup if "delete_user" in routes else 0
+            try:
+                print("Veritabanı dolduruluyor:", seed(args.users, args.heavy_users, args.light_history,
+                                                       args.heavy_history, spare_users, force=args.force))
+            except UnsafeDatabase as e:
+                parser.error(str(e))
+        base_url = _start_server(args)
+
+    ctx = Context(args, images.menu_images(args.images))
+    results = {}
+    for name in routes:
+        results[name] = run_route(base_url, name, SCENARIOS[name], ctx, args.requests, args.concurrency, args.warmup)
+        lat = results[name]["latency_ms"]
+        print(f"{name:22s} {results[name]['throughput_rps']:>9} rps  p50={lat['p50']:>8}ms  "
+              f"p95={lat['p95']:>8}ms  p99={lat['p99']:>8}ms  errors={results[name]['errors']}")
+
+    report = {
+        "meta": {
+            "git_sha": _git_sha(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "server": "external" if args.base_url else ("asgi" if args.asgi else "wsgi"),
+            "args": vars(args),
+        },
+        "routes": results,
+    }
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{report['meta']['git_sha']}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print("Sonuçlar:", path)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# Benchmark veritabanını gerçekçi geçmiş boyutlarıyla doldurur.
+# Kullanım: python -m bench.seed --database-url sqlite:///bench.db --users 50 --heavy-history 5000
+# Seed tüm tabloları silip yeniden oluşturur. Bu yüzden sadece yoksa ya da sadece bench
+# kullanıcıları içeren bir SQLite dosyasında çalışır; başka bir veritabanı için --force gerekir.
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+BENCH_PASSWORD = "bench-password"
+PHRASES = [
+    "Where is the restroom?", "The bill, please.", "Is this dish spicy?", "Do you have vegetarian options?",
+    "Grilled chicken with rice", "Soup of the day", "Tap water, please", "No onions, please",
+]
+LANGUAGES = ["tr", "en", "de", "fr", "es", "it"]
+BENCH_EMAIL_DOMAIN = "@bench.local"
+CHUNK = 1000
+
+
+class UnsafeDatabase(RuntimeError):
+    pass
+
+
+def _is_bench_database(engine):
+    # Bench'in oluşturduğu SQLite dosyası: henüz yok ya da içindeki tüm kullanıcılar bench kullanıcısı
+    from sqlalchemy import inspect, select
+    from app.models.user import User
+
+    if engine.dialect.name != "sqlite":
+        return False
+    path = engine.url.database
+    if not path or path == ":memory:" or not os.path.exists(path):
+        return True
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(User.__tablename__):
+            return not inspect(conn).get_table_names()
+        emails = conn.execute(select(User.email)).scalars()
+        return all(email.endswith(BENCH_EMAIL_DOMAIN) for email in emails)
+
+
+def seed(users=50, heavy_users=5, light_history=50, heavy_history=5000, spare_users=0, rng_seed=42, force=False):
+    # spare_users: geçmişi olmayan, delete_user senaryosunun silebileceği ek kullanıcılar
+    # (id'leri users + 1'den başlar)
+    from app import migrations
+    from app.database import Base, engine
+    from app.models.review import Review
+    from app.models.translation import Translation
+    from app.models.user import User
+
+    if not force and not _is_bench_database(engine):
+        raise UnsafeDatabase(
+            f"{engine.url.render_as_string(hide_password=True)} bench veritabanı değil; "
+            "tüm tablolar silineceği için --force olmadan seed edilmez"
+        )
+
+    rng = random.Random(rng_seed)
+    Base.metadata.drop_all(bind=engine)
+    migrations.upgrade()
+
+    # Hash bir kez hesaplanır; her kullanıcı için scrypt çalıştırmak seed'i yavaşlatır
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+    now = datetime.utcnow()
+
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"email": f"user{i}{BENCH_EMAIL_DOMAIN}", "password": password_hash, "name": f"User{i}", "surname": "Bench", "profile_image": ""}
+            for i in range(1, users + 1)
+        ])
+        if spare_users:
+            conn.execute(User.__table__.insert(), [
+                {"email": f"spare{i}{BENCH_EMAIL_DOMAIN}", "password": password_hash, "name": f"Spare{i}", "surname": "Bench", "profile_image": ""}
+                for i in range(1, spare_users + 1)
+            ])
+
+        for user_id in range(1, users + 1):
+            history = heavy_history if user_id <= heavy_users else light_history
+            translations, reviews = [], []
+            for i in range(history):
+                ts = now - timedelta(minutes=history - i)
+                translations.append({
+                    "user_id": user_id,
+                    "original_text": rng.choice(PHRASES),
+                    "target_language": rng.choice(LANGUAGES),
+                    "translated_text": rng.choice(PHRASES)[::-1],
+                    "created_at": ts,
+                })
+                if i % 5 == 0:
+                    reviews.append({
+                        "user_id": user_id,
+                        "restaurant_name": f"Restaurant {rng.randint(1, 500)}",
+                        "address": f"{rng.randint(1, 200)} Market St",
+                        "rating": rng.choice([2, 3, 3.5, 4, 4.5, 5]),
+                        "review_text": "Nice place, would come again.",
+                        "visited_at": ts,
+                    })
+            for start in range(0, len(translations), CHUNK):
+                conn.execute(Translation.__table__.insert(), translations[start:start + CHUNK])
+            for start in range(0, len(reviews), CHUNK):
+                conn.execute(Review.__table__.insert(), reviews[start:start + CHUNK])
+
+    return {"users": users, "heavy_users": heavy_users, "light_history": light_history, "heavy_history": heavy_history,
+            "spare_users": spare_users}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark veritabanını doldur")
+    parser.add_argument("--database-url", help="Varsayılan: DATABASE_URL ortam değişkeni")
+    parser.add_argument("--force", action="store_true", help="Bench dışı bir veritabanını da silip doldur")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--heavy-users", type=int, default=5)
+    parser.add_argument("--light-history", type=int, default=50)
+    parser.add_argument("--heavy-history", type=int, default=5000)
+    parser.add_argument("--spare-users", type=int, default=0)
+    args = parser.parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    try:
+        print(seed(args.users, args.heavy_users, args.light_history, args.heavy_history, args.spare_users,
+                   force=args.force))
+    except UnsafeDatabase as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
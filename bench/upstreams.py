@@ -0,0 +1,85 @@
+# Benchmark için yerel sahte servisler: LibreTranslate (:5050) ve Yelp.
+# Gecikme saniye cinsinden ayarlanır; gerçek servislerin yanıt biçimi taklit edilir.
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeLibreTranslate(_Handler):
+    def do_POST(self):
+        time.sleep(self.latency)
+        data = self._read_json()
+        q = data.get("q", "")
+        target = data.get("target", "en")
+        if isinstance(q, list):
+            translated = [f"[{target}] {text}" for text in q]
+        else:
+            translated = f"[{target}] {q}"
+        self._send_json({"translatedText": translated})
+
+
+class FakeYelp(_Handler):
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if parts[-1] == "reviews":
+            business_id = parts[-2]
+            self._send_json({
+                "reviews": [
+                    {"id": f"{business_id}-r{i}", "rating": 4, "text": "Great food, friendly staff.", "user": {"name": f"User {i}"}}
+                    for i in range(3)
+                ],
+                "total": 3,
+            })
+            return
+
+        params = parse_qs(url.query)
+        term = params.get("term", ["food"])[0]
+        lat = float(params.get("latitude", ["0"])[0])
+        lon = float(params.get("longitude", ["0"])[0])
+        limit = int(params.get("limit", ["1"])[0])
+        self._send_json({
+            "businesses": [
+                {
+                    "id": f"{term}-{i}-{lat:.3f}-{lon:.3f}",
+                    "name": f"{term.title()} Place {i}",
+                    "rating": 4.5,
+                    "review_count": 120,
+                    "coordinates": {"latitude": lat + i * 0.001, "longitude": lon + i * 0.001},
+                    "location": {"display_address": [f"{i} Main St"]},
+                }
+                for i in range(limit)
+            ],
+            "total": limit,
+        })
+
+
+def start(handler, port, latency=0.0):
+    handler_cls = type(handler.__name__, (handler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler_cls)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=f"{handler.__name__}:{port}", daemon=True).start()
+    return server
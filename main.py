@@ -1,22 +1,72 @@
-import app.firebase_admin_init  # Firebase Admin başlatılır
+import time
+_BOOT_STARTED = time.perf_counter()  # import süresi ölçümü için en başta
+
+import logging
+import os
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from app.routes import bp
-from app.database import Base, engine
+from app import admission, log, metrics, profiling, responses
+from app.database import remove_session
+
+IMPORTS_SECONDS = time.perf_counter() - _BOOT_STARTED
+
+# Yerel geliştirmede şemayı açılışta güncellemek için AUTO_MIGRATE=1
+# (üretimde şema dağıtım adımında "python -m app.migrations upgrade" ile kurulur)
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "0") == "1"
+
+logger = logging.getLogger("app.startup")
 
 def create_app():
+    started = time.perf_counter()
     app = Flask(__name__)
+
+    # Load balancer arkasında request.remote_addr gerçek istemci olsun (hız sınırı IP başına)
+    if admission.TRUSTED_PROXY_COUNT:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=admission.TRUSTED_PROXY_COUNT)
     
     # CORS ayarları: frontend'in portunu burada açıkça belirtebilirsin (güvenlik için önerilir)
-    CORS(app, resources={r"/*": {"origins": "*"}})
+    # X-Next-Cursor: geçmiş endpoint'lerinde sonraki sayfanın cursor'ı
+    CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=["X-Next-Cursor", "X-Request-ID"])
+
+    if AUTO_MIGRATE:
+        from app import migrations
+        migrations.upgrade()
 
-    # Veritabanı tablolarını oluştur
-    with app.app_context():
-        Base.metadata.create_all(bind=engine)
+    # İstek kimliği, yapılandırılmış log, metrikler ve (SLOW_REQUEST_MS ile) yavaş istek profili
+    log.init_app(app)
+    metrics.init_app(app)
+    profiling.init_app(app)
+
+    # Pahalı route sınıfları için eşzamanlılık / hız sınırı (reddedilen istekler de metriklere yazılır)
+    admission.init_app(app)
+
+    # orjson JSON kodlayıcı, ETag/304 ve gzip/brotli (en son kaydedilir, önce çalışır)
+    responses.init_app(app)
 
     # Blueprint'i yükle
     app.register_blueprint(bp)
 
+    # Her isteğin session'ı istek bitince kapatılır (hata varsa rollback edilir)
+    app.teardown_appcontext(remove_session)
+
+    # Şema komutları: flask --app main init-db / db-status
+    @app.cli.command("init-db")
+    def init_db():
+        from app import migrations
+        migrations.main(["upgrade"])
+
+    @app.cli.command("db-status")
+    def db_status():
+        from app import migrations
+        migrations.main(["status"])
+
+    # Açılış süreleri /ready ve /metrics'te görünür
+    metrics.STARTUP_SECONDS.update(imports=IMPORTS_SECONDS, create_app=time.perf_counter() - started)
+    app.config["STARTUP_SECONDS"] = dict(metrics.STARTUP_SECONDS)
+    log.event(logger, logging.INFO, "startup", **{f"{k}_ms": round(v * 1000, 1) for k, v in metrics.STARTUP_SECONDS.items()})
+
     return app
 
 if __name__ == "__main__":
@@ -0,0 +1,228 @@
+# Testler yerel sahte servislere (LibreTranslate, Yelp) ve geçici bir SQLite
+# veritabanına karşı çalışır. Ayarlar app modülleri import edilmeden önce yapılmalı.
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_WORKDIR = tempfile.mkdtemp(prefix="lingualens-tests-")
+
+
+class FakeUpstream:
+    # Gelen istekleri kaydeder; yanıt testten değiştirilebilir (handler(method, path, body))
+    def __init__(self, default_handler):
+        self.default_handler = default_handler
+        self.handler = default_handler
+        self.requests = []
+        self._lock = threading.Lock()
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self, method):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"null") if length else None
+                with owner._lock:
+                    owner.requests.append((method, self.path, body))
+                status, payload = owner.handler(method, self.path, body)
+                out = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def reset(self):
+        self.handler = self.default_handler
+        with self._lock:
+            self.requests.clear()
+
+
+def _libretranslate(method, path, body):
+    q = body["q"]
+    prefix = f"[{body['target']}] "
+    return 200, {"translatedText": [prefix + text for text in q] if isinstance(q, list) else prefix + q}
+
+
+def _yelp(method, path, body):
+    url = urlparse(path)
+    parts = url.path.strip("/").split("/")
+    if parts[-1] == "reviews":
+        return 200, {"reviews": [{"id": f"{parts[-2]}-r1", "rating": 5, "text": "Great", "user": {"name": "Yelp User"},
+                                  "time_created": "2024-01-02 10:00:00"}], "total": 1}
+    if parts[-2] == "businesses" and parts[-1] != "search":
+        return 200, {"id": parts[-1], "name": "Yelp Place", "rating": 4.0, "review_count": 10}
+    params = parse_qs(url.query)
+    lat, lon = float(params["latitude"][0]), float(params["longitude"][0])
+    return 200, {"businesses": [{
+        "id": f"biz-{lat:.3f}-{lon:.3f}", "name": f"{params.get('term', ['food'])[0].title()} House",
+        "rating": 4.5, "review_count": 12, "coordinates": {"latitude": lat, "longitude": lon},
+        "location": {"display_address": ["1 Main St"]}, "categories": [{"title": "Turkish"}],
+    }], "total": 1}
+
+
+LIBRETRANSLATE = FakeUpstream(_libretranslate)
+YELP = FakeUpstream(_yelp)
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_WORKDIR, 'test.db')}",
+    "FIREBASE_ENABLED": "0",
+    "LIBRETRANSLATE_URL": f"http://127.0.0.1:{LIBRETRANSLATE.port}/translate",
+    "YELP_API_BASE": f"http://127.0.0.1:{YELP.port}/v3",
+    "YELP_API_KEY": "test",
+    "UPLOAD_FOLDER": os.path.join(_WORKDIR, "uploads"),
+    "BLOB_STORE_DIR": os.path.join(_WORKDIR, "blobs"),
+    "HTTP_BACKOFF_BASE": "0",
+    "HTTP_BACKOFF_MAX": "0",
+    "LOG_LEVEL": "WARNING",
+})
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import migrations
+    from main import create_app
+
+    migrations.upgrade()
+    flask_app = create_app()
+    flask_app.config["TESTING"] = True
+    yield flask_app
+    shutil.rmtree(_WORKDIR, ignore_errors=True)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def db(app):
+    from app.database import db_session
+    return db_session
+
+
+@pytest.fixture(autouse=True)
+def _clean_state(request):
+    # Her test boş tablolar, boş önbellekler ve kapalı devrelerle başlar
+    LIBRETRANSLATE.reset()
+    YELP.reset()
+    yield
+    if "app" not in request.fixturenames:
+        return
+
+    from app import admission, http_client, restaurants, translator, yelp
+    from app.database import Base, db_session, engine
+    from app.models.schema_migration import SchemaMigration
+
+    db_session.remove()
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            if table.name != SchemaMigration.__tablename__:
+                conn.execute(table.delete())
+    translator._memory_cache.clear()
+    restaurants._recently_indexed.clear()
+    for cache in (yelp._search_cache, yelp._reviews_cache, yelp._business_cache):
+        cache._cache.clear()
+    for route_class in admission.CLASSES.values():
+        route_class._buckets.clear()
+    for upstream in (http_client.libretranslate, http_client.yelp):
+        upstream.breaker.record_success()
+
+
+@pytest.fixture
+def libretranslate():
+    return LIBRETRANSLATE
+
+
+@pytest.fixture
+def yelp_api():
+    return YELP
+
+
+@pytest.fixture
+def user(db):
+    from app.models.user import User
+    row = User(email="ayse@example.com", password="x", name="Ayşe", surname="Yılmaz", profile_image="")
+    db.add(row)
+    db.commit()
+    user_id = row.id
+    db.remove()
+    return user_id
+
+
+@pytest.fixture
+def ocr_engine(monkeypatch):
+    # Gerçek tesseract yerine thread havuzunda çalışan sahte OCR; metin görsel boyutunu içerir
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from app import ocr
+
+    calls = []
+
+    def fake_run_ocr(image_bytes, lang):
+        calls.append((image_bytes, lang))
+        now = time.time()
+        return f"MENU {len(image_bytes)}\nÇorba 45 TL", now, now
+
+    engine = ocr.OCREngine(workers=2, max_queue=4)
+    engine._pool = ThreadPoolExecutor(max_workers=2)
+    engine.calls = calls
+    monkeypatch.setattr(ocr, "_run_ocr", fake_run_ocr)
+    monkeypatch.setattr(ocr, "engine", engine)
+    yield engine
+    engine._pool.shutdown(wait=True)
+
+
+def arun(coro):
+    # httpx istemcileri event loop'a bağlıdır; her asyncio.run sonunda kapatılır
+    import asyncio
+    from app import async_http
+
+    async def main():
+        try:
+            return await coro
+        finally:
+            await async_http.aclose_all()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def asgi_client(app):
+    # Sadece async route'lar; Flask tarafı ayrıca test edilir
+    import contextlib
+    from starlette.applications import Starlette
+    from starlette.testclient import TestClient
+    from app import async_http, async_routes
+
+    @contextlib.asynccontextmanager
+    async def lifespan(asgi_app):
+        yield
+        await async_http.aclose_all()
+
+    with TestClient(Starlette(routes=async_routes.routes, lifespan=lifespan)) as test_client:
+        yield test_client
@@ -0,0 +1,134 @@
+import pytest
+
+from app import admission
+from main import create_app
+from app.models.translation import Translation
+
+
+def _limit(monkeypatch, name, concurrency=0, queue=0, queue_timeout=0.05, rate=0, burst=1):
+    route_class = admission.RouteClass(name, concurrency, queue, queue_timeout, rate, burst)
+    monkeypatch.setitem(admission.CLASSES, name, route_class)
+    return route_class
+
+
+def _translate(client, **kwargs):
+    return client.post("/translate", json={"text": "Ayran", "target_lang": "en"}, **kwargs)
+
+
+def test_rate_limit_returns_429_with_retry_after(client, monkeypatch):
+    _limit(monkeypatch, "translate", rate=60, burst=2)
+
+    assert [_translate(client).status_code for _ in range(2)] == [200, 200]
+    response = _translate(client)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_rate_limit_is_keyed_by_address_not_claimed_user(client, monkeypatch):
+    route_class = _limit(monkeypatch, "translate", rate=60, burst=1)
+    assert _translate(client).status_code == 200
+
+    # İstemcinin seçtiği kimlikler yeni bir bucket açmaz
+    assert _translate(client, headers={"X-User-ID": "42"}).status_code == 429
+    assert client.post("/translate?user_id=43", json={"text": "Ayran", "target_lang": "en"}).status_code == 429
+    assert _translate(client, environ_base={"REMOTE_ADDR": "10.0.0.2"}).status_code == 200
+    assert route_class.stats()["tracked_clients"] == 2
+
+
+def test_clients_behind_a_trusted_proxy_get_their_own_bucket(app, monkeypatch):
+    monkeypatch.setattr(admission, "TRUSTED_PROXY_COUNT", 1)
+    proxied = create_app().test_client()
+    route_class = _limit(monkeypatch, "translate", rate=60, burst=1)
+    lb = {"REMOTE_ADDR": "10.0.0.1"}
+
+    assert _translate(proxied, environ_base=lb, headers={"X-Forwarded-For": "203.0.113.5"}).status_code == 200
+    assert _translate(proxied, environ_base=lb, headers={"X-Forwarded-For": "203.0.113.6"}).status_code == 200
+    # Sadece son proxy'nin eklediği değere güvenilir; istemcinin uydurduğu ön ek yeni bucket açmaz
+    spoofed = {"X-Forwarded-For": "198.51.100.1, 203.0.113.5"}
+    assert _translate(proxied, environ_base=lb, headers=spoofed).status_code == 429
+    assert route_class.stats()["tracked_clients"] == 2
+
+
+@pytest.mark.parametrize("remote_addr, forwarded_for, trusted, expected", [
+    ("10.0.0.1", "203.0.113.5", 0, "10.0.0.1"),
+    ("10.0.0.1", None, 1, "10.0.0.1"),
+    ("10.0.0.1", "198.51.100.1, 203.0.113.5", 1, "203.0.113.5"),
+    ("10.0.0.1", "198.51.100.1, 203.0.113.5, 10.0.0.9", 2, "203.0.113.5"),
+    ("10.0.0.1", "203.0.113.5", 2, "10.0.0.1"),
+])
+def test_forwarded_client_matches_proxy_fix(remote_addr, forwarded_for, trusted, expected):
+    assert admission.forwarded_client(remote_addr, forwarded_for, trusted) == expected
+
+
+def test_full_queue_is_rejected_without_waiting(client, monkeypatch):
+    route_class = _limit(monkeypatch, "translate", concurrency=1, queue=0)
+    assert route_class.try_acquire()
+    try:
+        response = _translate(client)
+    finally:
+        route_class.release()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert route_class.stats()["rejected_queue_full"] == 1
+
+
+def test_queued_request_times_out(client, monkeypatch):
+    route_class = _limit(monkeypatch, "translate", concurrency=1, queue=1, queue_timeout=0.05)
+    assert route_class.try_acquire()
+    try:
+        response = _translate(client)
+    finally:
+        route_class.release()
+
+    assert response.status_code == 503
+    stats = route_class.stats()
+    assert (stats["queued"], stats["rejected_timeout"], stats["waiting"]) == (1, 1, 0)
+
+
+def test_export_slot_is_held_until_the_stream_ends(client, db, user, monkeypatch):
+    route_class = _limit(monkeypatch, "export", concurrency=1, queue=0)
+    db.add(Translation(user_id=user, original_text="Ayran", target_language="en", translated_text="x"))
+    db.commit()
+    db.remove()
+
+    response = client.get(f"/export/{user}")
+    assert route_class.active == 1
+    assert client.get(f"/export/{user}").status_code == 503
+
+    assert response.get_data()
+    response.close()
+    assert route_class.active == 0
+    assert client.get(f"/export/{user}").status_code == 200
+
+
+def test_cheap_routes_are_not_limited(client, user, monkeypatch):
+    for name in admission.CLASSES:
+        _limit(monkeypatch, name, rate=60, burst=1)
+
+    assert all(client.get(f"/profile/{user}").status_code == 200 for _ in range(5))
+
+
+@pytest.mark.parametrize("headers", [{}, {"x-user-id": "7"}])
+def test_async_routes_share_limits_and_key_by_address(asgi_client, monkeypatch, headers):
+    _limit(monkeypatch, "upstream", rate=60, burst=1)
+    params = {"term": "kebab", "latitude": "41.0", "longitude": "29.0"}
+
+    assert asgi_client.get("/restaurant-search", params=params).status_code == 200
+    response = asgi_client.get("/restaurant-search", params=params, headers=headers)
+
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def test_async_routes_resolve_clients_behind_a_trusted_proxy(asgi_client, monkeypatch):
+    monkeypatch.setattr(admission, "TRUSTED_PROXY_COUNT", 1)
+    _limit(monkeypatch, "upstream", rate=60, burst=1)
+    params = {"term": "kebab", "latitude": "41.0", "longitude": "29.0"}
+
+    for client_ip in ("203.0.113.5", "203.0.113.6"):
+        response = asgi_client.get("/restaurant-search", params=params, headers={"X-Forwarded-For": client_ip})
+        assert response.status_code == 200
+    assert asgi_client.get("/restaurant-search", params=params,
+                           headers={"X-Forwarded-For": "203.0.113.5"}).status_code == 429
@@ -0,0 +1,94 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app import async_http, http_client
+
+
+@pytest.fixture
+def upstream(yelp_api, monkeypatch):
+    monkeypatch.setenv("FLAKY_MAX_RETRIES", "2")
+    monkeypatch.setenv("FLAKY_BREAKER_THRESHOLD", "3")
+    monkeypatch.setenv("FLAKY_BREAKER_RESET", "0.2")
+    instance = async_http.AsyncUpstream(http_client.Upstream("flaky"))
+    instance.url = f"http://127.0.0.1:{yelp_api.port}/v3/anything"
+    return instance
+
+
+def _run(upstream, coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await upstream.aclose()
+
+    return asyncio.run(main())
+
+
+def _fail_with(upstream, exc):
+    async def request(*args, **kwargs):
+        raise exc
+
+    upstream._client = SimpleNamespace(request=request, aclose=lambda: asyncio.sleep(0))
+
+
+def _half_open(breaker):
+    for _ in range(3):
+        breaker.record_failure()
+    breaker.opened_at -= 1
+    assert breaker.allow() and breaker.state == "half_open"
+    breaker.state = "open"
+
+
+def test_read_timeout_is_retried_only_for_safe_methods(upstream, yelp_api):
+    yelp_api.handler = lambda method, path, body: (time.sleep(0.3), (200, {}))[1]
+
+    with pytest.raises(httpx.ReadTimeout):
+        _run(upstream, upstream.post(upstream.url, json={}, idempotent=True, timeout=httpx.Timeout(1, read=0.05)))
+    assert len(yelp_api.requests) == 1
+
+    yelp_api.requests.clear()
+    upstream.upstream.breaker.record_success()
+    with pytest.raises(httpx.ReadTimeout):
+        _run(upstream, upstream.get(upstream.url, timeout=httpx.Timeout(1, read=0.05)))
+    assert len(yelp_api.requests) == 3
+
+
+def test_unexpected_error_during_probe_reopens_the_circuit(upstream):
+    breaker = upstream.upstream.breaker
+    _half_open(breaker)
+    _fail_with(upstream, httpx.DecodingError("bozuk yanıt"))
+
+    with pytest.raises(httpx.DecodingError):
+        _run(upstream, upstream.get(upstream.url))
+
+    assert breaker.state == "open"
+    with pytest.raises(http_client.CircuitOpenError):
+        _run(upstream, upstream.get(upstream.url))
+
+
+def test_cancelled_probe_releases_half_open_state(upstream, yelp_api):
+    yelp_api.handler = lambda method, path, body: (200, {})
+    breaker = upstream.upstream.breaker
+    _half_open(breaker)
+    _fail_with(upstream, asyncio.CancelledError())
+
+    with pytest.raises(asyncio.CancelledError):
+        _run(upstream, upstream.get(upstream.url))
+
+    # İptal edilen deneme sayılmaz; bir sonraki istek yeni deneme olarak gider
+    upstream._client = None
+    assert breaker.state == "open"
+    assert _run(upstream, upstream.get(upstream.url)).status_code == 200
+    assert breaker.state == "closed"
+
+
+@pytest.mark.parametrize("text", [123, ["Ayran"]])
+def test_async_translate_returns_json_error_on_unexpected_failure(asgi_client, text):
+    response = asgi_client.post("/translate", json={"text": text, "target_lang": "en"})
+
+    assert response.status_code == 500
+    assert response.json()["error"].startswith("Sunucu tarafında beklenmeyen hata")
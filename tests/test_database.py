@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
+
+from app.database import TimedQueuePool, db_session, dialect_insert, engine
+
+
+def test_requests_return_their_connection_to_the_pool(client, user):
+    for _ in range(5):
+        assert client.get(f"/profile/{user}").status_code == 200
+
+    assert engine.pool.checkedout() == 0
+    assert not db_session.registry.has()
+
+
+def test_pool_stats_report_checkouts(client, user):
+    client.get(f"/profile/{user}")
+
+    stats = client.get("/db/pool-stats").get_json()
+    assert stats["checkouts"] >= 1
+    assert stats["checked_out"] == 0
+    assert {"size", "max_overflow", "utilization", "avg_wait_ms", "max_wait_ms"} <= set(stats)
+
+
+def test_dialect_insert_rejects_unsupported_dialects():
+    with pytest.raises(RuntimeError):
+        dialect_insert(SimpleNamespace(dialect=SimpleNamespace(name="mysql")))
+
+
+def test_only_pool_timeouts_are_counted_as_timeouts():
+    pool = TimedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.01)
+    held = pool.connect()
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+    held.close()
+    assert (pool.checkouts, pool.checkout_timeouts) == (1, 1)
+
+    def refused():
+        raise sqlite3.OperationalError("connection refused")
+
+    broken = TimedQueuePool(refused, pool_size=1, max_overflow=0)
+    with pytest.raises(sqlite3.OperationalError):
+        broken.connect()
+    assert (broken.checkouts, broken.checkout_timeouts, broken.wait_seconds_total) == (0, 0, 0.0)
@@ -0,0 +1,82 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from app import export, routes
+from app.models.review import Review
+from app.models.translation import Translation
+
+
+@pytest.fixture
+def translations(db, user, monkeypatch):
+    # Küçük parçalar: akış birden fazla partition üzerinden okunur
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    db.add_all([Translation(user_id=user, original_text=f"Metin {i}", target_language="en", translated_text=f"Text {i}")
+                for i in range(5)])
+    db.add(Review(user_id=user, restaurant_name="Çiya", address="Kadıköy", rating=4.5, review_text="İyi"))
+    db.commit()
+    ids = [row.id for row in db.query(Translation.id).order_by(Translation.id)]
+    db.remove()
+    return ids
+
+
+def _get(client, url, **kwargs):
+    # Yanıt okunup kapatılır (WSGI sunucusunun yaptığı gibi); export slotu akış sonunda bırakılır
+    with client.get(url, **kwargs) as response:
+        response.get_data()
+    return response
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_ndjson_export_streams_all_rows_in_id_order(client, user, translations):
+    response = _get(client, f"/export/{user}")
+
+    assert "Content-Length" not in response.headers and response.mimetype == "application/x-ndjson"
+    rows = _ndjson(response)
+    assert [row["id"] for row in rows] == translations
+    assert rows[0]["original_text"] == "Metin 0"
+
+
+def test_interrupted_export_resumes_after_last_id(client, user, translations):
+    rows = _ndjson(_get(client, f"/export/{user}?cursor={translations[1]}"))
+
+    assert [row["id"] for row in rows] == translations[2:]
+
+
+def test_csv_header_only_on_fresh_download(client, user, translations):
+    fresh = list(csv.reader(io.StringIO(_get(client, f"/export/{user}?format=csv").get_data(as_text=True))))
+    assert fresh[0] == list(export.EXPORT_COLUMNS["translations"][1])
+    assert len(fresh) == 6
+
+    resumed = list(csv.reader(io.StringIO(
+        _get(client, f"/export/{user}?format=csv&cursor={translations[2]}").get_data(as_text=True))))
+    assert [int(row[0]) for row in resumed] == translations[3:]
+
+
+def test_gzip_export(client, user, translations):
+    response = _get(client, f"/export/{user}?type=reviews", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    rows = [json.loads(line) for line in gzip.decompress(response.get_data()).decode("utf-8").splitlines()]
+    assert [(row["restaurant_name"], row["rating"]) for row in rows] == [("Çiya", 4.5)]
+
+
+@pytest.mark.parametrize("query", ["type=users", "format=xml", "cursor=abc"])
+def test_invalid_export_parameters(client, user, query):
+    assert _get(client, f"/export/{user}?{query}").status_code == 400
+
+
+def test_unknown_user_and_admin_token(client, user, translations, monkeypatch):
+    assert _get(client, f"/export/{user + 1000}").status_code == 404
+    assert _get(client, "/admin/export").status_code == 403
+
+    monkeypatch.setattr(routes, "ADMIN_TOKEN", "s3cret")
+    assert _get(client, "/admin/export", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    response = _get(client, "/admin/export", headers={"X-Admin-Token": "s3cret"})
+    assert [row["id"] for row in _ndjson(response)] == translations
@@ -0,0 +1,165 @@
+import threading
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from firebase_admin import auth
+
+from app import firebase_admin_init, firebase_sync
+from app.database import dialect_insert
+from app.models.sync_state import SyncState
+from app.models.user import User
+
+
+def _fb(uid, email, display_name=""):
+    return SimpleNamespace(uid=uid, email=email, display_name=display_name, user_metadata=None)
+
+
+@pytest.fixture
+def firebase(app, monkeypatch):
+    # Firebase Auth yerine sayfalı sahte liste; pages[i] -> i. sayfadaki kullanıcılar
+    listing = SimpleNamespace(pages=[], calls=[])
+
+    def list_users(page_token=None, max_results=1000, app=None):
+        index = int(page_token or 0)
+        listing.calls.append(page_token)
+        has_next = index + 1 < len(listing.pages)
+        return SimpleNamespace(users=listing.pages[index] if listing.pages else [],
+                               next_page_token=str(index + 1) if has_next else None)
+
+    monkeypatch.setattr(firebase_admin_init, "get_app", lambda: object())
+    monkeypatch.setattr(auth, "list_users", list_users)
+    return listing
+
+
+def _run(full=False):
+    firebase_sync.start_sync(full=full)
+    firebase_sync._thread.join(5)
+
+
+def _users(db):
+    db.remove()
+    return {u.email: (u.firebase_uid, u.name, u.surname, u.password) for u in db.query(User).all()}
+
+
+def test_sync_adds_new_users_page_by_page(db, firebase):
+    firebase.pages = [[_fb("u1", "a@x.com", "Ali Veli")], [_fb("u2", "b@x.com"), _fb("u3", None)]]
+
+    _run()
+
+    assert _users(db) == {"a@x.com": ("u1", "Ali", "Veli", "firebase-auth"),
+                          "b@x.com": ("u2", "", "", "firebase-auth")}
+    status = firebase_sync.status()
+    assert (status["status"], status["processed"], status["added"], status["resumable"]) == ("done", 2, 2, False)
+
+
+def test_incremental_sync_updates_changed_users(db, firebase):
+    firebase.pages = [[_fb("u1", "a@x.com", "Ali Veli"), _fb("u2", "b@x.com", "Ayşe")]]
+    _run()
+
+    firebase.pages = [[_fb("u1", "ali@x.com", "Ali Can"), _fb("u2", "b@x.com", "Ayşe")]]
+    _run()
+
+    assert _users(db) == {"ali@x.com": ("u1", "Ali", "Can", "firebase-auth"),
+                          "b@x.com": ("u2", "Ayşe", "", "firebase-auth")}
+    status = firebase_sync.status()
+    assert (status["added"], status["updated"], status["skipped"]) == (0, 1, 1)
+
+
+def test_sync_links_legacy_rows_and_leaves_password_accounts_alone(db, firebase):
+    db.add_all([User(email="legacy@x.com", password="firebase-auth", name="Eski", surname=""),
+                User(email="own@x.com", password="hash", name="Kendi", surname="")])
+    db.commit()
+    firebase.pages = [[_fb("u1", "legacy@x.com", "Yeni Ad"), _fb("u2", "own@x.com", "Başka")]]
+
+    _run()
+
+    users = _users(db)
+    assert users["legacy@x.com"] == ("u1", "Yeni", "Ad", "firebase-auth")
+    assert users["own@x.com"] == (None, "Kendi", "", "hash")
+
+
+def test_email_taken_by_another_account_skips_only_that_user(db, firebase):
+    firebase.pages = [[_fb("u1", "a@x.com"), _fb("u2", "b@x.com")]]
+    _run()
+
+    firebase.pages = [[_fb("u1", "b@x.com", "Çakışan"), _fb("u2", "b@x.com"), _fb("u3", "c@x.com")]]
+    _run()
+
+    assert set(_users(db)) == {"a@x.com", "b@x.com", "c@x.com"}
+    assert firebase_sync.status()["status"] == "done"
+
+
+def test_failed_run_resumes_from_checkpoint(db, firebase, monkeypatch):
+    firebase.pages = [[_fb("u1", "a@x.com")], [_fb("u2", "b@x.com")]]
+    real_sync_page = firebase_sync._sync_page
+    calls = []
+
+    def failing_second_page(session, users):
+        calls.append(users)
+        if len(calls) == 2:
+            raise RuntimeError("bağlantı koptu")
+        return real_sync_page(session, users)
+
+    monkeypatch.setattr(firebase_sync, "_sync_page", failing_second_page)
+    _run()
+    status = firebase_sync.status()
+    assert (status["status"], status["resumable"]) == ("failed", True)
+
+    _run()
+    assert firebase.calls[-1] == "1"
+    assert set(_users(db)) == {"a@x.com", "b@x.com"}
+
+    # full=1 checkpoint'i yok sayar ve ilk sayfadan başlar
+    _run(full=True)
+    assert firebase.calls[-2:] == [None, "1"]
+
+
+def _set_state(db, status, updated_at):
+    db.execute(dialect_insert(db.get_bind())(SyncState.__table__).values(
+        name=firebase_sync.SYNC_NAME, status=status, updated_at=updated_at, processed=0, added=0, skipped=0))
+    db.commit()
+    db.remove()
+
+
+def test_running_sync_in_another_worker_is_not_started_twice(db, firebase):
+    _set_state(db, "running", datetime.utcnow())
+
+    with pytest.raises(firebase_sync.SyncAlreadyRunning):
+        firebase_sync.start_sync()
+
+
+def test_stale_running_sync_can_be_taken_over(db, firebase):
+    _set_state(db, "running", datetime.utcnow() - timedelta(seconds=firebase_sync.SYNC_STALE_AFTER + 60))
+
+    _run()
+
+    assert firebase_sync.status()["status"] == "done"
+
+
+def test_claim_is_atomic(app):
+    results = []
+    barrier = threading.Barrier(8)
+
+    def claim():
+        barrier.wait()
+        results.append(firebase_sync._claim())
+
+    threads = [threading.Thread(target=claim) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+
+
+def test_sync_route_reports_conflict_and_missing_firebase(client, db, firebase, monkeypatch):
+    _set_state(db, "running", datetime.utcnow())
+    assert client.post("/sync-firebase-users").status_code == 409
+
+    def unavailable():
+        raise firebase_admin_init.FirebaseUnavailable("yok")
+
+    monkeypatch.setattr(firebase_admin_init, "get_app", unavailable)
+    assert client.post("/sync-firebase-users").status_code == 503
@@ -0,0 +1,118 @@
+import time
+
+import pytest
+import requests
+
+from app import http_client
+
+
+@pytest.fixture
+def upstream(yelp_api, monkeypatch):
+    monkeypatch.setenv("FLAKY_MAX_RETRIES", "2")
+    monkeypatch.setenv("FLAKY_BREAKER_THRESHOLD", "3")
+    monkeypatch.setenv("FLAKY_BREAKER_RESET", "0.2")
+    instance = http_client.Upstream("flaky")
+    instance.url = f"http://127.0.0.1:{yelp_api.port}/v3/anything"
+    return instance
+
+
+def _statuses(yelp_api, *statuses):
+    remaining = list(statuses)
+    yelp_api.handler = lambda method, path, body: (remaining.pop(0) if remaining else 200, {})
+
+
+def test_get_is_retried_on_retryable_status(upstream, yelp_api):
+    _statuses(yelp_api, 503, 502)
+
+    assert upstream.get(upstream.url).status_code == 200
+    assert len(yelp_api.requests) == 3
+    assert upstream.stats()["retries"] == 2
+
+
+def test_post_is_not_retried_unless_marked_idempotent(upstream, yelp_api):
+    _statuses(yelp_api, 503)
+    assert upstream.post(upstream.url, json={}).status_code == 503
+    assert len(yelp_api.requests) == 1
+
+    _statuses(yelp_api, 503)
+    assert upstream.post(upstream.url, json={}, idempotent=True).status_code == 200
+
+
+def test_read_timeout_is_retried_only_for_safe_methods(upstream, yelp_api):
+    yelp_api.handler = lambda method, path, body: (time.sleep(0.3), (200, {}))[1]
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        upstream.post(upstream.url, json={}, idempotent=True, timeout=(1, 0.05))
+    assert len(yelp_api.requests) == 1
+
+    yelp_api.reset()
+    yelp_api.handler = lambda method, path, body: (time.sleep(0.3), (200, {}))[1]
+    upstream.breaker.record_success()
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        upstream.get(upstream.url, timeout=(1, 0.05))
+    assert len(yelp_api.requests) == 3
+
+
+def test_breaker_opens_short_circuits_and_recovers(upstream, yelp_api):
+    yelp_api.handler = lambda method, path, body: (500, {})
+    for _ in range(3):
+        upstream.get(upstream.url)
+    assert upstream.breaker.state == "open"
+
+    with pytest.raises(http_client.CircuitOpenError):
+        upstream.get(upstream.url)
+    assert len(yelp_api.requests) == 3
+
+    time.sleep(0.25)
+    _statuses(yelp_api)
+    assert upstream.get(upstream.url).status_code == 200
+    assert upstream.breaker.state == "closed"
+
+
+def _half_open(upstream):
+    for _ in range(3):
+        upstream.breaker.record_failure()
+    upstream.breaker.opened_at -= 1
+    assert upstream.breaker.allow() and upstream.breaker.state == "half_open"
+    upstream.breaker.state = "open"
+
+
+def test_unexpected_error_during_probe_reopens_the_circuit(upstream, monkeypatch):
+    _half_open(upstream)
+    monkeypatch.setattr(upstream.session, "request", lambda *args, **kwargs: (_ for _ in ()).throw(ValueError("x")))
+
+    with pytest.raises(ValueError):
+        upstream.get(upstream.url)
+
+    assert upstream.breaker.state == "open"
+    with pytest.raises(http_client.CircuitOpenError):
+        upstream.get(upstream.url)
+
+
+def test_interrupted_probe_releases_half_open_state(upstream, monkeypatch, yelp_api):
+    _statuses(yelp_api)
+    _half_open(upstream)
+
+    def interrupted(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(upstream.session, "request", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        upstream.get(upstream.url)
+
+    # Kesilen deneme servis hakkında bilgi vermez; hemen yeni bir deneme yapılabilir
+    monkeypatch.undo()
+    assert upstream.breaker.state == "open"
+    assert upstream.get(upstream.url).status_code == 200
+    assert upstream.breaker.state == "closed"
+
+
+def test_translate_returns_503_with_retry_after_when_circuit_is_open(client):
+    breaker = http_client.libretranslate.breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    response = client.post("/translate", json={"text": "Ayran", "target_lang": "en"})
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
@@ -0,0 +1,94 @@
+from datetime import datetime
+
+import pytest
+
+from app import ingest
+from app.models.review import Review
+from app.models.translation import Translation
+
+
+def _translation(user, key=None, **overrides):
+    item = {"user_id": user, "original_text": "Ayran", "target_language": "en", "translated_text": "Ayran drink"}
+    if key is not None:
+        item["idempotency_key"] = key
+    item.update(overrides)
+    return item
+
+
+def _review(user, key=None, **overrides):
+    item = {"user_id": user, "restaurant_name": "Çiya", "address": "Kadıköy", "rating": 4.5,
+            "review_text": "Güzel", "visited_at": "2024-05-01T12:00:00"}
+    if key is not None:
+        item["idempotency_key"] = key
+    item.update(overrides)
+    return item
+
+
+def test_replayed_items_are_reported_as_duplicates(client, db, user):
+    items = [_translation(user, "k1"), _translation(user, "k2"), _translation(user)]
+    first = client.post("/translations/bulk", json={"items": items}).get_json()
+    assert (first["created"], first["duplicate"]) == (3, 0)
+
+    # Çevrimdışı kuyruk aynı kayıtları tekrar gönderir; anahtarlı olanlar çift yazılmaz
+    second = client.post("/translations/bulk", json={"items": items[:2]}).get_json()
+    assert (second["created"], second["duplicate"]) == (0, 2)
+    assert [r["id"] for r in second["results"]] == [r["id"] for r in first["results"][:2]]
+    assert db.query(Translation).count() == 3
+
+
+def test_duplicate_key_within_one_request_points_to_first_item(client, db, user):
+    body = client.post("/reviews/bulk", json=[_review(user, "k1"), _review(user, "k1")]).get_json()
+
+    assert [r["status"] for r in body["results"]] == ["created", "duplicate"]
+    assert body["results"][1]["id"] == body["results"][0]["id"]
+    assert db.query(Review).count() == 1
+
+
+@pytest.mark.parametrize("overrides", [
+    {"original_text": 42},
+    {"target_language": "x" * 11},
+    {"target_language": ["en"]},
+    {"translated_text": {"text": "x"}},
+    {"created_at": 1714560000},
+    {"created_at": "dün"},
+    {"idempotency_key": "k" * 65},
+    {"idempotency_key": {"k": 1}},
+    {"user_id": True},
+])
+def test_invalid_translation_fields_fail_only_that_item(client, db, user, overrides):
+    response = client.post("/translations/bulk", json=[_translation(user, **overrides), _translation(user)])
+
+    assert response.status_code == 200
+    assert [r["status"] for r in response.get_json()["results"]] == ["error", "created"]
+    assert db.query(Translation).count() == 1
+
+
+@pytest.mark.parametrize("overrides", [
+    {"restaurant_name": "x" * 101},
+    {"address": 5},
+    {"rating": "çok iyi"},
+    {"rating": True},
+    {"rating": "NaN"},
+    {"yelp_business_id": 12345},
+    {"yelp_business_id": "b" * 65},
+])
+def test_invalid_review_fields_fail_only_that_item(client, db, user, overrides):
+    body = client.post("/reviews/bulk", json=[_review(user, **overrides), _review(user)]).get_json()
+
+    assert [r["status"] for r in body["results"]] == ["error", "created"]
+
+
+def test_unknown_user_and_all_invalid_batch(client, user):
+    response = client.post("/reviews/bulk", json=[_review(user + 1000), _review(user, rating=None)])
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == 2
+
+
+def test_offset_timestamps_are_stored_as_utc():
+    row = ingest.translation_row(_translation(1, created_at="2024-05-01T15:00:00+03:00"))
+    assert row["created_at"] == datetime(2024, 5, 1, 12, 0)
+
+    row = ingest.review_row(_review(1, visited_at="2024-05-01T12:00:00Z"))
+    assert row["visited_at"] == datetime(2024, 5, 1, 12, 0)
+    assert ingest.review_row(_review(1))["visited_at"] == datetime(2024, 5, 1, 12, 0)
@@ -0,0 +1,82 @@
+import json
+import logging
+
+from app import log, metrics
+
+
+def _samples(client, name):
+    lines = client.get("/metrics").get_data(as_text=True).splitlines()
+    return {line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1]) for line in lines if line.startswith(name)}
+
+
+def test_requests_are_counted_by_route_template(client, user):
+    before = _samples(client, "lingualens_http_requests_total")
+    client.get(f"/profile/{user}")
+    client.get(f"/profile/{user + 1}")
+
+    after = _samples(client, "lingualens_http_requests_total")
+    ok = 'lingualens_http_requests_total{route="/profile/<int:user_id>",method="GET",status="200"}'
+    missing = 'lingualens_http_requests_total{route="/profile/<int:user_id>",method="GET",status="404"}'
+    assert after[ok] - before.get(ok, 0) == 1
+    assert after[missing] - before.get(missing, 0) == 1
+    # Kullanıcı id'leri etikete girmez
+    assert not any(f"/profile/{user}" in key for key in after)
+
+
+def test_unmatched_paths_share_one_label(client):
+    client.get("/no-such-page/1")
+    client.get("/no-such-page/2")
+
+    assert 'lingualens_http_requests_total{route="<unmatched>",method="GET",status="404"}' \
+        in _samples(client, "lingualens_http_requests_total")
+
+
+def test_db_queries_are_attributed_to_the_request(client, user):
+    client.get(f"/profile/{user}")
+
+    queries = _samples(client, "lingualens_http_request_db_queries_count")
+    assert queries['lingualens_http_request_db_queries_count{route="/profile/<int:user_id>"}'] >= 1
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("h", "test", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "/x")
+
+    assert histogram.render() == [
+        'h_bucket{route="/x",le="0.1"} 1',
+        'h_bucket{route="/x",le="1"} 2',
+        'h_bucket{route="/x",le="+Inf"} 3',
+        'h_sum{route="/x"} 5.55',
+        'h_count{route="/x"} 3',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = metrics.Counter("c", "test", ("route",))
+    counter.inc('a"b\nc')
+
+    assert counter.render() == ['c{route="a\\"b\\nc"} 1']
+
+
+def test_sampling_keeps_warnings():
+    sampler = log.SamplingFilter(0.0)
+
+    assert not sampler.filter(logging.LogRecord("app", logging.INFO, "", 0, "x", (), None))
+    assert sampler.filter(logging.LogRecord("app", logging.WARNING, "", 0, "x", (), None))
+
+
+def test_json_log_lines_carry_request_id_and_fields(app):
+    record = logging.LogRecord("app.routes", logging.INFO, "", 0, "login", (), None)
+    record.fields = {"user_id": 7}
+
+    with app.test_request_context("/login", method="POST", headers={"X-Request-ID": "abc123"}):
+        app.preprocess_request()
+        payload = json.loads(log.JSONFormatter().format(record))
+
+    assert (payload["event"], payload["request_id"], payload["user_id"]) == ("login", "abc123", 7)
+
+
+def test_request_id_is_echoed(client):
+    assert client.get("/health", headers={"X-Request-ID": "r-1"}).headers["X-Request-ID"] == "r-1"
+    assert len(client.get("/health").headers["X-Request-ID"]) == 16
@@ -0,0 +1,92 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from app import ingest, migrations
+
+# Uygulamanın migration'lardan önceki (create_all ile kurulan) şeması
+OLD_SCHEMA = [
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR NOT NULL UNIQUE, password VARCHAR NOT NULL, "
+    "name VARCHAR, surname VARCHAR, profile_image VARCHAR)",
+    "CREATE TABLE translation_history (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users (id), "
+    "original_text TEXT NOT NULL, target_language VARCHAR(10) NOT NULL, translated_text TEXT, created_at DATETIME)",
+    "CREATE TABLE restaurant_reviews (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users (id), "
+    "restaurant_name VARCHAR(100) NOT NULL, address TEXT, rating NUMERIC, review_text TEXT, visited_at DATETIME)",
+]
+
+
+def _engine(tmp_path, name):
+    return create_engine(f"sqlite:///{tmp_path / name}")
+
+
+def test_fresh_database_gets_every_migration(tmp_path):
+    engine = _engine(tmp_path, "fresh.db")
+
+    applied = migrations.upgrade(engine)
+
+    assert [version for version, _ in applied] == [version for version, _, _ in migrations.MIGRATIONS]
+    assert migrations.pending(engine) == []
+    assert migrations.upgrade(engine) == []
+
+
+def test_old_create_all_database_is_upgraded_in_place(tmp_path):
+    engine = _engine(tmp_path, "old.db")
+    with engine.begin() as conn:
+        for statement in OLD_SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO users (id, email, password) VALUES (1, 'a@x.com', 'x')"))
+        conn.execute(text("INSERT INTO translation_history (user_id, original_text, target_language, translated_text, "
+                          "created_at) VALUES (1, 'Ayran', 'en', 'Ayran drink', '2024-01-01 10:00:00'), "
+                          "(1, 'Pilav', 'en', 'Rice', '2024-01-02 10:00:00')"))
+
+    migrations.upgrade(engine)
+
+    inspector = inspect(engine)
+    for table in ("translation_history", "restaurant_reviews"):
+        assert "idempotency_key" in {c["name"] for c in inspector.get_columns(table)}
+    assert "yelp_business_id" in {c["name"] for c in inspector.get_columns("restaurant_reviews")}
+    assert "firebase_uid" in {c["name"] for c in inspector.get_columns("users")}
+    with engine.connect() as conn:
+        # Özet tablolar mevcut geçmişten doldurulur
+        assert conn.execute(text("SELECT translation_count FROM user_language_stats "
+                                 "WHERE user_id = 1 AND target_language = 'en'")).scalar() == 2
+
+
+def test_upgraded_database_deduplicates_bulk_ingest(tmp_path):
+    engine = _engine(tmp_path, "old.db")
+    with engine.begin() as conn:
+        for statement in OLD_SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO users (id, email, password) VALUES (1, 'a@x.com', 'x')"))
+    migrations.upgrade(engine)
+
+    item = {"user_id": 1, "original_text": "Ayran", "target_language": "en", "translated_text": "Ayran drink",
+            "idempotency_key": "k1"}
+    with Session(engine) as session:
+        first = ingest.ingest_translations(session, [item])
+        session.commit()
+        second = ingest.ingest_translations(session, [item])
+        session.commit()
+
+    assert first[0]["status"] == "created"
+    assert second[0] == {"index": 0, "status": "duplicate", "id": first[0]["id"]}
+
+
+def test_status_command_reports_pending(tmp_path, monkeypatch, capsys):
+    engine = _engine(tmp_path, "empty.db")
+    monkeypatch.setattr(migrations, "engine", engine)
+
+    assert migrations.main(["status"]) == 1
+    assert "bekliyor: 0001 initial schema" in capsys.readouterr().out
+    assert migrations.main(["upgrade"]) == 0
+    assert migrations.main(["status"]) == 0
+
+
+def test_ready_reports_pending_migrations(client, monkeypatch):
+    assert client.get("/ready").status_code == 200
+
+    monkeypatch.setattr(migrations, "_current", False)
+    monkeypatch.setattr(migrations, "pending", lambda bind=None: [(99, "future")])
+    response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.get_json()["checks"]["schema"] == "pending migrations"
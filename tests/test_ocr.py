@@ -0,0 +1,156 @@
+import io
+import os
+import threading
+import time
+
+import pytest
+
+from app import ocr, routes
+
+
+def _upload(data=b"menu-image"):
+    return {"image": (io.BytesIO(data), "menu.png")}
+
+
+def test_photo_ocr_waits_for_result(client, ocr_engine):
+    response = client.post("/photo-ocr", data=_upload(), content_type="multipart/form-data")
+
+    assert response.status_code == 200
+    assert response.get_json()["text"].startswith("MENU 10")
+
+
+def test_ocr_job_can_be_polled(client, ocr_engine):
+    job = client.post("/ocr/jobs", data=_upload(), content_type="multipart/form-data").get_json()
+    ocr_engine.wait(ocr_engine.get(job["job_id"]), 1)
+
+    polled = client.get(f"/ocr/jobs/{job['job_id']}").get_json()
+    assert polled["status"] == "done"
+    assert client.get("/ocr/jobs/missing").status_code == 404
+
+
+def test_queue_full_returns_503(client, ocr_engine, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(ocr, "_run_ocr", lambda image_bytes, lang: (release.wait(5), 0, 0))
+    ocr_engine.max_queue = 1
+    try:
+        assert client.post("/ocr/jobs", data=_upload(b"a"), content_type="multipart/form-data").status_code == 202
+        assert client.post("/ocr/jobs", data=_upload(b"b"), content_type="multipart/form-data").status_code == 503
+        assert ocr_engine.stats()["rejected"] == 1
+    finally:
+        release.set()
+
+
+
+class _BrokenPool:
+    def __init__(self, error):
+        self.error = error
+        self.shut_down = False
+
+    def submit(self, *args):
+        raise self.error
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_failed_submit_is_rolled_back(app, ocr_engine, monkeypatch):
+    broken = _BrokenPool(ocr.BrokenProcessPool("alt süreç öldü"))
+    ocr_engine._pool = broken
+    monkeypatch.setattr(ocr, "ProcessPoolExecutor", lambda max_workers: _BrokenPool(RuntimeError("fork")))
+
+    with pytest.raises(RuntimeError):
+        ocr_engine.submit(b"menu-image")
+
+    assert broken.shut_down
+    assert (ocr_engine._pending, ocr_engine._inflight, ocr_engine._jobs) == (0, {}, {})
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, 2.0), ("0.5", 0.5), ("1e9", 2.0), ("inf", 2.0), ("0", 2.0), ("-3", 2.0), ("nan", 2.0), ("abc", 2.0),
+])
+def test_ocr_timeout_is_clamped(app, monkeypatch, value, expected):
+    monkeypatch.setattr(ocr, "OCR_SYNC_TIMEOUT", 2.0)
+    query = {} if value is None else {"timeout": value}
+    with app.test_request_context("/photo-ocr", query_string=query):
+        assert routes._ocr_timeout() == expected
+
+
+def test_slow_ocr_returns_202_after_the_server_limit(client, ocr_engine, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(ocr, "_run_ocr", lambda image_bytes, lang: (release.wait(5), 0, 0))
+    monkeypatch.setattr(ocr, "OCR_SYNC_TIMEOUT", 0.1)
+    try:
+        started = time.monotonic()
+        response = client.post("/photo-ocr?timeout=600", data=_upload(), content_type="multipart/form-data")
+        assert response.status_code == 202
+        assert time.monotonic() - started < 2
+    finally:
+        release.set()
+
+
+def test_same_image_is_served_from_content_cache(client, ocr_engine):
+    for _ in range(2):
+        response = client.post("/photo-ocr", data=_upload(b"same"), content_type="multipart/form-data")
+        assert response.status_code == 200
+
+    assert len(ocr_engine.calls) == 1
+    job = client.post("/ocr/jobs?sync=1", data=_upload(b"same"), content_type="multipart/form-data").get_json()
+    assert job["cached"] is True
+    # Dil farklıysa ayrı anahtar
+    client.post("/photo-ocr", data=dict(_upload(b"same"), lang="tur"), content_type="multipart/form-data")
+    assert len(ocr_engine.calls) == 2
+
+
+def _write(folder, name, size, mtime):
+    path = folder / name
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_gc_uploads_applies_retention_and_size_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr, "UPLOAD_FOLDER", str(tmp_path))
+    monkeypatch.setattr(ocr, "UPLOAD_RETENTION_SECONDS", 100)
+    monkeypatch.setattr(ocr, "UPLOAD_MAX_BYTES", 25)
+    now = 10_000
+    _write(tmp_path, "expired", 1, now - 200)
+    _write(tmp_path, "oldest", 10, now - 50)
+    _write(tmp_path, "middle", 10, now - 40)
+    _write(tmp_path, "newest", 10, now - 30)
+    (tmp_path / "subdir").mkdir()
+
+    assert ocr.gc_uploads(now) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["middle", "newest", "subdir"]
+
+
+def test_gc_uploads_tolerates_files_removed_concurrently(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr, "UPLOAD_FOLDER", str(tmp_path))
+    monkeypatch.setattr(ocr, "UPLOAD_RETENTION_SECONDS", 100)
+    gone = _write(tmp_path, "gone", 1, 0)
+    _write(tmp_path, "expired", 1, 0)
+    real_remove = ocr.os.remove
+
+    def racing_remove(path):
+        # Başka bir worker dosyayı bizden önce silmiş
+        if path == str(gone):
+            real_remove(path)
+            raise FileNotFoundError(path)
+        real_remove(path)
+
+    monkeypatch.setattr(ocr.os, "remove", racing_remove)
+    assert ocr.gc_uploads(10_000) == 1
+    assert list(tmp_path.iterdir()) == []
+    assert ocr.gc_uploads(10_000) == 0
+    monkeypatch.setattr(ocr, "UPLOAD_FOLDER", str(tmp_path / "missing"))
+    assert ocr.gc_uploads() == 0
+
+
+def test_gc_runs_even_when_uploads_are_not_kept(client, ocr_engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr, "UPLOAD_FOLDER", str(tmp_path))
+    monkeypatch.setattr(ocr, "OCR_KEEP_UPLOADS", False)
+    monkeypatch.setattr(ocr, "_last_gc", 0.0)
+    _write(tmp_path, "left-by-old-version.jpg", 1, 0)
+
+    client.post("/ocr/jobs", data=_upload(), content_type="multipart/form-data")
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import pagination
+from app.models.translation import Translation
+
+
+def _insert(db, user_id, timestamps):
+    base = datetime(2024, 1, 1)
+    db.execute(Translation.__table__.insert(), [
+        {"user_id": user_id, "original_text": f"text {i}", "target_language": "en", "translated_text": f"t{i}",
+         "created_at": None if minutes is None else base + timedelta(minutes=minutes)}
+        for i, minutes in enumerate(timestamps)
+    ])
+    db.commit()
+
+
+def _pages(client, url):
+    pages, cursor = [], None
+    while True:
+        response = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        pages.append([item["original_text"] for item in response.get_json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+def test_pages_newest_first_with_ties_broken_by_id(client, db, user):
+    _insert(db, user, [1, 2, 2, 3, 0])
+
+    pages = _pages(client, f"/translations/{user}?limit=2")
+
+    assert pages == [["text 3", "text 2"], ["text 1", "text 0"], ["text 4"]]
+
+
+def test_rows_without_timestamp_come_last_and_do_not_break_cursors(client, db, user):
+    _insert(db, user, [None, 5, None, 1, None])
+
+    pages = _pages(client, f"/translations/{user}?limit=2")
+
+    assert pages == [["text 1", "text 3"], ["text 4", "text 2"], ["text 0"]]
+    items = client.get(f"/translations/{user}?fields=id,created_at&limit=5").get_json()
+    assert items[-1]["created_at"] is None
+
+
+def test_cursor_round_trip_with_null_timestamp():
+    ts = datetime(2024, 5, 1, 12, 30)
+    assert pagination.decode_cursor(pagination.encode_cursor(ts, 7)) == (ts, 7)
+    assert pagination.decode_cursor(pagination.encode_cursor(None, 7)) == (None, 7)
+
+
+def test_field_projection_and_validation(client, db, user):
+    _insert(db, user, [1])
+
+    [item] = client.get(f"/translations/{user}?fields=id,translated_text").get_json()
+    assert set(item) == {"id", "translated_text"} and item["translated_text"] == "t0"
+    assert client.get(f"/translations/{user}?fields=password").status_code == 400
+    assert client.get(f"/translations/{user}?cursor=not-a-cursor").status_code == 400
+    assert client.get(f"/translations/{user}?limit=abc").status_code == 400
+
+
+@pytest.mark.parametrize("value, expected", [(None, pagination.DEFAULT_PAGE_SIZE), ("0", 1),
+                                             ("100000", pagination.MAX_PAGE_SIZE)])
+def test_limit_is_clamped(value, expected):
+    assert pagination.parse_limit(value) == expected
@@ -0,0 +1,63 @@
+import io
+import json
+
+from app.models.translation import Translation
+
+
+def _post(client, query="", **form):
+    data = dict(form, image=(io.BytesIO(b"menu-image"), "menu.png"))
+    # Yanıt okunup kapatılır (WSGI sunucusunun yaptığı gibi); OCR slotu akış sonunda bırakılır
+    with client.post(f"/photo-translate{query}", data=data, content_type="multipart/form-data") as response:
+        response.get_data()
+    return response
+
+
+def _events(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_streams_ocr_segments_and_done_as_ndjson(client, ocr_engine):
+    response = _post(client, target_lang="en")
+
+    assert response.mimetype == "application/x-ndjson"
+    events = _events(response)
+    assert [e["type"] for e in events] == ["ocr", "segment", "segment", "done"]
+    assert events[0]["segments"] == 2
+    assert events[-1]["translated_text"] == "[en] MENU 10\n[en] Çorba 45 TL"
+    assert events[-1]["saved"] is False
+
+
+def test_saves_history_when_user_id_is_given(client, db, ocr_engine, user):
+    done = _events(_post(client, target_lang="de", user_id=str(user)))[-1]
+
+    assert done["saved"] is True
+    row = db.query(Translation).one()
+    assert (row.id, row.user_id, row.translated_text) == (done["translation_id"], user, done["translated_text"])
+
+
+def test_failed_segments_are_reported_and_not_saved(client, db, ocr_engine, user, libretranslate):
+    libretranslate.handler = lambda method, path, body: (500, {"error": "down"})
+
+    done = _events(_post(client, target_lang="en", user_id=str(user)))[-1]
+
+    assert done["failed"] == 2 and done["saved"] is False
+    assert db.query(Translation).count() == 0
+
+
+def test_server_sent_events_format(client, ocr_engine):
+    response = _post(client, "?format=sse", target_lang="en")
+
+    assert response.mimetype == "text/event-stream"
+    body = response.get_data(as_text=True)
+    assert body.startswith("event: ocr\ndata: ")
+    assert body.count("event: segment") == 2 and "event: done" in body
+
+
+def test_requires_target_language(client, ocr_engine):
+    assert _post(client).status_code == 400
+
+
+def test_invalid_or_unknown_user_is_rejected_before_ocr(client, ocr_engine, user):
+    assert _post(client, target_lang="en", user_id="abc").status_code == 400
+    assert _post(client, target_lang="en", user_id=str(user + 1000)).status_code == 404
+    assert ocr_engine.calls == []
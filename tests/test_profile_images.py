@@ -0,0 +1,117 @@
+import base64
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import pytest
+from PIL import Image
+
+from app import blob_store
+from app.models.user import User
+
+
+def _png(size=(300, 200), color=(200, 40, 40)):
+    out = io.BytesIO()
+    Image.new("RGB", size, color).save(out, "PNG")
+    return out.getvalue()
+
+
+def _path(url):
+    parsed = urlparse(url)
+    return parsed.path + (f"?{parsed.query}" if parsed.query else "")
+
+
+def test_upload_stores_blob_and_serves_it_with_long_cache(client, db, user):
+    data = _png()
+    response = client.post("/profile-image", data={"user_id": str(user), "image": (io.BytesIO(data), "me.png")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert db.get(User, user).profile_image.startswith(blob_store.BLOB_PREFIX)
+
+    # Yanıtlar kapatılınca (WSGI sunucusunun yaptığı gibi) blob dosyası da kapanır
+    with client.get(_path(body["profile_image"])) as image:
+        assert image.status_code == 200
+        assert image.data == data and image.mimetype == "image/png"
+        assert image.cache_control.immutable and image.cache_control.max_age == 31536000
+
+    with client.get(_path(body["profile_image"]), headers={"If-None-Match": image.headers["ETag"]}) as again:
+        assert again.status_code == 304
+
+    with client.get(_path(body["profile_image_thumbnails"]["64"])) as thumb:
+        assert thumb.mimetype == "image/jpeg"
+        assert max(Image.open(io.BytesIO(thumb.data)).size) == 64
+
+
+def test_blob_route_rejects_unknown_names_and_sizes(client, app):
+    reference = f"{'0' * 64}.png"
+    assert client.get(f"/profile-images/{reference}").status_code == 404
+    assert client.get("/profile-images/../../etc/passwd").status_code == 404
+    assert client.get(f"/profile-images/{reference}?size=13").status_code == 400
+
+
+def test_store_interface_requires_open():
+    class Incomplete(blob_store.BlobStore):
+        def put(self, name, data):
+            pass
+
+        def exists(self, name):
+            return False
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_local_store_open_missing_blob(tmp_path):
+    store = blob_store.LocalBlobStore(str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        store.open("ab" * 32)
+    store.put("abc", b"data")
+    with store.open("abc") as f:
+        assert f.read() == b"data"
+
+
+def test_concurrent_puts_of_the_same_blob(tmp_path):
+    store = blob_store.LocalBlobStore(str(tmp_path))
+    data = b"x" * 1_000_000
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: store.put("cafe.png", data), range(16)))
+
+    with store.open("cafe.png") as f:
+        assert f.read() == data
+    assert os.listdir(tmp_path / "ca") == ["cafe.png"]
+
+
+def test_failed_put_leaves_no_temp_file(tmp_path, monkeypatch):
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    store = blob_store.LocalBlobStore(str(tmp_path))
+    monkeypatch.setattr(blob_store.os, "replace", failing_replace)
+
+    with pytest.raises(OSError):
+        store.put("cafe.png", b"data")
+    assert os.listdir(tmp_path / "ca") == []
+
+
+def test_register_accepts_null_profile_image(client, db):
+    response = client.post("/register", json={"email": "a@example.com", "password": "pw", "profile_image": None})
+
+    assert response.status_code == 201
+    assert db.query(User).filter_by(email="a@example.com").one().profile_image == ""
+
+
+def test_register_moves_data_url_to_blob_store(client, db):
+    data_url = "data:image/png;base64," + base64.b64encode(_png()).decode("ascii")
+
+    assert client.post("/register", json={"email": "b@example.com", "password": "pw", "profile_image": data_url}) \
+        .status_code == 201
+    assert db.query(User).filter_by(email="b@example.com").one().profile_image.startswith(blob_store.BLOB_PREFIX)
+
+
+@pytest.mark.parametrize("profile_image", ["data:image/png;base64,bm90LWFuLWltYWdl", 42])
+def test_register_rejects_invalid_profile_image(client, profile_image):
+    response = client.post("/register", json={"email": "c@example.com", "password": "pw",
+                                              "profile_image": profile_image})
+    assert response.status_code == 400
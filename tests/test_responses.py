@@ -0,0 +1,76 @@
+import gzip
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import brotli
+import pytest
+
+from app import responses
+from app.models.translation import Translation
+
+
+@pytest.fixture
+def long_history(db, user):
+    # Sıkıştırma eşiğini aşan bir geçmiş sayfası
+    db.add_all([Translation(user_id=user, original_text=f"Mercimek çorbası {i}", target_language="en",
+                            translated_text="Lentil soup") for i in range(40)])
+    db.commit()
+    db.remove()
+    return f"/translations/{user}?limit=40"
+
+
+def test_etag_round_trip_returns_304(client, long_history):
+    first = client.get(long_history)
+    assert first.status_code == 200 and first.headers["ETag"]
+    assert first.cache_control.no_cache
+
+    again = client.get(long_history, headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.get_data() == b""
+
+
+def test_changed_body_gets_a_new_etag(client, db, user, long_history):
+    etag = client.get(long_history).headers["ETag"]
+    db.add(Translation(user_id=user, original_text="Yeni", target_language="en", translated_text="New"))
+    db.commit()
+    db.remove()
+
+    response = client.get(long_history, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("accept, encoding, decode", [
+    ("gzip", "gzip", gzip.decompress),
+    ("br, gzip", "br", brotli.decompress),
+])
+def test_large_responses_are_compressed(client, long_history, accept, encoding, decode):
+    plain = client.get(long_history).get_data()
+    response = client.get(long_history, headers={"Accept-Encoding": accept})
+
+    assert response.headers["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert decode(response.get_data()) == plain
+    # Her kodlama ayrı bir temsil; kodlama ETag'e eklenir
+    etag = response.headers["ETag"]
+    assert etag.endswith(f"-{encoding}\"")
+    assert client.get(long_history, headers={"Accept-Encoding": accept, "If-None-Match": etag}).status_code == 304
+
+
+def test_small_and_non_get_responses_are_left_alone(client, user):
+    small = client.get(f"/profile/{user}", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+
+    post = client.post("/translations", json={"user_id": user, "original_text": "x" * 2000, "target_language": "en",
+                                              "translated_text": "y"}, headers={"Accept-Encoding": "gzip"})
+    assert "ETag" not in post.headers
+
+
+def test_json_provider_encodes_decimals_and_datetimes(app):
+    body = app.json.dumps({"b": Decimal("4.5"), "a": datetime(2024, 5, 1, 12, 0)})
+
+    assert json.loads(body) == {"a": "2024-05-01T12:00:00", "b": 4.5}
+    assert body.index('"a"') < body.index('"b"')
+    with pytest.raises(TypeError):
+        responses.dumps_bytes({"x": object()})
@@ -0,0 +1,97 @@
+import pytest
+
+from app import restaurants
+from app.models.restaurant import Restaurant
+from app.models.review import Review
+
+SEARCH = "/restaurant-search?term=kebab&latitude={}&longitude={}"
+INDEXED_ID = "biz-41.000-29.000"
+
+
+def _review(client, user, **fields):
+    body = {"user_id": user, "restaurant_name": "Kebab House", "address": "1 Main St", "rating": 4,
+            "review_text": "Güzel"}
+    return client.post("/reviews", json=dict(body, **fields))
+
+
+def _not_found_business(method, path, body):
+    if path.endswith("/reviews"):
+        return 200, {"reviews": []}
+    return 404, {"error": {"code": "BUSINESS_NOT_FOUND"}}
+
+
+def test_geohash_and_neighbor_cells():
+    assert restaurants.geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    cells = restaurants.neighbor_cells(41.0, 29.0)
+    assert len(cells) == 9
+    assert restaurants.geohash(41.0, 29.0, restaurants.GEO_CELL_PRECISION) in cells
+
+    # Tarih değiştirme çizgisinde komşular diğer yarıküreden gelir
+    east = restaurants.neighbor_cells(0.5, 179.999)
+    assert restaurants.geohash(0.5, -179.999, restaurants.GEO_CELL_PRECISION) in east
+
+
+def test_search_is_answered_from_the_local_index(client, db, yelp_api):
+    first = client.get(SEARCH.format(41.0, 29.0)).get_json()
+    assert "source" not in first
+    assert db.query(Restaurant).one().yelp_id == INDEXED_ID
+
+    # ~140 m ötede: Yelp'e gitmeden yerel index'ten
+    nearby = client.get(SEARCH.format(41.001, 29.001)).get_json()
+    assert nearby["source"] == "local"
+    assert nearby["businesses"][0]["id"] == INDEXED_ID
+    assert len(yelp_api.requests) == 1
+
+    assert restaurants.nearby(db, "pizza", 41.001, 29.001) is None
+    assert restaurants.nearby(db, "kebab", 41.1, 29.1) is None
+
+
+def test_detail_merges_index_yelp_and_our_reviews(client, user, yelp_api):
+    client.get(SEARCH.format(41.0, 29.0))
+    assert _review(client, user, yelp_business_id=INDEXED_ID).status_code == 201
+    yelp_api.requests.clear()
+
+    body = client.get(f"/restaurants/{INDEXED_ID}").get_json()
+
+    assert body["restaurant"]["name"] == "Kebab House" and body["restaurant"]["indexed_at"]
+    assert body["summary"] == {"yelp": {"rating": 4.5, "review_count": 12},
+                               "lingualens": {"review_count": 1, "average_rating": 4.0}}
+    assert sorted(review["source"] for review in body["reviews"]) == ["lingualens", "yelp"]
+    assert [path for _, path, _ in yelp_api.requests] == [f"/v3/businesses/{INDEXED_ID}/reviews"]
+
+
+def test_detail_falls_back_to_yelp_when_not_indexed(client, user, yelp_api):
+    assert _review(client, user, yelp_business_id="unindexed-1").status_code == 201
+
+    body = client.get("/restaurants/unindexed-1").get_json()
+
+    assert body["restaurant"]["name"] == "Yelp Place"
+    assert body["summary"]["yelp"] == {"rating": 4.0, "review_count": 10}
+    assert body["summary"]["lingualens"]["review_count"] == 1
+    assert [review["source"] for review in body["reviews"]] == ["lingualens", "yelp"]
+
+
+def test_our_reviews_survive_yelp_errors(client, user, yelp_api):
+    assert _review(client, user, yelp_business_id="unindexed-1").status_code == 201
+    yelp_api.handler = _not_found_business
+
+    body = client.get("/restaurants/unindexed-1").get_json()
+
+    assert body["restaurant"] is None and body["yelp_error"]
+    assert [review["text"] for review in body["reviews"]] == ["Güzel"]
+
+
+def test_unknown_restaurant_is_404(client, yelp_api):
+    yelp_api.handler = _not_found_business
+
+    assert client.get("/restaurants/nowhere").status_code == 404
+
+
+@pytest.mark.parametrize("business_id", [123, "x" * 65])
+def test_add_review_validates_yelp_business_id(client, db, user, business_id):
+    response = _review(client, user, yelp_business_id=business_id)
+
+    assert response.status_code == 400
+    assert "yelp_business_id" in response.get_json()["error"]
+    assert db.query(Review).count() == 0
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import search
+from app.models.review import Review
+from app.models.translation import Translation
+
+
+@pytest.fixture
+def history(db, user):
+    now = datetime(2024, 5, 1, 12, 0)
+    db.add_all([
+        Translation(user_id=user, original_text="Mercimek çorbası", target_language="en",
+                    translated_text="Lentil soup", created_at=now - timedelta(days=3)),
+        Translation(user_id=user, original_text="Tavuk çorbası", target_language="de",
+                    translated_text="Hühnersuppe", created_at=now - timedelta(days=2)),
+        Translation(user_id=user, original_text="Chicken SOUP 100%", target_language="en",
+                    translated_text="Tavuk çorbası", created_at=now - timedelta(days=1)),
+        Translation(user_id=user, original_text="Ayran", target_language="en",
+                    translated_text="Yogurt drink", created_at=now),
+        Review(user_id=user, restaurant_name="Çiya", address="Kadıköy", rating=5, review_text="Best soup in town",
+               visited_at=now),
+        Review(user_id=user, restaurant_name="Soup Bar", address="Moda", rating=2, review_text="Cold",
+               visited_at=now - timedelta(days=1)),
+    ])
+    db.commit()
+    db.remove()
+    return user
+
+
+def _texts(response):
+    return [item["original_text"] for item in response.get_json()]
+
+
+def test_every_term_must_match_case_insensitively(client, history):
+    response = client.get(f"/search/translations/{history}?q=chicken+soup")
+    assert _texts(response) == ["Chicken SOUP 100%"]
+
+    # Terim iki kolondan birinde geçmesi yeterli; en yeni kayıt önce gelir
+    assert _texts(client.get(f"/search/translations/{history}?q=Tavuk")) == ["Chicken SOUP 100%", "Tavuk çorbası"]
+
+
+def test_like_wildcards_are_literal(client, history):
+    assert _texts(client.get(f"/search/translations/{history}?q=100%25")) == ["Chicken SOUP 100%"]
+    assert _texts(client.get(f"/search/translations/{history}?q=__")) == []
+
+
+def test_filters_narrow_results(client, history):
+    assert _texts(client.get(f"/search/translations/{history}?q=soup&lang=en")) == \
+        ["Chicken SOUP 100%", "Mercimek çorbası"]
+    assert _texts(client.get(f"/search/translations/{history}?q=soup&from=2024-04-29T00:00:00")) == \
+        ["Chicken SOUP 100%"]
+
+    reviews = client.get(f"/search/reviews/{history}?q=soup&min_rating=4").get_json()
+    assert [r["restaurant_name"] for r in reviews] == ["Çiya"]
+    assert reviews[0]["rating"] == 5.0
+
+
+def test_results_are_paged_with_offset_cursor(client, history):
+    first = client.get(f"/search/translations/{history}?q=çorbası&limit=2")
+    assert len(first.get_json()) == 2
+
+    second = client.get(f"/search/translations/{history}?q=çorbası&limit=2&cursor={first.headers['X-Next-Cursor']}")
+    assert _texts(second) == ["Mercimek çorbası"]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_other_users_history_is_not_searched(client, history):
+    assert client.get(f"/search/translations/{history + 1}?q=soup").get_json() == []
+
+
+@pytest.mark.parametrize("query", ["q=a", "q=", "q=soup&from=dün", "q=soup&cursor=!!", "q=soup&min_rating=x",
+                                   f"q=soup&cursor={search.encode_offset(search.SEARCH_MAX_OFFSET + 1)}"])
+def test_invalid_queries_are_rejected(client, user, query):
+    kind = "reviews" if "rating" in query else "translations"
+    assert client.get(f"/search/{kind}/{user}?{query}").status_code == 400
+
+
+def test_long_queries_are_truncated():
+    assert search.normalize_query("  a   b  ") == "a b"
+    assert len(search.normalize_query("x" * 500)) == search.SEARCH_MAX_QUERY_LENGTH
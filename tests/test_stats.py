@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import update
+
+from app import stats
+from app.database import engine
+from app.models.stats import UserLanguageStat
+
+
+def _translate(client, user, text, lang="en"):
+    assert client.post("/translations", json={"user_id": user, "original_text": text, "target_language": lang,
+                                              "translated_text": f"[{lang}] {text}"}).status_code == 201
+
+
+def _review(client, user, name, rating, address="Kadıköy"):
+    assert client.post("/reviews", json={"user_id": user, "restaurant_name": name, "address": address,
+                                         "rating": rating, "review_text": "ok"}).status_code == 201
+
+
+def test_user_stats_follow_new_translations(client, user):
+    _translate(client, user, "Ayran")
+    _translate(client, user, "  ayran ")
+    _translate(client, user, "Pilav", "de")
+
+    body = client.get(f"/stats/users/{user}").get_json()
+
+    assert body["total_translations"] == 3
+    assert body["languages"] == [{"target_language": "en", "count": 2}, {"target_language": "de", "count": 1}]
+    # Boşluk / büyük-küçük harf farkı aynı ifade sayılır; ilk yazım gösterilir
+    assert [(p["phrase"], p["count"]) for p in body["top_phrases"]] == [("Ayran", 2), ("Pilav", 1)]
+
+
+def test_replayed_bulk_items_are_counted_once(client, user):
+    item = {"user_id": user, "original_text": "Çay", "target_language": "en", "translated_text": "Tea",
+            "idempotency_key": "k1"}
+    client.post("/translations/bulk", json=[item])
+    client.post("/translations/bulk", json=[item])
+
+    assert client.get(f"/stats/users/{user}").get_json()["total_translations"] == 1
+
+
+def test_restaurant_stats_average_ratings(client, user):
+    _review(client, user, "Çiya", 5)
+    _review(client, user, "çiya ", 4)
+    _review(client, user, "Çiya", 3, address="Moda")
+
+    one = client.get("/stats/restaurants", query_string={"name": "Çiya", "address": "Kadıköy"}).get_json()
+    assert (one["review_count"], one["average_rating"]) == (2, 4.5)
+
+    top = client.get("/stats/restaurants?top=1").get_json()
+    assert [(r["address"], r["review_count"]) for r in top] == [("Kadıköy", 2)]
+    assert client.get("/stats/restaurants", query_string={"name": "Yok"}).status_code == 404
+
+
+def test_rebuild_matches_incremental_updates_and_check_finds_drift(client, user):
+    _translate(client, user, "Ayran")
+    _translate(client, user, "Pilav", "de")
+    _review(client, user, "Çiya", 5)
+
+    with engine.connect() as conn:
+        assert not stats.has_drift(stats.check(conn))
+
+    with engine.begin() as conn:
+        conn.execute(update(UserLanguageStat).values(translation_count=UserLanguageStat.translation_count + 5))
+    with engine.connect() as conn:
+        report = stats.check(conn)
+    assert report["user_language_stats"]["mismatched"] == 2
+    assert stats.main(["check"]) == 1
+
+    assert stats.main(["rebuild"]) == 0
+    assert stats.main(["check"]) == 0
+    assert client.get(f"/stats/users/{user}").get_json()["total_translations"] == 2
+
+
+@pytest.mark.parametrize("top, expected", [(0, 1), (500, stats.STATS_TOP_MAX)])
+def test_top_is_clamped(client, user, monkeypatch, top, expected):
+    seen = []
+    monkeypatch.setattr(stats, "top_restaurants", lambda session, top: seen.append(top) or [])
+
+    client.get(f"/stats/restaurants?top={top}")
+
+    assert seen == [expected]
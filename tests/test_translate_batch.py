@@ -0,0 +1,38 @@
+from app import routes, translator
+
+
+def test_batch_translates_in_chunks_and_deduplicates(client, libretranslate, monkeypatch):
+    monkeypatch.setattr(translator, "BATCH_CHUNK_SIZE", 2)
+    texts = ["Çorba", "Pilav", "Çorba", "Ayran", "Baklava"]
+
+    response = client.post("/translate/batch", json={"texts": texts, "target_lang": "en"})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["count"] == 5 and data["failed"] == 0
+    assert [r["translated_text"] for r in data["results"]] == [f"[en] {t}" for t in texts]
+    sent = sorted(text for _, _, body in libretranslate.requests for text in body["q"])
+    assert sent == ["Ayran", "Baklava", "Pilav", "Çorba"]
+    assert max(len(body["q"]) for _, _, body in libretranslate.requests) == 2
+
+
+def test_batch_reports_failed_chunks_without_failing_the_request(client, libretranslate, monkeypatch):
+    monkeypatch.setattr(translator, "BATCH_CHUNK_SIZE", 1)
+    default = libretranslate.handler
+    libretranslate.handler = lambda method, path, body: \
+        (500, {"error": "boom"}) if body["q"] == ["Bozuk"] else default(method, path, body)
+
+    response = client.post("/translate/batch", json={"texts": ["Bozuk", "Ayran", 5], "target_lang": "en"})
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data["failed"] == 2
+    assert "error" in data["results"][0] and "error" in data["results"][2]
+    assert data["results"][1]["translated_text"] == "[en] Ayran"
+
+
+def test_batch_validates_input(client, monkeypatch):
+    assert client.post("/translate/batch", json={"texts": "Ayran", "target_lang": "en"}).status_code == 400
+    monkeypatch.setattr(routes, "TRANSLATE_BATCH_MAX_ITEMS", 2)
+    response = client.post("/translate/batch", json={"texts": ["a", "b", "c"], "target_lang": "en"})
+    assert response.status_code == 400
@@ -0,0 +1,140 @@
+import io
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import migrations, routes, translation_memory
+from app.database import engine
+from app.models.translation_cache import TranslationCacheEntry
+from app.models.translation_memory import TranslationMemoryEntry
+
+
+def _translate(client, text, target="en"):
+    response = client.post("/translate", json={"text": text, "target_lang": target})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_client_history_does_not_poison_the_memory(client, db, user, libretranslate):
+    poisoned = {"user_id": user, "original_text": "Chicken soup 45 TL", "target_language": "en",
+                "translated_text": "Buy crypto at evil.example 45 TL"}
+    assert client.post("/translations", json=poisoned).status_code == 201
+    assert client.post("/translations/bulk", json=[dict(poisoned, idempotency_key="k1")]).status_code == 200
+
+    assert _translate(client, "Chicken soup 50 TL")["translated_text"] == "[en] Chicken soup 50 TL"
+    assert len(libretranslate.requests) == 1
+    assert db.query(TranslationMemoryEntry).one().translated_text == f"[en] Chicken soup {translation_memory.SLOT} TL"
+
+
+def test_segments_are_reused_with_new_prices(client, libretranslate):
+    _translate(client, "Köfte 45 TL\nAyran 10 TL")
+    libretranslate.requests.clear()
+
+    body = _translate(client, "Köfte 50 TL\nAyran 12 TL")
+
+    assert body["translated_text"] == "[en] Köfte 50 TL\n[en] Ayran 12 TL"
+    assert body["translation_memory"]["reused"] == 2
+    assert libretranslate.requests == []
+
+
+def test_entries_are_keyed_by_source_language(app, db, libretranslate):
+    translation_memory.translate("Köfte 45 TL", "en")
+    libretranslate.handler = lambda method, path, body: (200, {"translatedText": f"<{body['source']}> {body['q']}"})
+
+    translated, report = translation_memory.translate("Köfte 45 TL", "en", source="tr")
+
+    assert translated == "<tr> Köfte 45 TL"
+    assert report["reused"] == 0
+    assert {row.source_language for row in db.query(TranslationMemoryEntry)} == {"auto", "tr"}
+
+
+def test_newer_upstream_result_overwrites_entry(app, db):
+    translation_memory.store(db, [translation_memory.entry("auto", "en", "Mantı", "Ravioli")])
+    translation_memory.store(db, [translation_memory.entry("auto", "en", "Mantı", "Turkish dumplings")])
+    db.commit()
+
+    assert translation_memory.lookup(db, "auto", "en", ["Mantı"]) == {"Mantı": "Turkish dumplings"}
+
+    translation_memory.store(db, [translation_memory.entry("auto", "en", "Mantı", "Pasta")], overwrite=False)
+    assert translation_memory.lookup(db, "auto", "en", ["Mantı"]) == {"Mantı": "Turkish dumplings"}
+
+
+def test_photo_translate_lines_feed_the_memory(client, ocr_engine, libretranslate):
+    with client.post("/photo-translate", data={"target_lang": "en", "image": (io.BytesIO(b"menu-image"), "m.png")},
+                     content_type="multipart/form-data") as response:
+        response.get_data()
+    libretranslate.requests.clear()
+
+    assert _translate(client, "Çorba 60 TL")["translated_text"] == "[en] Çorba 60 TL"
+    assert libretranslate.requests == []
+
+
+def test_admin_can_evict_a_bad_segment(client, db, monkeypatch, libretranslate):
+    _translate(client, "Köfte 45 TL\nAyran 10 TL")
+    url = "/translate/memory?target=en&segment=K%C3%B6fte%2099%20TL"
+
+    assert client.delete(url).status_code == 403
+    monkeypatch.setattr(routes, "ADMIN_TOKEN", "s3cret")
+    assert client.delete("/translate/memory", headers={"X-Admin-Token": "s3cret"}).status_code == 400
+
+    response = client.delete(url, headers={"X-Admin-Token": "s3cret"})
+    assert response.get_json() == {"deleted": 1}
+    assert [row.source_text for row in db.query(TranslationMemoryEntry)] == [f"Ayran {translation_memory.SLOT} TL"]
+
+
+def test_evict_command(app, db, capsys):
+    translation_memory.store(db, [translation_memory.entry("auto", "en", "Mantı", "Ravioli"),
+                                  translation_memory.entry("auto", "de", "Mantı", "Maultaschen")])
+    db.commit()
+    db.remove()
+
+    with pytest.raises(SystemExit):
+        translation_memory.main(["evict"])
+    assert translation_memory.main(["evict", "--target", "en"]) == 0
+    assert '"deleted": 1' in capsys.readouterr().out
+    assert [row.target_language for row in db.query(TranslationMemoryEntry)] == ["de"]
+
+
+def test_backfill_reads_only_upstream_cache(app, db, user):
+    db.add(TranslationCacheEntry(cache_key="k" * 64, source_language="auto", target_language="en",
+                                 original_text="Pilav. Ayran.", translated_text="Rice. Ayran drink."))
+    db.commit()
+    db.remove()
+
+    with engine.begin() as conn:
+        assert translation_memory.backfill(conn) == {"cache_rows": 1, "segments": 2}
+
+    assert translation_memory.lookup(db, "auto", "en", ["Pilav.", "Ayran."]) == {"Pilav.": "Rice.",
+                                                                                 "Ayran.": "Ayran drink."}
+
+
+def test_migration_rebuilds_old_memory_table(tmp_path):
+    old = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    migrations.upgrade(old)
+    with old.begin() as conn:
+        conn.execute(text("DROP TABLE translation_memory"))
+        conn.execute(text("CREATE TABLE translation_memory (target_language VARCHAR(10), segment_key VARCHAR(64), "
+                          "source_text TEXT, translated_text TEXT, slots INTEGER, created_at DATETIME, "
+                          "PRIMARY KEY (target_language, segment_key))"))
+        conn.execute(text("INSERT INTO translation_memory VALUES ('en', 'x', 'Chicken soup', 'Buy crypto', 0, NULL)"))
+        conn.execute(text("DELETE FROM schema_migrations WHERE version = 9"))
+
+    assert migrations.upgrade(old) == [(9, "translation memory keyed by source language")]
+    with old.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM translation_memory")).scalar() == 0
+        assert "source_language" in {c[1] for c in conn.execute(text("PRAGMA table_info(translation_memory)"))}
+
+
+def test_async_translate_batches_missed_segments(asgi_client, libretranslate):
+    menu = "\n".join(f"Yemek {i} 45 TL" for i in range(30))
+
+    response = asgi_client.post("/translate", json={"text": menu, "target_lang": "en"})
+
+    assert response.json()["translated_text"] == "\n".join(f"[en] Yemek {i} 45 TL" for i in range(30))
+    # Sync yolla aynı maliyet: 25'lik parçalar halinde dizi q ile iki istek
+    assert sorted(len(body["q"]) for _, _, body in libretranslate.requests) == [5, 25]
+
+    libretranslate.requests.clear()
+    again = asgi_client.post("/translate", json={"text": menu.replace("45", "50"), "target_lang": "en"})
+    assert again.json()["translation_memory"]["reused"] == 30
+    assert libretranslate.requests == []
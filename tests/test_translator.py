@@ -0,0 +1,47 @@
+from app import translator
+from app.models.translation_cache import TranslationCacheEntry
+from conftest import arun
+
+
+def _sent(libretranslate):
+    return [body["q"] for method, path, body in libretranslate.requests]
+
+
+def test_translate_sends_original_text_and_caches_by_normalized_key(app, db, libretranslate):
+    text = "Mercimek   çorbası\n  Ayran  "
+    assert translator.translate(text, "en") == f"[en] {text}"
+    assert _sent(libretranslate) == [text]
+
+    # Yalnızca boşlukları farklı metin aynı anahtara düşer, upstream'e tekrar gidilmez
+    assert translator.translate("Mercimek çorbası\nAyran", "en") == f"[en] {text}"
+    assert len(libretranslate.requests) == 1
+
+
+def test_translate_uses_persistent_cache_after_memory_eviction(app, db, libretranslate):
+    translator.translate("Köfte", "de")
+    translator._memory_cache.clear()
+
+    assert translator.translate("Köfte", "de") == "[de] Köfte"
+    assert len(libretranslate.requests) == 1
+    entry = db.query(TranslationCacheEntry).one()
+    assert (entry.original_text, entry.target_language) == ("Köfte", "de")
+
+
+def test_cache_key_separates_languages():
+    assert translator.cache_key("Ayran", "auto", "en") != translator.cache_key("Ayran", "auto", "de")
+    assert translator.cache_key(" Ayran ", "auto", "en") == translator.cache_key("Ayran", "auto", "en")
+
+
+def test_atranslate_sends_original_text(app, db, libretranslate):
+    text = "Kuru  fasulye"
+    assert arun(translator.atranslate(text, "en")) == f"[en] {text}"
+    assert _sent(libretranslate) == [text]
+
+
+def test_translate_many_sends_first_spelling_once(app, db, libretranslate):
+    results = translator.translate_many(["Pilav  ", "Pilav", "", "Cacık"], "en")
+
+    assert results[0] == results[1] == {"translated_text": "[en] Pilav  "}
+    assert "error" in results[2]
+    assert results[3] == {"translated_text": "[en] Cacık"}
+    assert _sent(libretranslate) == [["Pilav  ", "Cacık"]]
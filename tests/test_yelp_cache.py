@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from app import restaurants, yelp
+
+
+@pytest.fixture(autouse=True)
+def _yelp_only(monkeypatch):
+    # Bu testler Yelp önbelleğini ölçer; yerel restoran index'i devre dışı
+    monkeypatch.setattr(restaurants, "RESTAURANT_LOCAL_FIRST", False)
+
+
+def _searches(yelp_api):
+    return [path for method, path, body in yelp_api.requests if "/businesses/search" in path]
+
+
+def test_nearby_searches_share_a_grid_cell(client, yelp_api):
+    first = client.get("/restaurant-search?term=Kebab&latitude=41.0151&longitude=28.9795")
+    second = client.get("/restaurant-search?term=kebab&latitude=41.0153&longitude=28.9797")
+
+    assert first.status_code == second.status_code == 200
+    assert first.get_json() == second.get_json()
+    assert len(_searches(yelp_api)) == 1
+    assert "latitude=41.015" in _searches(yelp_api)[0]
+
+
+def test_concurrent_misses_make_one_upstream_call(app, yelp_api):
+    default = yelp_api.handler
+
+    def slow(method, path, body):
+        time.sleep(0.2)
+        return default(method, path, body)
+
+    yelp_api.handler = slow
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(yelp.search("pide", 40.0, 29.0)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 5 and all(r == results[0] for r in results)
+    assert len(_searches(yelp_api)) == 1
+
+
+def test_stale_entry_is_served_while_refreshing(app, yelp_api, monkeypatch):
+    monkeypatch.setattr(yelp._search_cache, "ttl", 0)
+    yelp.search("doner", 40.0, 29.0)
+    time.sleep(0.01)
+
+    assert yelp.search("doner", 40.0, 29.0)["businesses"]
+    assert yelp._search_cache.stats()["stale_hits"] == 1
+
+
+@pytest.mark.parametrize("latitude, longitude", [
+    ("nan", "29.0"), ("41.0", "inf"), ("-inf", "29.0"), ("91", "29.0"), ("41.0", "-180.5"), ("abc", "29.0"),
+])
+def test_invalid_coordinates_are_rejected(client, asgi_client, yelp_api, latitude, longitude):
+    url = f"/restaurant-search?term=pide&latitude={latitude}&longitude={longitude}"
+
+    assert client.get(url).status_code == 400
+    assert asgi_client.get(url).status_code == 400
+    assert yelp_api.requests == []
+
+
+def test_async_search_uses_the_same_cache(client, asgi_client, yelp_api):
+    url = "/restaurant-search?term=pide&latitude=40.0&longitude=29.0"
+
+    assert asgi_client.get(url).json() == client.get(url).get_json()
+    assert len(_searches(yelp_api)) == 1